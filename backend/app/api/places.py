@@ -2,34 +2,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 import logging
-import math
-import googlemaps
 
 from ..core.config import settings
 from ..core.auth import get_current_user
+from ..core.gmaps_client import get_gmaps
 from ..db.models import User
+from ..utils.geo_utils import haversine_distance
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize Google Maps client
-gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
-
-
-def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Calculate distance between two points in meters using Haversine formula."""
-    R = 6371000  # Earth's radius in meters
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lng = math.radians(lng2 - lng1)
-    
-    a = math.sin(delta_lat / 2) ** 2 + \
-        math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    return R * c
+# Shared Google Maps client
+gmaps = get_gmaps()
 
 
 @router.get("/places/search")
@@ -16,7 +16,7 @@ from ..models.schemas import (
     OptimizationResponse, MapsLinkResponse, TripConstraints
 )
 from ..services.vision_service import vision_service
-from ..services.geocoding_service import geocoding_service
+from ..services.geocoding_service import get_geocoding_service
 from ..services.distance_matrix_service import distance_matrix_service
 from ..services.route_optimizer import route_optimizer
 from ..services.maps_link_service import maps_link_service
@@ -53,24 +53,14 @@ async def process_images_background(job_id: UUID, image_bytes_list: List[bytes],
         logger.info(f"Starting optimized processing of {len(image_bytes_list)} images")
         
         # === PHASE 1: Parallel Image Analysis (60% of progress) ===
-        # All images processed concurrently with rate limiting
-        failed_images = []
-        raw_candidates = []
-        
-        try:
-            analysis_result = await asyncio.wait_for(
-                vision_service.analyze_images_batch_async(
-                    image_bytes_list,
-                    max_concurrent=3  # Limit to avoid rate limits
-                ),
-                timeout=25.0  # 25s budget for image analysis
-            )
-            raw_candidates = analysis_result.get("candidates", [])
-            failed_images = analysis_result.get("failed_images", [])
-        except asyncio.TimeoutError:
-            logger.warning("Image analysis phase timed out, proceeding with partial results")
-            raw_candidates = []
-            failed_images = [{"index": i+1, "reason": "Processing timed out"} for i in range(len(image_bytes_list))]
+        # All images processed concurrently with rate limiting.
+        # Images unfinished at the deadline are dropped; finished ones are kept
+        analysis_result = await vision_service.analyze_images_batch_async(
+            image_bytes_list,
+            timeout=25.0  # 25s budget for image analysis
+        )
+        raw_candidates = analysis_result.get("candidates", [])
+        failed_images = analysis_result.get("failed_images", [])
         
         job.processed_images = len(image_bytes_list)
         job.progress = 0.6
@@ -100,7 +90,7 @@ async def process_images_background(job_id: UUID, image_bytes_list: List[bytes],
         # 1. Geocode all candidates (without bias for first pass)
         # 2. Compute centroid from results and re-rank alternatives by proximity
         
-        from ..utils.geo_utils import calculate_centroid, calculate_bounding_radius, score_by_proximity
+        from ..utils.geo_utils import calculate_centroid_arrays, calculate_bounding_radius_arrays, score_by_proximity_batch
         
         remaining_time = PROCESSING_TIMEOUT - (time.time() - start_time)
         if remaining_time < 5:
@@ -114,25 +104,27 @@ async def process_images_background(job_id: UUID, image_bytes_list: List[bytes],
             try:
                 # First pass: geocode without location bias
                 geocode_results = await asyncio.wait_for(
-                    geocoding_service.geocode_batch_async(
+                    get_geocoding_service().geocode_batch_async(
                         filtered_candidates,
                         with_alternatives=True
                     ),
                     timeout=min(remaining_time - 2, 12.0)  # Leave 2s buffer
                 )
                 
-                # Collect coordinates from primary results for centroid calculation
-                primary_coords = []
+                # Collect coordinates from primary results for centroid calculation,
+                # as parallel lat/lng lists (no per-call repacking of tuples)
+                primary_lats, primary_lngs = [], []
                 for result in geocode_results:
                     primary = result.get("primary")
-                    if primary and primary.get("lat") is not None:
-                        primary_coords.append((primary["lat"], primary["lng"]))
+                    if primary and primary.get("lat") is not None and primary.get("lng") is not None:
+                        primary_lats.append(primary["lat"])
+                        primary_lngs.append(primary["lng"])
                 
                 # Compute centroid of geocoded locations
-                centroid = calculate_centroid(primary_coords)
-                bounding_radius = calculate_bounding_radius(primary_coords, centroid)
+                centroid = calculate_centroid_arrays(primary_lats, primary_lngs)
+                bounding_radius = calculate_bounding_radius_arrays(primary_lats, primary_lngs, centroid)
                 
-                logger.info(f"Computed cluster centroid: {centroid}, radius: {bounding_radius/1000:.1f}km from {len(primary_coords)} locations")
+                logger.info(f"Computed cluster centroid: {centroid}, radius: {bounding_radius/1000:.1f}km from {len(primary_lats)} locations")
                 
                 # Second pass: re-rank alternatives by proximity to centroid
                 for result in geocode_results:
@@ -144,17 +136,15 @@ async def process_images_background(job_id: UUID, image_bytes_list: List[bytes],
                         if centroid[0] is not None and alternatives:
                             all_options = [primary] + alternatives
                             
-                            # Score each option by proximity
+                            # Score every option by proximity in one pass (0.5 when coordinates are missing)
+                            prox_scores = score_by_proximity_batch(
+                                [(opt.get("lat"), opt.get("lng")) for opt in all_options],
+                                centroid,
+                                bounding_radius * 2
+                            ).tolist()
+                            
                             scored_options = []
-                            for i, opt in enumerate(all_options):
-                                opt_lat = opt.get("lat")
-                                opt_lng = opt.get("lng")
-                                
-                                if opt_lat is not None and opt_lng is not None:
-                                    prox_score = score_by_proximity(opt_lat, opt_lng, centroid, bounding_radius * 2)
-                                else:
-                                    prox_score = 0.5
-                                
+                            for i, (opt, prox_score) in enumerate(zip(all_options, prox_scores)):
                                 # Combine with API rank (first result gets bonus)
                                 api_bonus = max(0.0, 0.15 - (i * 0.03))
                                 combined = prox_score + api_bonus
@@ -455,7 +445,7 @@ async def optimize_trip(
                 logger.info(f"  Start → {wp.name}: {distance_matrix[0][i+1]}s")
         
         # Optimize route (with optional fixed end waypoint)
-        optimized_waypoints = route_optimizer.solve_tsp(
+        optimized_waypoints = await route_optimizer.solve_tsp_async(
             waypoints,
             distance_matrix,
             request.constraints,
@@ -38,6 +38,17 @@ class Settings(BaseSettings):
     # Google Maps
     MAX_WAYPOINTS_IN_URL: int = 9
     DISTANCE_MATRIX_CACHE_TTL: int = 60 * 60 * 24 * 30  # 30 days
+    # A place's id and coordinates never change; ranked alternatives and hours drift
+    GEOCODE_CACHE_TTL: int = 60 * 60 * 24 * 30  # 30 days
+    GEOCODE_ALTERNATIVES_TTL: int = 60 * 60 * 24 * 7  # 7 days
+    GEOCODE_NEGATIVE_CACHE_TTL: int = 60 * 5  # 5 minutes for queries with no match
+    PLACE_DETAILS_CACHE_TTL: int = 60 * 60 * 24  # 1 day; opening hours can change
+    PLACES_MAX_CONCURRENCY: int = 32  # In-flight Places requests per process
+    
+    # OpenAI
+    VISION_MAX_CONCURRENCY: int = 8  # In-flight Vision requests per upload batch
+    VISION_CACHE_TTL: int = 60 * 60 * 24 * 7  # 7 days of answers per image digest
+    VISION_SKIP_THRESHOLD: float = 0.9  # OCR confidence that makes the Vision call unnecessary
     
     # Feature Flags
     USE_MOCK_VISION: bool = False  # Set to True to use mock vision service (no API calls)
@@ -0,0 +1,32 @@
+import googlemaps
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import settings
+
+
+def _build_session() -> requests.Session:
+    """Build a pooled HTTP session so concurrent calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=50,
+        # Past pool_maxsize, wait for a pooled connection rather than open one
+        # (and pay a TLS handshake) that urllib3 would discard afterwards
+        pool_block=True,
+        max_retries=Retry(total=3, backoff_factor=0.2)
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Create Google Maps client (shared by services and API routes)
+gmaps_client = googlemaps.Client(
+    key=settings.GOOGLE_MAPS_API_KEY,
+    requests_session=_build_session()
+)
+
+
+def get_gmaps():
+    """Get Google Maps client instance."""
+    return gmaps_client
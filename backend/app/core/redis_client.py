@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 from .config import settings
 
 # Create Redis client
@@ -9,7 +10,20 @@ redis_client = redis.from_url(
     socket_timeout=5
 )
 
+# Asyncio client for coroutine callers, so cache I/O does not block the event loop
+async_redis_client = redis.asyncio.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_connect_timeout=5,
+    socket_timeout=5
+)
+
 
 def get_redis():
     """Get Redis client instance."""
     return redis_client
+
+
+def get_async_redis():
+    """Get asyncio Redis client instance."""
+    return async_redis_client
@@ -6,6 +6,9 @@ import logging
 from .core.config import settings
 from .core.database import engine, Base
 from .api import auth, trips, places
+from .services.geocoding_service import close_geocoding_service
+from .services.route_optimizer import shutdown_solver_pool
+from .services.vision_service import vision_service
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +30,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Plan_A Backend...")
+    await close_geocoding_service()
+    await vision_service.aclose()
+    shutdown_solver_pool()
 
 
 # Create FastAPI app
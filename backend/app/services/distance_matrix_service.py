@@ -1,29 +1,34 @@
 import logging
 import hashlib
-import json
-from typing import List, Optional, Dict, Any
-import googlemaps
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
+import orjson
 from googlemaps.exceptions import ApiError
 
 from ..core.config import settings
+from ..core.gmaps_client import get_gmaps
 from ..core.redis_client import get_redis
 from ..db.models import Waypoint
 from ..models.schemas import LatLng
 
 logger = logging.getLogger(__name__)
 
+# Google caps one Distance Matrix request at 25 origins, 25 destinations and 100 elements
+MAX_PLACES_PER_REQUEST = 25
+MAX_ELEMENTS_PER_REQUEST = 100
+
 
 class DistanceMatrixService:
     """Service for calculating distances between waypoints with walking or transit."""
     
     def __init__(self):
-        self.client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+        self.client = get_gmaps()
         self.redis = get_redis()
     
     def _get_cache_key(self, origin: str, destination: str, mode: str = "walking") -> str:
         """Generate cache key for distance between two points."""
         key_str = f"{origin}:{destination}:{mode}"
-        return f"distance:{hashlib.md5(key_str.encode()).hexdigest()}"
+        return f"distance:{hashlib.blake2b(key_str.encode(), digest_size=16).hexdigest()}"
     
     def _get_distance(
         self, 
@@ -50,7 +55,7 @@ class DistanceMatrixService:
         try:
             cached = self.redis.get(cache_key)
             if cached:
-                parsed = json.loads(cached)
+                parsed = orjson.loads(cached)
                 # Handle legacy integer format (old cache entries)
                 if isinstance(parsed, (int, float)):
                     logger.debug(f"Cache hit (legacy int format): {origin_str} -> {dest_str}")
@@ -76,18 +81,7 @@ class DistanceMatrixService:
             if result["status"] == "OK":
                 element = result["rows"][0]["elements"][0]
                 if element["status"] == "OK":
-                    # Handle both dict format {"value": x} and direct int format
-                    duration = element.get("duration", {})
-                    duration_seconds = duration["value"] if isinstance(duration, dict) else duration
-                    distance = element.get("distance", {})
-                    distance_meters = distance.get("value", 0) if isinstance(distance, dict) else (distance or 0)
-                    
-                    distance_info = {
-                        "duration_seconds": duration_seconds,
-                        "distance_meters": distance_meters,
-                        "mode": mode,
-                        "transit_details": None
-                    }
+                    distance_info = self._parse_element(element, mode)
                     
                     # For transit, try to get route details
                     if mode == "transit":
@@ -100,7 +94,7 @@ class DistanceMatrixService:
                         self.redis.setex(
                             cache_key,
                             settings.DISTANCE_MATRIX_CACHE_TTL,
-                            json.dumps(distance_info)
+                            orjson.dumps(distance_info)
                         )
                     except Exception as e:
                         logger.warning(f"Redis cache write error: {e}")
@@ -108,34 +102,7 @@ class DistanceMatrixService:
                     return distance_info
             
             # If API call fails, estimate using straight-line distance
-            from math import radians, cos, sin, asin, sqrt
-            
-            lat1, lon1 = radians(origin.lat), radians(origin.lng)
-            lat2, lon2 = radians(destination.lat), radians(destination.lng)
-            
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a))
-            distance_meters = 6371000 * c  # Earth radius in meters
-            
-            # Estimate time based on mode
-            if mode == "transit":
-                # Assume average transit speed of 30 km/h including wait times
-                # Minimum 60 seconds (can't be instant)
-                estimated_seconds = max(60, int((distance_meters * 1.2) / 8.3))  # ~30 km/h
-            else:
-                # Walking: 1.4 m/s with street network factor
-                # Minimum 30 seconds
-                estimated_seconds = max(30, int((distance_meters * 1.3) / 1.4))
-            
-            logger.warning(f"Using estimated distance ({mode}): {estimated_seconds}s for {int(distance_meters)}m")
-            return {
-                "duration_seconds": estimated_seconds,
-                "distance_meters": int(distance_meters),
-                "mode": mode,
-                "transit_details": None
-            }
+            return self._estimate_distance(origin, destination, mode)
             
         except ApiError as e:
             logger.error(f"Google Distance Matrix API error: {e}")
@@ -144,6 +111,115 @@ class DistanceMatrixService:
             logger.error(f"Error calculating distance: {e}")
             raise
     
+    def _parse_element(self, element: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        """
+        Convert one OK Distance Matrix element into a cacheable distance entry.
+        
+        Args:
+            element: Element from a Distance Matrix response row
+            mode: "walking" or "transit"
+            
+        Returns:
+            Dict with duration_seconds, distance_meters, mode and transit_details
+        """
+        # Handle both dict format {"value": x} and direct int format
+        duration = element.get("duration", {})
+        duration_seconds = duration["value"] if isinstance(duration, dict) else duration
+        distance = element.get("distance", {})
+        distance_meters = distance.get("value", 0) if isinstance(distance, dict) else (distance or 0)
+        
+        return {
+            "duration_seconds": duration_seconds,
+            "distance_meters": distance_meters,
+            "mode": mode,
+            "transit_details": None
+        }
+    
+    def _estimate_distance(
+        self,
+        origin: LatLng,
+        destination: LatLng,
+        mode: str = "walking"
+    ) -> Dict[str, Any]:
+        """
+        Estimate distance/duration from the straight-line distance.
+        
+        Args:
+            origin: Starting point
+            destination: Ending point
+            mode: "walking" or "transit"
+            
+        Returns:
+            Dict with duration_seconds, distance_meters, mode and transit_details
+        """
+        from math import radians, cos, sin, asin, sqrt
+        
+        lat1, lon1 = radians(origin.lat), radians(origin.lng)
+        lat2, lon2 = radians(destination.lat), radians(destination.lng)
+        
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+        c = 2 * asin(sqrt(a))
+        distance_meters = 6371000 * c  # Earth radius in meters
+        
+        # Estimate time based on mode
+        if mode == "transit":
+            # Assume average transit speed of 30 km/h including wait times
+            # Minimum 60 seconds (can't be instant)
+            estimated_seconds = max(60, int((distance_meters * 1.2) / 8.3))  # ~30 km/h
+        else:
+            # Walking: 1.4 m/s with street network factor
+            # Minimum 30 seconds
+            estimated_seconds = max(30, int((distance_meters * 1.3) / 1.4))
+        
+        logger.warning(f"Using estimated distance ({mode}): {estimated_seconds}s for {int(distance_meters)}m")
+        return {
+            "duration_seconds": estimated_seconds,
+            "distance_meters": int(distance_meters),
+            "mode": mode,
+            "transit_details": None
+        }
+    
+    def _get_cached_distances(self, cache_keys: List[str]) -> List[Optional[Any]]:
+        """
+        Look up several cached distances in one MGET round trip.
+        
+        Args:
+            cache_keys: Redis keys to fetch
+            
+        Returns:
+            Decoded entry per key, or None for misses and unreadable entries
+        """
+        try:
+            values = self.redis.mget(cache_keys)
+        except Exception as e:
+            logger.warning(f"Redis cache read error: {e}")
+            return [None] * len(cache_keys)
+        
+        decoded = []
+        for value in values:
+            try:
+                decoded.append(orjson.loads(value) if value else None)
+            except ValueError:
+                decoded.append(None)
+        return decoded
+    
+    def _set_cached_distances(self, entries: Dict[str, Any]) -> None:
+        """
+        Write several distances to the cache in one pipelined round trip.
+        
+        Args:
+            entries: Distance entries keyed by Redis key
+        """
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for cache_key, distance_info in entries.items():
+                pipe.setex(cache_key, settings.DISTANCE_MATRIX_CACHE_TTL, orjson.dumps(distance_info))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis cache write error: {e}")
+    
     def _get_transit_details(
         self, 
         origin: LatLng, 
@@ -235,36 +311,12 @@ class DistanceMatrixService:
         matrix = [[0] * n for _ in range(n)]
         transit_details = {}
         
-        # Calculate distances
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    matrix[i][j] = 0
-                else:
-                    try:
-                        distance_info = self._get_distance(points[i], points[j], mode)
-                        matrix[i][j] = distance_info["duration_seconds"]
-                        
-                        # Store transit details for route visualization
-                        if mode == "transit" and distance_info.get("transit_details"):
-                            transit_details[f"{i}-{j}"] = distance_info["transit_details"]
-                            
-                    except Exception as e:
-                        logger.error(f"Failed to get distance {i}->{j}: {e}")
-                        # Use fallback: estimate based on straight-line distance
-                        from math import radians, cos, sin, asin, sqrt
-                        p1, p2 = points[i], points[j]
-                        lat1, lon1 = radians(p1.lat), radians(p1.lng)
-                        lat2, lon2 = radians(p2.lat), radians(p2.lng)
-                        dlat = lat2 - lat1
-                        dlon = lon2 - lon1
-                        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-                        c = 2 * asin(sqrt(a))
-                        distance_meters = 6371000 * c
-                        # Estimate walking time: 1.4 m/s with 1.3x factor for street network
-                        estimated_seconds = max(30, int((distance_meters * 1.3) / 1.4))
-                        matrix[i][j] = estimated_seconds
-                        logger.warning(f"Using estimated distance {i}->{j}: {estimated_seconds}s for {int(distance_meters)}m")
+        for (i, j), distance_info in self._get_pair_distances(points, mode).items():
+            matrix[i][j] = distance_info["duration_seconds"]
+            
+            # Store transit details for route visualization
+            if mode == "transit" and distance_info.get("transit_details"):
+                transit_details[f"{i}-{j}"] = distance_info["transit_details"]
         
         logger.info(f"Distance matrix calculated: {n}×{n} ({mode} mode)")
         
@@ -278,6 +330,111 @@ class DistanceMatrixService:
             "mode": mode
         }
     
+    def get_matrix(
+        self,
+        locations: List[LatLng],
+        mode: str = "walking"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get durations and distances between every pair of locations.
+        
+        Args:
+            locations: Points to connect (used as both origins and destinations)
+            mode: "walking" or "transit"
+            
+        Returns:
+            Tuple of (durations in seconds, distances in meters) as N×N int arrays
+        """
+        n = len(locations)
+        durations = np.zeros((n, n), dtype=np.int64)
+        distances = np.zeros((n, n), dtype=np.int64)
+        for (i, j), distance_info in self._get_pair_distances(locations, mode).items():
+            durations[i, j] = distance_info["duration_seconds"]
+            distances[i, j] = distance_info.get("distance_meters", 0)
+        return durations, distances
+    
+    def _get_pair_distances(
+        self,
+        locations: List[LatLng],
+        mode: str = "walking"
+    ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """
+        Get a distance entry for every ordered pair of distinct locations.
+        
+        Cached pairs come from one MGET. Origins with any miss are fetched with
+        batched origins × destinations requests, split to stay within the API's
+        per-request limits, and the new entries are written back in one pipeline.
+        Elements the API cannot route, and tiles whose request fails, are estimated
+        from the straight-line distance and not cached.
+        
+        Args:
+            locations: Points to connect (used as both origins and destinations)
+            mode: "walking" or "transit"
+            
+        Returns:
+            Dict of (origin index, destination index) -> distance entry
+        """
+        n = len(locations)
+        point_strs = [f"{p.lat},{p.lng}" for p in locations]
+        pairs = [(i, j) for i in range(n) for j in range(n) if i != j]
+        if not pairs:
+            return {}
+        
+        cached = self._get_cached_distances([
+            self._get_cache_key(point_strs[i], point_strs[j], mode) for i, j in pairs
+        ])
+        entries = {}
+        missing_origins = set()
+        for pair, distance_info in zip(pairs, cached):
+            # Misses and legacy-format entries are refetched and overwritten
+            if isinstance(distance_info, dict) and "duration_seconds" in distance_info:
+                entries[pair] = distance_info
+            else:
+                missing_origins.add(pair[0])
+        
+        origins = sorted(missing_origins)
+        dest_step = min(n, MAX_PLACES_PER_REQUEST)
+        origin_step = min(MAX_PLACES_PER_REQUEST, MAX_ELEMENTS_PER_REQUEST // dest_step)
+        fetched = {}
+        for d in range(0, n, dest_step):
+            dest_idx = range(d, min(n, d + dest_step))
+            for o in range(0, len(origins), origin_step):
+                origin_idx = origins[o:o + origin_step]
+                try:
+                    result = self.client.distance_matrix(
+                        origins=[point_strs[i] for i in origin_idx],
+                        destinations=[point_strs[j] for j in dest_idx],
+                        mode=mode
+                    )
+                    rows = result["rows"] if result["status"] == "OK" else []
+                except Exception as e:
+                    logger.error(f"Google Distance Matrix API error: {e}")
+                    rows = []
+                
+                for row_index, i in enumerate(origin_idx):
+                    elements = rows[row_index].get("elements", []) if row_index < len(rows) else []
+                    for element_index, j in enumerate(dest_idx):
+                        if i == j or (i, j) in entries:
+                            continue
+                        element = elements[element_index] if element_index < len(elements) else {}
+                        if element.get("status") != "OK":
+                            entries[(i, j)] = self._estimate_distance(locations[i], locations[j], mode)
+                            continue
+                        
+                        distance_info = self._parse_element(element, mode)
+                        # Directions has no batch form, so transit steps are fetched per pair
+                        if mode == "transit":
+                            transit_details = self._get_transit_details(locations[i], locations[j])
+                            if transit_details:
+                                distance_info["transit_details"] = transit_details
+                        entries[(i, j)] = distance_info
+                        fetched[self._get_cache_key(point_strs[i], point_strs[j], mode)] = distance_info
+        
+        if fetched:
+            self._set_cached_distances(fetched)
+        logger.info(f"Distance matrix entries: {n}×{n} ({mode} mode), {len(origins)} origins from API")
+        return entries
+    
     def compare_modes(
         self,
         origin: LatLng,
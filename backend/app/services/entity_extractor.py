@@ -1,21 +1,55 @@
 """Entity extraction service for identifying locations from text."""
 import logging
 import re
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from ..models.schemas import CandidateLocation
 from ..utils.text_utils import extract_location_mentions, remove_emojis
 
 logger = logging.getLogger(__name__)
 
+# Whole-text scans, compiled once at import rather than per call.
+# Superset of what any pass but the pin pass can match on emoji-free text: a
+# hashtag, "@" or "at <Capital>" mention, or a capitalized word of 3+ letters.
+_EXTRACTION_TRIGGER_RE = re.compile(r'[#@]|at\s+[A-Z]|[A-Z][a-z]{2,}')
+_HASHTAG_RE = re.compile(r'#([A-Z][A-Za-z]+)')
+_CAMEL_CASE_WORD_RE = re.compile(r'[A-Z][a-z]*')
+_PROPER_NOUN_RE = re.compile(
+    r'\b(?P<multi>[A-Z][a-z]{2,}(?:\s+[A-Z][a-z]+)+)\b'
+    r'|\b(?P<single>[A-Z][a-z]{3,})\b'
+)
+_SINGLE_WORD_PROPER_NOUN_RE = re.compile(r'\b([A-Z][a-z]{3,})\b')
+# "at" or "@" followed by a proper noun, up to a line break or punctuation
+_AT_MENTION_RE = re.compile(r'(?:^|\s)(?:at|@)\s+([A-Z][A-Za-z\s\-\']+?)(?:\s*(?:\n|,|!|\.|$))')
+
+# Pin chunk cleanup. Hashtags and the "|", "•", "-", "–", "—" separators are
+# folded into one alternation so each chunk is cut in a single scan.
+_PIN_LEADING_PUNCT_RE = re.compile(r"^[\s:;,\-–—•|>]+")
+_PIN_TRAILER_RE = re.compile(r"#|\s[|•]\s|\s[-–—]\s")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Leading words that mark a phrase rather than a place ("My Favorite Cafe").
+# \s accepts every separator the proper-noun scan can span, \xa0 included.
+_STOP_START_RE = re.compile(r"(?:my|this|that|the|a|an|i|we|you|they)\s")
+_ALPHANUMERIC_RE = re.compile(r"[A-Za-z0-9]")
+
+# Candidate descriptions, one per extraction source.
+_PIN_DESCRIPTION = "Location pin from image"
+_MENTION_DESCRIPTION = "Location mention from image"
+_HASHTAG_DESCRIPTION = "Hashtag location from image"
+_PROPER_NOUN_DESCRIPTION = "Potential location name"
+
 
 class EntityExtractor:
     """Service for extracting location entities from text with confidence scoring."""
 
+    # Stateless: all configuration lives in the frozen class constants below.
+    __slots__ = ()
+
     # Social captions commonly use either of these to denote a tagged location.
     PIN_EMOJIS = ("📍", "📌")
     
     # Common non-location keywords to filter out
-    NON_LOCATION_KEYWORDS = {
+    NON_LOCATION_KEYWORDS = frozenset({
         # Social media terms
         'like', 'love', 'follow', 'subscribe', 'comment', 'share', 'click',
         'link', 'bio', 'dm', 'tag', 'check', 'out', 'new', 'video', 'photo',
@@ -36,19 +70,19 @@ class EntityExtractor:
         'the', 'and', 'for', 'with', 'from', 'this', 'that', 'here', 'there', 'where',
         'what', 'when', 'how', 'why', 'who', 'which', 'more', 'most', 'some', 'many',
         'far', 'near', 'close', 'spent', 'views', 'rooftop', 'basically',
-    }
+    })
     
     # Minimum length for proper noun extraction
     MIN_LOCATION_LENGTH = 4
 
     # Common short location abbreviations that appear in social captions / OCR.
     # Keep this list tight to avoid false positives from random OCR fragments.
-    COMMON_LOCATION_ABBREVIATIONS = {
+    COMMON_LOCATION_ABBREVIATIONS = frozenset({
         "NYC", "LA", "SF", "DC", "NY",
-    }
+    })
     
     # Words that indicate a location when present
-    LOCATION_INDICATOR_WORDS = {
+    LOCATION_INDICATOR_WORDS = frozenset({
         'cafe', 'café', 'restaurant', 'bar', 'pub', 'grill', 'kitchen', 'diner',
         'bakery', 'pizzeria', 'bistro', 'eatery', 'tavern', 'lounge',
         'tower', 'museum', 'park', 'square', 'plaza', 'garden', 'market',
@@ -58,7 +92,13 @@ class EntityExtractor:
         'building', 'center', 'centre', 'mall', 'shop', 'store', 'theater', 'theatre',
         'library', 'church', 'temple', 'mosque', 'cathedral', 'palace', 'castle',
         'dumpling', 'noodle', 'taco', 'sushi', 'ramen', 'espresso', 'rooftop',
-    }
+    })
+    
+    # Indicator words as one alternation: a single substring scan replaces an
+    # `in` test per word. Substring semantics are intentional ("Barcelona").
+    _LOCATION_INDICATOR_RE = re.compile(
+        "|".join(map(re.escape, sorted(LOCATION_INDICATOR_WORDS)))
+    )
     
     def extract_from_ocr_result(
         self,
@@ -79,44 +119,66 @@ class EntityExtractor:
         if not text:
             return []
         
+        # The mention pass reads emoji-free text, so the guard scans that same copy
+        # (emoji can sit between "at" and the name). Pins are emoji themselves.
+        clean_text = remove_emojis(text)
+        
+        # Most OCR text carries no pin, hashtag, mention or capitalized word;
+        # one scan for any of them skips the four extraction passes.
+        has_pin = any(pin in text for pin in self.PIN_EMOJIS)
+        if not has_pin and not _EXTRACTION_TRIGGER_RE.search(clean_text):
+            return []
+        
+        # Names and confidences below are produced by this extractor and are
+        # always valid, so candidates skip pydantic validation.
         candidates = []
+        # Lowercased names already emitted; replaces a rescan of `candidates`
+        # for every new name.
+        seen_names = set()
         
         # Extract location pins (highest confidence)
         pin_locations = self._extract_location_pins(text)
         for loc in pin_locations:
-            candidates.append(CandidateLocation(
+            seen_names.add(loc.lower().strip())
+            candidates.append(CandidateLocation.model_construct(
                 name=loc,
-                description=f"Location pin from image",
+                description=_PIN_DESCRIPTION,
                 confidence=0.95  # Very high confidence
             ))
         
         # Extract "at [Location]" patterns (high confidence)
-        at_locations = self._extract_at_mentions(text)
+        at_locations = self._extract_at_mentions(clean_text)
         for loc in at_locations:
-            if not self._is_already_extracted(loc, candidates):
-                candidates.append(CandidateLocation(
+            key = loc.lower().strip()
+            if key not in seen_names:
+                seen_names.add(key)
+                candidates.append(CandidateLocation.model_construct(
                     name=loc,
-                    description=f"Location mention from image",
+                    description=_MENTION_DESCRIPTION,
                     confidence=0.80
                 ))
         
         # Extract hashtag locations (medium confidence)
         hashtag_locations = self._extract_hashtag_locations(text)
         for loc in hashtag_locations:
-            if not self._is_already_extracted(loc, candidates):
-                candidates.append(CandidateLocation(
+            key = loc.lower().strip()
+            if key not in seen_names:
+                seen_names.add(key)
+                candidates.append(CandidateLocation.model_construct(
                     name=loc,
-                    description=f"Hashtag location from image",
+                    description=_HASHTAG_DESCRIPTION,
                     confidence=0.65
                 ))
         
         # Extract capitalized place names (lower confidence)
         proper_nouns = self._extract_proper_nouns(text)
         for loc in proper_nouns:
-            if not self._is_already_extracted(loc, candidates) and self._is_likely_location(loc):
-                candidates.append(CandidateLocation(
+            key = loc.lower().strip()
+            if key not in seen_names and self._is_likely_location(loc):
+                seen_names.add(key)
+                candidates.append(CandidateLocation.model_construct(
                     name=loc,
-                    description=f"Potential location name",
+                    description=_PROPER_NOUN_DESCRIPTION,
                     confidence=0.50
                 ))
         
@@ -134,7 +196,7 @@ class EntityExtractor:
         We treat the pin as a strong signal and extract the chunk that follows it,
         trimming common caption separators and hashtags.
         """
-        if not text:
+        if not text or not any(pin in text for pin in self.PIN_EMOJIS):
             return []
 
         results: List[str] = []
@@ -151,21 +213,18 @@ class EntityExtractor:
                 # Allow multiple pins on one line: "📍 A ... 📍 B ..."
                 parts = line.split(pin)
                 for raw in parts[1:]:
-                    chunk = raw.strip()
-                    # Drop leading punctuation that often follows the pin.
-                    chunk = re.sub(r"^[\s:;,\-–—•|>]+", "", chunk).strip()
+                    # Drop leading whitespace/punctuation that often follows the pin.
+                    chunk = _PIN_LEADING_PUNCT_RE.sub("", raw)
 
-                    # Strip hashtags and common caption separators/trailers.
-                    chunk = chunk.split("#", 1)[0].strip()
-                    chunk = re.split(r"\s[|•]\s", chunk, maxsplit=1)[0].strip()
-                    chunk = re.split(r"\s-\s|\s–\s|\s—\s", chunk, maxsplit=1)[0].strip()
+                    # Cut at the first hashtag or caption separator/trailer.
+                    chunk = _PIN_TRAILER_RE.split(chunk, maxsplit=1)[0]
 
                     # Final cleanup.
-                    chunk = re.sub(r"\s+", " ", chunk).strip(" \t:;,.")
+                    chunk = _WHITESPACE_RE.sub(" ", chunk).strip(" \t:;,.")
 
                     if len(chunk) <= 2:
                         continue
-                    if not re.search(r"[A-Za-z0-9]", chunk):
+                    if not _ALPHANUMERIC_RE.search(chunk):
                         continue
 
                     results.append(chunk)
@@ -182,14 +241,9 @@ class EntityExtractor:
 
         return deduped
     
-    def _extract_at_mentions(self, text: str) -> List[str]:
-        """Extract locations from 'at [Location]' or '@ [Location]' patterns."""
-        # Remove emojis first for cleaner matching
-        clean_text = remove_emojis(text)
-        
-        # Pattern: "at" or "@" followed by proper noun
-        pattern = r'(?:^|\s)(?:at|@)\s+([A-Z][A-Za-z\s\-\']+?)(?:\s*(?:\n|,|!|\.|$))'
-        matches = re.findall(pattern, clean_text)
+    def _extract_at_mentions(self, clean_text: str) -> List[str]:
+        """Extract locations from 'at [Location]' or '@ [Location]' patterns in emoji-free text."""
+        matches = _AT_MENTION_RE.findall(clean_text)
         
         cleaned = []
         for match in matches:
@@ -202,9 +256,11 @@ class EntityExtractor:
     
     def _extract_hashtag_locations(self, text: str) -> List[str]:
         """Extract location names from hashtags."""
+        if '#' not in text:
+            return []
+        
         # Pattern: #[ProperNoun] or #[location_name]
-        pattern = r'#([A-Z][A-Za-z]+)'
-        matches = re.findall(pattern, text)
+        matches = _HASHTAG_RE.findall(text)
         
         # Filter out common non-location hashtags
         filtered = []
@@ -212,7 +268,7 @@ class EntityExtractor:
             lower_match = match.lower()
             if lower_match not in self.NON_LOCATION_KEYWORDS and len(match) > 2:
                 # Split camelCase hashtags
-                words = re.findall(r'[A-Z][a-z]*', match)
+                words = _CAMEL_CASE_WORD_RE.findall(match)
                 if words:
                     filtered.append(' '.join(words))
         
@@ -220,87 +276,46 @@ class EntityExtractor:
     
     def _extract_proper_nouns(self, text: str) -> List[str]:
         """Extract capitalized words that might be locations."""
-        # Pattern: Words starting with capital letter (minimum 2 words or location indicator)
-        pattern = r'\b([A-Z][a-z]{2,}(?:\s+[A-Z][a-z]+)+)\b'
-        multi_word_matches = re.findall(pattern, text)
-        
-        # Also look for single words that contain location indicators
-        single_pattern = r'\b([A-Z][a-z]{3,})\b'
-        single_matches = re.findall(single_pattern, text)
-        
-        # Filter and clean
-        filtered = []
+        # One pass over the text: a capitalized phrase (minimum 2 words) wins
+        # at a given position, otherwise a lone capitalized word is taken.
+        multi_word_matches = []
+        single_matches = []
+        for m in _PROPER_NOUN_RE.finditer(text):
+            if m.lastgroup == "multi":
+                match = m.group("multi")
+                # Multi-word proper nouns are more likely to be locations
+                if self._is_likely_location(match, is_multi_word=True):
+                    multi_word_matches.append(match)
+                else:
+                    # A rejected phrase can still hold a usable single word,
+                    # e.g. "Tower" in "The Eiffel Tower".
+                    single_matches.extend(_SINGLE_WORD_PROPER_NOUN_RE.findall(match))
+            else:
+                single_matches.append(m.group("single"))
         
-        # Multi-word proper nouns are more likely to be locations
-        for match in multi_word_matches:
-            if self._is_likely_location(match, is_multi_word=True):
-                filtered.append(match)
+        filtered = multi_word_matches
         
+        # Words already covered by an accepted multi-word match, hashed once
+        # so the single-word pass below is O(1) per match.
+        seen = set(filtered)
+        seen.update(word for m in filtered for word in m.split())
+
         # Single words only if they contain location indicators
         for match in single_matches:
+            if match in seen:
+                continue
             if self._is_likely_location(match, is_multi_word=False):
-                # Only add if not already in filtered (from multi-word)
-                if match not in filtered and not any(match in m for m in filtered):
-                    filtered.append(match)
+                filtered.append(match)
+                seen.add(match)
         
         return filtered
     
     def _is_likely_location(self, text: str, is_multi_word: bool = False) -> bool:
         """Heuristic check if text is likely a location name."""
-        text_lower = text.lower().strip()
-        words = text_lower.split()
-        
-        # Allow a few common short abbreviations (e.g., "NYC") that otherwise fail heuristics.
-        if text.strip().upper() in self.COMMON_LOCATION_ABBREVIATIONS:
-            return True
-
-        # Must be at least MIN_LOCATION_LENGTH characters
-        if len(text) < self.MIN_LOCATION_LENGTH:
-            logger.debug(f"Rejected '{text}': too short")
-            return False
-        
-        # Filter out common non-location words (check each word)
-        for word in words:
-            if word in self.NON_LOCATION_KEYWORDS:
-                logger.debug(f"Rejected '{text}': contains non-location word '{word}'")
-                return False
-        
-        # Filter out if it starts with common verbs/adjectives
-        if words[0] in {'my', 'this', 'that', 'the', 'a', 'an', 'i', 'we', 'you', 'they'}:
-            logger.debug(f"Rejected '{text}': starts with common word")
-            return False
-        
-        # Check for location indicator words (high confidence)
-        has_location_indicator = any(
-            indicator in text_lower 
-            for indicator in self.LOCATION_INDICATOR_WORDS
-        )
-        
-        if has_location_indicator:
-            logger.debug(f"Accepted '{text}': has location indicator")
-            return True
-        
-        # For multi-word phrases, accept if no blocking keywords
-        if is_multi_word and len(words) >= 2:
-            # Accept multi-word proper nouns (e.g., "Jin Mei Dumpling", "Liberty Bagels")
-            logger.debug(f"Accepted '{text}': multi-word proper noun")
-            return True
-        
-        # Single words without location indicators are rejected
-        # This prevents "Ihe", "Wer", "Rare" etc. from being extracted
-        if not is_multi_word:
-            logger.debug(f"Rejected '{text}': single word without location indicator")
-            return False
-        
-        return False
-    
-    def _is_already_extracted(self, name: str, candidates: List[CandidateLocation]) -> bool:
-        """Check if location name is already in candidates list."""
-        name_lower = name.lower().strip()
-        for candidate in candidates:
-            if candidate.name.lower().strip() == name_lower:
-                return True
-        return False
+        accepted, reason = _location_verdict(text, is_multi_word)
+        if reason:
+            logger.debug("%s '%s': %s", "Accepted" if accepted else "Rejected", text, reason)
+        return accepted
     
     def extract_from_vision_result(
         self,
@@ -336,7 +351,7 @@ class EntityExtractor:
                     if c.name.lower().strip() == name_lower:
                         # Average the confidences with slight boost
                         c.confidence = min(0.98, (c.confidence + candidate.confidence) / 1.5)
-                        logger.info(f"Boosted confidence for '{c.name}' to {c.confidence:.2f}")
+                        logger.info("Boosted confidence for '%s' to %.2f", c.name, c.confidence)
                         break
             else:
                 combined.append(candidate)
@@ -348,5 +363,59 @@ class EntityExtractor:
         return combined
 
 
+@lru_cache(maxsize=4096)
+def _location_verdict(text: str, is_multi_word: bool) -> Tuple[bool, Optional[str]]:
+    """
+    Decide whether text looks like a location name, and why.
+    
+    Memoized at module level (OCR text repeats the same phrases across frames);
+    it depends only on the EntityExtractor class-level keyword tables.
+    
+    Returns:
+        (accepted, reason) where reason is None for abbreviation matches and
+        the trailing fall-through
+    """
+    # Strip once; the case-folded variants below reuse this buffer.
+    stripped = text.strip()
+    
+    # Allow a few common short abbreviations (e.g., "NYC") that otherwise fail heuristics.
+    if stripped.upper() in EntityExtractor.COMMON_LOCATION_ABBREVIATIONS:
+        return True, None
+
+    # Must be at least MIN_LOCATION_LENGTH characters
+    if len(stripped) < EntityExtractor.MIN_LOCATION_LENGTH:
+        return False, "too short"
+    
+    text_lower = stripped.lower()
+    
+    # Filter out if it starts with common verbs/adjectives
+    if _STOP_START_RE.match(text_lower):
+        return False, "starts with common word"
+    
+    # Only tokenize once the cheap prefix rejects have passed.
+    words = text_lower.split()
+    
+    # Filter out common non-location words (check each word)
+    for word in words:
+        if word in EntityExtractor.NON_LOCATION_KEYWORDS:
+            return False, f"contains non-location word '{word}'"
+    
+    # Check for location indicator words (high confidence)
+    if EntityExtractor._LOCATION_INDICATOR_RE.search(text_lower):
+        return True, "has location indicator"
+    
+    # For multi-word phrases, accept if no blocking keywords
+    if is_multi_word and len(words) >= 2:
+        # Accept multi-word proper nouns (e.g., "Jin Mei Dumpling", "Liberty Bagels")
+        return True, "multi-word proper noun"
+    
+    # Single words without location indicators are rejected
+    # This prevents "Ihe", "Wer", "Rare" etc. from being extracted
+    if not is_multi_word:
+        return False, "single word without location indicator"
+    
+    return False, None
+
+
 # Singleton instance
 entity_extractor = EntityExtractor()
@@ -1,12 +1,85 @@
 """Entity resolution service for deduplicating and merging location candidates."""
 import logging
-from typing import List, Optional
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from ..models.schemas import CandidateLocation
-from ..utils.text_utils import calculate_similarity, normalize_text
-from ..utils.geo_utils import are_locations_nearby, get_midpoint
+from ..utils.text_utils import normalize_text, similarity_matrix
+from ..utils.geo_utils import haversine_distance_matrix
 
 logger = logging.getLogger(__name__)
 
+# Rows per distance block in geo-clustering; bounds the matrix at BLOCK x n
+PROXIMITY_BLOCK_SIZE = 512
+
+# Conservative meters per degree for geo-clustering grid cells (true value ~111km)
+GRID_METERS_PER_DEGREE = 100000.0
+
+
+class _DisjointSet:
+    """Union-find over candidate indices (path compression + union by rank)."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+    
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression: point every node on the walk straight at the root
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+    
+    def union(self, i: int, j: int) -> None:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        if self.rank[root_i] < self.rank[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        if self.rank[root_i] == self.rank[root_j]:
+            self.rank[root_i] += 1
+    
+    def connected(self, i: int, j: int) -> bool:
+        return self.find(i) == self.find(j)
+    
+    def groups(self) -> List[List[int]]:
+        """Member indices per set, ordered by each set's lowest index."""
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self.find(i), []).append(i)
+        return list(groups.values())
+
+
+def _component_labels(size: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Label connected components of an edge list with vectorized min-label propagation.
+    
+    Every node repeatedly takes the smallest label among its edges, then labels
+    are pointer-jumped (labels[labels]) until nothing changes.
+    
+    Args:
+        size: Number of nodes
+        first: Edge start indices
+        second: Edge end indices
+        
+    Returns:
+        Array where each node holds the lowest node index in its component
+    """
+    labels = np.arange(size)
+    while True:
+        lowest = np.minimum(labels[first], labels[second])
+        updated = labels.copy()
+        np.minimum.at(updated, first, lowest)
+        np.minimum.at(updated, second, lowest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
 
 class EntityResolver:
     """Service for resolving duplicate entities and merging location candidates."""
@@ -42,9 +115,10 @@ class EntityResolver:
         
         original_count = len(candidates)
         original_names = [c.name for c in candidates]
+        norm_names = [normalize_text(name) for name in original_names]
         
         # Step 1: Text-based deduplication
-        text_merged = self._merge_by_text_similarity(candidates)
+        text_merged = self._merge_by_text_similarity(candidates, norm_names)
         logger.info(f"Text merging: {len(candidates)} → {len(text_merged)} candidates")
         
         # Step 2: Geo-based clustering (if coordinates available)
@@ -52,22 +126,31 @@ class EntityResolver:
         logger.info(f"Geo merging: {len(text_merged)} → {len(geo_merged)} candidates")
         
         # Step 3: Sort by confidence
-        geo_merged.sort(key=lambda x: x.confidence, reverse=True)
+        if len(geo_merged) > 1:
+            geo_merged.sort(key=lambda x: x.confidence, reverse=True)
         
-        # Track which names were merged as duplicates
+        # Track which names were merged as duplicates (none if the count is unchanged)
         duplicates_merged = []
         if track_duplicates and len(geo_merged) < original_count:
-            final_names = set(c.name.lower() for c in geo_merged)
-            for name in original_names:
-                if name.lower() not in final_names:
-                    # Check if it was merged into another name
-                    for final_name in final_names:
-                        if calculate_similarity(name.lower(), final_name) > self.similarity_threshold:
-                            duplicates_merged.append({
-                                "original": name,
-                                "merged_into": next(c.name for c in geo_merged if c.name.lower() == final_name)
-                            })
-                            break
+            final_by_name = {}
+            for c in geo_merged:
+                final_by_name.setdefault(normalize_text(c.name), c)
+            missing = [
+                (name, norm_name) for name, norm_name in zip(original_names, norm_names)
+                if norm_name not in final_by_name
+            ]
+            if missing:
+                # Check which name each was merged into, scoring all pairs in one call
+                final_candidates = list(final_by_name.values())
+                above = similarity_matrix(
+                    [norm_name for _, norm_name in missing], list(final_by_name)
+                ) > self.similarity_threshold
+                for (name, _), row in zip(missing, above):
+                    if row.any():
+                        duplicates_merged.append({
+                            "original": name,
+                            "merged_into": final_candidates[int(row.argmax())].name
+                        })
             
             if duplicates_merged:
                 logger.info(f"Duplicates merged: {duplicates_merged}")
@@ -79,59 +162,44 @@ class EntityResolver:
     
     def _merge_by_text_similarity(
         self,
-        candidates: List[CandidateLocation]
+        candidates: List[CandidateLocation],
+        norm_names: Optional[List[str]] = None
     ) -> List[CandidateLocation]:
         """
         Merge candidates with similar names.
         
         Args:
             candidates: List of candidates
+            norm_names: Precomputed normalize_text(name) per candidate (optional)
             
         Returns:
             List with text-based duplicates merged
         """
-        merged = []
-        used_indices = set()
+        if norm_names is None:
+            norm_names = [normalize_text(c.name) for c in candidates]
         
-        for i, candidate_i in enumerate(candidates):
-            if i in used_indices:
+        clusters = _DisjointSet(len(candidates))
+        
+        # Score every pair at once; pairs already in one cluster are skipped
+        similarities = similarity_matrix(norm_names)
+        rows, cols = np.nonzero(np.triu(similarities >= self.similarity_threshold, k=1))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            if clusters.connected(i, j):
                 continue
-            
-            # Start with this candidate
-            merged_candidate = CandidateLocation(
-                name=candidate_i.name,
-                description=candidate_i.description,
-                confidence=candidate_i.confidence,
-                google_place_id=candidate_i.google_place_id,
-                lat=candidate_i.lat,
-                lng=candidate_i.lng,
-                address=candidate_i.address,
-                opening_hours=candidate_i.opening_hours
+            clusters.union(i, j)
+            logger.info(
+                f"Merging '{candidates[i].name}' and '{candidates[j].name}' "
+                f"(similarity: {similarities[i, j]:.2f})"
             )
-            
-            similar_candidates = [candidate_i]
-            used_indices.add(i)
-            
-            # Find similar candidates
-            for j, candidate_j in enumerate(candidates):
-                if j in used_indices:
-                    continue
-                
-                similarity = calculate_similarity(candidate_i.name, candidate_j.name)
-                
-                if similarity >= self.similarity_threshold:
-                    similar_candidates.append(candidate_j)
-                    used_indices.add(j)
-                    logger.info(
-                        f"Merging '{candidate_i.name}' and '{candidate_j.name}' "
-                        f"(similarity: {similarity:.2f})"
-                    )
-            
-            # Merge similar candidates
-            if len(similar_candidates) > 1:
-                merged_candidate = self._merge_candidates(similar_candidates)
-            
-            merged.append(merged_candidate)
+        
+        merged = []
+        for group in clusters.groups():
+            if len(group) > 1:
+                # Merge similar candidates
+                merged.append(self._merge_candidates([candidates[k] for k in group]))
+            else:
+                # Unmatched candidates pass through as-is; no copy to validate
+                merged.append(candidates[group[0]])
         
         return merged
     
@@ -154,47 +222,119 @@ class EntityResolver:
         
         if not with_coords:
             return candidates
+        if len(with_coords) == 1:
+            # Nothing to cluster; skip building the grid
+            return with_coords + without_coords
         
-        merged = []
-        used_indices = set()
+        first, second = self._nearby_pairs(with_coords)
+        labels = _component_labels(len(with_coords), first, second)
         
-        for i, candidate_i in enumerate(with_coords):
-            if i in used_indices:
-                continue
-            
-            nearby_candidates = [candidate_i]
-            used_indices.add(i)
-            
-            # Find nearby candidates
-            for j, candidate_j in enumerate(with_coords):
-                if j in used_indices:
-                    continue
-                
-                if are_locations_nearby(
-                    candidate_i.lat, candidate_i.lng,
-                    candidate_j.lat, candidate_j.lng,
-                    self.geo_radius_meters
-                ):
-                    nearby_candidates.append(candidate_j)
-                    used_indices.add(j)
-                    logger.info(
-                        f"Geo-clustering '{candidate_i.name}' and '{candidate_j.name}' "
-                        f"(within {self.geo_radius_meters}m)"
-                    )
-            
-            # Merge nearby candidates
-            if len(nearby_candidates) > 1:
-                merged_candidate = self._merge_candidates(nearby_candidates)
+        # Each label is its cluster's lowest index, so groups keep first-seen order
+        groups = {}
+        for i, label in enumerate(labels.tolist()):
+            groups.setdefault(label, []).append(i)
+        
+        merged = []
+        for group in groups.values():
+            if len(group) > 1:
+                nearby_candidates = [with_coords[k] for k in group]
+                logger.info(
+                    f"Geo-clustering {[c.name for c in nearby_candidates]} "
+                    f"(within {self.geo_radius_meters}m)"
+                )
+                # Merge nearby candidates
+                merged.append(self._merge_candidates(nearby_candidates))
             else:
-                merged_candidate = candidate_i
-            
-            merged.append(merged_candidate)
+                merged.append(with_coords[group[0]])
         
         # Add candidates without coordinates
         merged.extend(without_coords)
         
         return merged
     
+    def _nearby_pairs(self, candidates: List[CandidateLocation]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find index pairs (i < j) of candidates within geo_radius_meters.
+        
+        Candidates are bucketed into a lat/lng grid with cells at least one radius
+        wide, so each one is only measured against its own and adjacent cells.
+        Distances within a neighbourhood are computed as vectorized blocks of
+        rows, so memory stays bounded by the block size even for dense cells.
+        
+        Args:
+            candidates: List of candidates, all with coordinates
+            
+        Returns:
+            Tuple of (first, second) index arrays, sorted by first then second
+        """
+        lats = np.array([c.lat for c in candidates], dtype=float)
+        lngs = np.array([c.lng for c in candidates], dtype=float)
+        cells, num_cols = self._grid_cells(lats, lngs)
+        
+        firsts, seconds = [], []
+        for (row, col), members in cells.items():
+            neighbour_cells = {
+                (row + d_row, (col + d_col) % num_cols)
+                for d_row in (-1, 0, 1)
+                for d_col in (-1, 0, 1)
+            }
+            neighbours = np.array(
+                [k for cell in neighbour_cells for k in cells.get(cell, ())]
+            )
+            members = np.array(members)
+            
+            for start in range(0, len(members), PROXIMITY_BLOCK_SIZE):
+                block = members[start:start + PROXIMITY_BLOCK_SIZE]
+                distances = haversine_distance_matrix(
+                    lats[block], lngs[block],
+                    lats[neighbours], lngs[neighbours]
+                )
+                rows, cols = np.nonzero(distances <= self.geo_radius_meters)
+                first, second = block[rows], neighbours[cols]
+                # Each pair is seen from both ends; keep it once
+                keep = first < second
+                firsts.append(first[keep])
+                seconds.append(second[keep])
+        
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+    
+    def _grid_cells(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray
+    ) -> Tuple[Dict[Tuple[int, int], List[int]], int]:
+        """
+        Bucket points into grid cells at least geo_radius_meters on each side.
+        
+        Args:
+            lats: Latitudes of the points
+            lngs: Longitudes of the points
+            
+        Returns:
+            Tuple of (cell -> point indices, number of longitude columns).
+            Column indices wrap around the antimeridian.
+        """
+        cell_lat = self.geo_radius_meters / GRID_METERS_PER_DEGREE
+        
+        # Longitude degrees shrink with cos(latitude); size columns for the worst case
+        max_abs_lat = min(90.0, float(np.max(np.abs(lats))) + cell_lat)
+        min_cos = math.cos(math.radians(max_abs_lat))
+        if min_cos * 360.0 <= cell_lat:
+            num_cols = 1
+        else:
+            num_cols = max(1, int(360.0 / (cell_lat / min_cos)))
+        cell_lng = 360.0 / num_cols
+        
+        rows = np.floor(lats / cell_lat).astype(int).tolist()
+        cols = (np.floor((lngs + 180.0) / cell_lng).astype(int) % num_cols).tolist()
+        
+        cells = defaultdict(list)
+        for i, cell in enumerate(zip(rows, cols)):
+            cells[cell].append(i)
+        return cells, num_cols
+    
     def _merge_candidates(
         self,
         candidates: List[CandidateLocation]
@@ -208,33 +348,58 @@ class EntityResolver:
         Returns:
             Single merged candidate
         """
-        # Use the name with highest confidence
-        best_candidate = max(candidates, key=lambda x: x.confidence)
+        # One pass over the group accumulates everything the merge needs
+        best_candidate = candidates[0]
+        total_confidence = 0.0
+        lat_sum = lng_sum = 0.0
+        coords_count = 0
+        coords_weight = 0.0
+        descriptions = {}  # ordered set of distinct descriptions
+        place_id = address = opening_hours = None
+        
+        for c in candidates:
+            # Use the name with highest confidence
+            if c.confidence > best_candidate.confidence:
+                best_candidate = c
+            total_confidence += c.confidence
+            if c.lat is not None and c.lng is not None:
+                lat_sum += c.lat * c.confidence
+                lng_sum += c.lng * c.confidence
+                coords_weight += c.confidence
+                coords_count += 1
+            if c.description:
+                descriptions[c.description] = None
+            # Prefer first place_id/address/opening_hours found
+            if place_id is None and c.google_place_id:
+                place_id = c.google_place_id
+            if address is None and c.address:
+                address = c.address
+            if opening_hours is None and c.opening_hours:
+                opening_hours = c.opening_hours
         
         # Aggregate confidence (boost for multiple sources)
         # Formula: average confidence * sqrt(num_sources) / sqrt(num_sources - 1)
         # This gives a boost for multiple sources without going over 1.0
-        avg_confidence = sum(c.confidence for c in candidates) / len(candidates)
+        avg_confidence = total_confidence / len(candidates)
         boost_factor = min(1.2, 1.0 + (len(candidates) - 1) * 0.1)  # Max 20% boost
         merged_confidence = min(0.98, avg_confidence * boost_factor)
         
-        # Average coordinates if multiple available
-        coords_list = [(c.lat, c.lng) for c in candidates if c.lat is not None and c.lng is not None]
-        if coords_list:
-            avg_lat = sum(lat for lat, _ in coords_list) / len(coords_list)
-            avg_lng = sum(lng for _, lng in coords_list) / len(coords_list)
+        # Confidence-weighted average of coordinates, so low-confidence noise
+        # pulls the merged point less far from the actual place
+        if coords_weight > 0:
+            avg_lat = lat_sum / coords_weight
+            avg_lng = lng_sum / coords_weight
+        elif coords_count:
+            # All sources at zero confidence: plain average
+            coords = [(c.lat, c.lng) for c in candidates if c.lat is not None and c.lng is not None]
+            avg_lat = sum(lat for lat, _ in coords) / coords_count
+            avg_lng = sum(lng for _, lng in coords) / coords_count
         else:
             avg_lat = None
             avg_lng = None
         
         # Combine descriptions
-        descriptions = [c.description for c in candidates if c.description]
-        combined_description = " | ".join(set(descriptions)) if descriptions else None
-        
-        # Prefer first place_id found
-        place_id = next((c.google_place_id for c in candidates if c.google_place_id), None)
-        address = next((c.address for c in candidates if c.address), None)
-        opening_hours = next((c.opening_hours for c in candidates if c.opening_hours), None)
+        combined_description = " | ".join(descriptions) if descriptions else None
         
         return CandidateLocation(
             name=best_candidate.name,
@@ -1,44 +1,255 @@
 """Geocoding service for resolving location names to coordinates."""
 import asyncio
 import logging
-import hashlib
-import json
-from typing import Optional, List, Dict, Any, Tuple
-import googlemaps
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+import httpx
+import numpy as np
+import orjson
 from googlemaps.exceptions import ApiError
-import concurrent.futures
 
 from ..core.config import settings
-from ..core.redis_client import get_redis
+from ..core.redis_client import get_async_redis
 from ..models.schemas import CandidateLocation
-from ..utils.geo_utils import haversine_distance
+from ..utils.geo_utils import haversine_distance_matrix
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for sync Google Maps API calls
-_geocode_executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+# Google Places web service base URL
+PLACES_API_URL = "https://maps.googleapis.com/maps/api/place"
+
+# Places API statuses that carry a usable (possibly empty) response
+_PLACES_OK_STATUSES = frozenset({"OK", "ZERO_RESULTS"})
+
+# In-process LRU in front of Redis for the hottest cache entries
+LOCAL_CACHE_MAX = 512
+# Seconds a local entry is served before going back to Redis
+LOCAL_CACHE_TTL = 600
+
+# Cached in place of a payload when Places has no match for a query
+NEGATIVE_CACHE_MARKER = "__MISS__"
 
 
 class GeocodingService:
     """Service for geocoding location names using Google Places API."""
     
     def __init__(self):
-        self.client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
-        self.redis = get_redis()
+        # Shared async HTTP client; keeps connections to the Places API alive across calls.
+        # The pool size caps in-flight Places requests across all batches and handlers;
+        # requests beyond it queue for a free connection instead of timing out.
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, pool=None),
+            limits=httpx.Limits(
+                max_connections=settings.PLACES_MAX_CONCURRENCY,
+                max_keepalive_connections=20,
+                # Keep idle connections warm between batches (httpx default is 5s)
+                keepalive_expiry=60.0
+            )
+        )
+        self.redis = get_async_redis()
         # Number of alternatives to return
         self.max_alternatives = 5
+        # Photo URLs only vary by width and reference; build the constant prefix once
+        self._photo_url_prefix = f"{PLACES_API_URL}/photo?key={settings.GOOGLE_MAPS_API_KEY}&maxwidth="
+        # Upstream lookups currently running, so concurrent batches share one call per query
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # Decoded cache entries as (expires_at, data), least recently used first.
+        # The service is a process-wide singleton, so access goes through a lock.
+        self._local_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._local_lock = threading.Lock()
     
     def _get_cache_key(self, query: str) -> str:
         """Generate cache key for a geocoding query."""
-        query_hash = hashlib.md5(query.lower().strip().encode()).hexdigest()
-        return f"geocode:{query_hash}"
+        # Queries are short, so the normalized text is the key; no digest to compute
+        return f"geocode:{query.lower().strip()}"
     
     def _get_alternatives_cache_key(self, query: str) -> str:
         """Generate cache key for alternatives query."""
-        query_hash = hashlib.md5(query.lower().strip().encode()).hexdigest()
-        return f"geocode_alt:{query_hash}"
+        return f"geocode_alt:{query.lower().strip()}"
+    
+    def _get_details_cache_key(self, place_id: str) -> str:
+        """Generate cache key for a place's details."""
+        return f"place_details:{place_id}"
+    
+    async def _places_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call a Google Places web service endpoint.
+        
+        Args:
+            endpoint: Endpoint name, e.g. "textsearch" or "details"
+            params: Query parameters (the API key is added here)
+            
+        Returns:
+            Parsed JSON response body
+            
+        Raises:
+            ApiError: If the API responds with an error status
+        """
+        response = await self.http.get(
+            f"{PLACES_API_URL}/{endpoint}/json",
+            params={**params, "key": settings.GOOGLE_MAPS_API_KEY}
+        )
+        response.raise_for_status()
+        body = orjson.loads(response.content)
+        
+        status = body.get("status")
+        if status not in _PLACES_OK_STATUSES:
+            raise ApiError(status, body.get("error_message"))
+        return body
+    
+    async def _fetch_shared(self, flight_key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an upstream lookup, joining an identical one already in flight.
+        
+        Args:
+            flight_key: Identifies the lookup (kind, cache key and any bias)
+            fetch: Zero-argument coroutine function performing the lookup
+            
+        Returns:
+            Result of the shared lookup
+        """
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = loop.create_task(fetch())
+            self._inflight[flight_key] = task
+            
+            def _forget(done: asyncio.Task) -> None:
+                if self._inflight.get(flight_key) is done:
+                    del self._inflight[flight_key]
+            
+            task.add_done_callback(_forget)
+        # Shield so one cancelled waiter does not cancel the lookup for the others
+        return await asyncio.shield(task)
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        await self.http.aclose()
+    
+    def _build_query(self, location: CandidateLocation) -> str:
+        """Build the Places text query for a candidate."""
+        return f"{location.name} {location.description or ''}".strip()
+    
+    def _apply_cached_location(
+        self,
+        location: CandidateLocation,
+        data: Dict[str, Any]
+    ) -> CandidateLocation:
+        """Enrich a candidate in place from a cached geocode payload."""
+        location.google_place_id = data["place_id"]
+        location.lat = data["lat"]
+        location.lng = data["lng"]
+        location.address = data.get("address")
+        # Entries written before hours moved to their own key may still carry them
+        location.opening_hours = data.get("opening_hours")
+        return location
+    
+    def _location_cache_data(self, location: CandidateLocation) -> Dict[str, Any]:
+        """
+        Build the cache payload for a geocoded candidate.
+        
+        Opening hours are left out: they change far more often than a place's
+        location and live under their own shorter-lived details key.
+        """
+        return {
+            "place_id": location.google_place_id,
+            "lat": location.lat,
+            "lng": location.lng,
+            "address": location.address
+        }
+    
+    def _local_get(self, cache_key: str) -> Optional[Any]:
+        """Get a live entry from the in-process cache, marking it recently used."""
+        with self._local_lock:
+            entry = self._local_cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._local_cache[cache_key]
+                return None
+            self._local_cache.move_to_end(cache_key)
+            return data
+    
+    def _local_set(self, cache_key: str, data: Any, ttl: int = LOCAL_CACHE_TTL) -> None:
+        """Store an entry in the in-process cache, evicting the least recently used."""
+        expires_at = time.monotonic() + min(ttl, LOCAL_CACHE_TTL)
+        with self._local_lock:
+            self._local_cache[cache_key] = (expires_at, data)
+            self._local_cache.move_to_end(cache_key)
+            while len(self._local_cache) > LOCAL_CACHE_MAX:
+                self._local_cache.popitem(last=False)
     
-    def geocode_location(self, location: CandidateLocation) -> Optional[CandidateLocation]:
+    async def _get_cached_many(self, cache_keys: List[str]) -> List[Optional[Any]]:
+        """
+        Look up several cache keys, in process first and then in one MGET round trip.
+        
+        Returned payloads may be shared with the in-process cache; treat them as read-only.
+        
+        Args:
+            cache_keys: Redis keys to fetch
+            
+        Returns:
+            Decoded payload per key, or None for misses and unreadable entries
+        """
+        decoded = [self._local_get(cache_key) for cache_key in cache_keys]
+        remote = [i for i, data in enumerate(decoded) if data is None]
+        if not remote:
+            return decoded
+        
+        try:
+            values = await self.redis.mget([cache_keys[i] for i in remote])
+        except Exception as e:
+            logger.warning(f"Redis cache read error: {e}")
+            return decoded
+        
+        for i, value in zip(remote, values):
+            if not value:
+                continue
+            try:
+                decoded[i] = orjson.loads(value)
+            except ValueError as e:
+                logger.warning(f"Redis cache read error: {e}")
+                continue
+            self._local_set(cache_keys[i], decoded[i])
+        return decoded
+    
+    async def _set_cached_many(self, entries: Dict[str, Any], ttl: int) -> None:
+        """
+        Write several cache entries in one pipelined round trip.
+        
+        Args:
+            entries: Mapping of Redis key to JSON-serializable payload
+            ttl: Expiry in seconds
+        """
+        for cache_key, data in entries.items():
+            self._local_set(cache_key, data, ttl)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for cache_key, data in entries.items():
+                    pipe.setex(cache_key, ttl, orjson.dumps(data))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis cache write error: {e}")
+    
+    async def _cache_not_found(self, cache_key: str) -> None:
+        """
+        Remember briefly that a query has no Places match.
+        
+        Typos and made-up names are retried often; a short-lived marker saves
+        the Places call without hiding a place that appears later for long.
+        
+        Args:
+            cache_key: Geocode or alternatives cache key of the query
+        """
+        await self._set_cached_many(
+            {cache_key: NEGATIVE_CACHE_MARKER},
+            ttl=settings.GEOCODE_NEGATIVE_CACHE_TTL
+        )
+    
+    async def geocode_location(self, location: CandidateLocation) -> Optional[CandidateLocation]:
         """
         Geocode a location and enrich it with Google Places data.
         Returns the first/best match only.
@@ -49,45 +260,61 @@ class GeocodingService:
         Returns:
             Enriched location with lat/lng, place_id, and details, or None if not found
         """
-        query = f"{location.name} {location.description or ''}".strip()
+        query = self._build_query(location)
         
         # Check cache first
         cache_key = self._get_cache_key(query)
-        try:
-            cached = self.redis.get(cache_key)
-            if cached:
-                logger.info(f"Cache hit for query: {query}")
-                data = json.loads(cached)
-                location.google_place_id = data["place_id"]
-                location.lat = data["lat"]
-                location.lng = data["lng"]
-                location.address = data.get("address")
-                location.opening_hours = data.get("opening_hours")
-                return location
-        except Exception as e:
-            logger.warning(f"Redis cache read error: {e}")
+        cached = (await self._get_cached_many([cache_key]))[0]
+        if cached == NEGATIVE_CACHE_MARKER:
+            logger.info(f"Cached no-match for query: {query}")
+            return None
+        if cached:
+            logger.info(f"Cache hit for query: {query}")
+            location = self._apply_cached_location(location, cached)
+            # Hours live under their own place_id key (see _location_cache_data)
+            if location.opening_hours is None:
+                location.opening_hours = await self._get_opening_hours(location.google_place_id)
+            return location
         
+        enriched = await self._fetch_location(location, query)
+        if enriched:
+            await self._set_cached_many(
+                {cache_key: self._location_cache_data(enriched)},
+                ttl=settings.GEOCODE_CACHE_TTL
+            )
+        return enriched
+    
+    async def _fetch_location(
+        self,
+        location: CandidateLocation,
+        query: str
+    ) -> Optional[CandidateLocation]:
+        """
+        Geocode a location via Google Places, bypassing the cache.
+        
+        Args:
+            location: Candidate location to enrich in place
+            query: Text query built from the location
+            
+        Returns:
+            Enriched location, or None if not found
+        """
         # Call Google Places Text Search
         try:
             logger.info(f"Geocoding query: {query}")
-            results = self.client.places(query=query)
+            results = await self._places_request("textsearch", {"query": query})
             
             if not results.get("results"):
                 logger.warning(f"No results found for: {query}")
+                await self._cache_not_found(self._get_cache_key(query))
                 return None
             
             # Get first result
             place = results["results"][0]
             place_id = place["place_id"]
             
-            # Get place details for opening hours (skip for speed if needed)
-            opening_hours = None
-            try:
-                details = self.client.place(place_id=place_id, fields=["opening_hours"])
-                if "result" in details and "opening_hours" in details["result"]:
-                    opening_hours = details["result"]["opening_hours"]
-            except Exception as e:
-                logger.warning(f"Failed to get opening hours: {e}")
+            # Get place details for opening hours
+            opening_hours = await self._get_opening_hours(place_id)
             
             # Enrich location
             location.google_place_id = place_id
@@ -96,23 +323,6 @@ class GeocodingService:
             location.address = place.get("formatted_address")
             location.opening_hours = opening_hours
             
-            # Cache result
-            try:
-                cache_data = {
-                    "place_id": place_id,
-                    "lat": location.lat,
-                    "lng": location.lng,
-                    "address": location.address,
-                    "opening_hours": opening_hours
-                }
-                self.redis.setex(
-                    cache_key,
-                    settings.DISTANCE_MATRIX_CACHE_TTL,
-                    json.dumps(cache_data)
-                )
-            except Exception as e:
-                logger.warning(f"Redis cache write error: {e}")
-            
             return location
             
         except ApiError as e:
@@ -122,7 +332,42 @@ class GeocodingService:
             logger.error(f"Error geocoding location: {e}")
             return None
     
-    def geocode_with_alternatives(
+    async def _get_opening_hours(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get opening hours for a place via Place Details, cached by place_id.
+        
+        Different query spellings often resolve to the same place, so details
+        are cached independently of the text-search cache.
+        
+        Args:
+            place_id: Google Place ID
+            
+        Returns:
+            Opening hours dict, or None if unavailable
+        """
+        cache_key = self._get_details_cache_key(place_id)
+        cached = (await self._get_cached_many([cache_key]))[0]
+        if cached:
+            return cached.get("opening_hours")
+        
+        try:
+            details = await self._places_request(
+                "details",
+                {"place_id": place_id, "fields": "opening_hours"}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to get opening hours: {e}")
+            return None
+        
+        opening_hours = details.get("result", {}).get("opening_hours")
+        # Cache misses too, so places without hours are not re-requested
+        await self._set_cached_many(
+            {cache_key: {"opening_hours": opening_hours}},
+            ttl=settings.PLACE_DETAILS_CACHE_TTL
+        )
+        return opening_hours
+    
+    async def geocode_with_alternatives(
         self, 
         location: CandidateLocation,
         location_bias: Optional[Tuple[float, float]] = None,
@@ -139,33 +384,58 @@ class GeocodingService:
         Returns:
             Dict with 'primary' (best match) and 'alternatives' (list of up to 4 more)
         """
-        query = f"{location.name} {location.description or ''}".strip()
+        query = self._build_query(location)
         
         # Check alternatives cache first
         cache_key = self._get_alternatives_cache_key(query)
-        try:
-            cached = self.redis.get(cache_key)
-            if cached:
-                logger.info(f"Cache hit for alternatives: {query}")
-                return json.loads(cached)
-        except Exception as e:
-            logger.warning(f"Redis cache read error: {e}")
+        cached = (await self._get_cached_many([cache_key]))[0]
+        if cached == NEGATIVE_CACHE_MARKER:
+            logger.info(f"Cached no-match for alternatives: {query}")
+            return {"primary": None, "alternatives": []}
+        if cached:
+            logger.info(f"Cache hit for alternatives: {query}")
+            return cached
         
+        result = await self._fetch_alternatives(location, query, location_bias, bias_radius_meters)
+        if result.get("primary"):
+            await self._set_cached_many({cache_key: result}, ttl=settings.GEOCODE_ALTERNATIVES_TTL)
+        return result
+    
+    async def _fetch_alternatives(
+        self,
+        location: CandidateLocation,
+        query: str,
+        location_bias: Optional[Tuple[float, float]] = None,
+        bias_radius_meters: float = 50000.0
+    ) -> Dict[str, Any]:
+        """
+        Fetch ranked Places alternatives for a location, bypassing the cache.
+        
+        Args:
+            location: Candidate location with at least a name
+            query: Text query built from the location
+            location_bias: Optional (lat, lng) tuple to bias results toward
+            bias_radius_meters: Radius in meters for bias (default 50km)
+            
+        Returns:
+            Dict with 'primary' (best match) and 'alternatives' (list of up to 4 more)
+        """
         # Call Google Places Text Search with optional location bias
         try:
             logger.info(f"Geocoding with alternatives: {query}" + (f" (biased to {location_bias})" if location_bias else ""))
             
             # Build API parameters with optional location bias
-            places_kwargs = {"query": query}
+            places_params = {"query": query}
             if location_bias and location_bias[0] is not None:
                 # Google Places API uses location + radius for biasing
-                places_kwargs["location"] = location_bias
-                places_kwargs["radius"] = int(bias_radius_meters)
+                places_params["location"] = f"{location_bias[0]},{location_bias[1]}"
+                places_params["radius"] = int(bias_radius_meters)
             
-            results = self.client.places(**places_kwargs)
+            results = await self._places_request("textsearch", places_params)
             
             if not results.get("results"):
                 logger.warning(f"No results found for: {query}")
+                await self._cache_not_found(self._get_alternatives_cache_key(query))
                 return {"primary": None, "alternatives": []}
             
             # Build alternatives list (up to max_alternatives)
@@ -208,24 +478,12 @@ class GeocodingService:
                 primary = all_candidates[0] if all_candidates else None
                 alternatives = all_candidates[1:] if len(all_candidates) > 1 else []
             
-            result = {
+            return {
                 "primary": primary,
                 "alternatives": alternatives,
                 "original_query": location.name
             }
             
-            # Cache result
-            try:
-                self.redis.setex(
-                    cache_key,
-                    settings.DISTANCE_MATRIX_CACHE_TTL,
-                    json.dumps(result)
-                )
-            except Exception as e:
-                logger.warning(f"Redis cache write error: {e}")
-            
-            return result
-            
         except ApiError as e:
             logger.error(f"Google Places API error: {e}")
             return {"primary": None, "alternatives": []}
@@ -238,7 +496,8 @@ class GeocodingService:
         locations: List[CandidateLocation],
         with_alternatives: bool = True,
         location_bias: Optional[Tuple[float, float]] = None,
-        bias_radius_meters: float = 50000.0
+        bias_radius_meters: float = 50000.0,
+        max_concurrent: int = 20  # Limit concurrent Places lookups to respect QPS
     ) -> List[Dict[str, Any]]:
         """
         Geocode multiple locations in parallel with alternatives.
@@ -248,40 +507,111 @@ class GeocodingService:
             with_alternatives: Whether to include alternatives for each
             location_bias: Optional (lat, lng) tuple to bias results toward
             bias_radius_meters: Radius in meters for bias (default 50km)
+            max_concurrent: Maximum concurrent Places lookups
             
         Returns:
             List of geocoding results with alternatives
         """
-        logger.info(f"Starting parallel geocoding of {len(locations)} locations")
+        logger.info(f"Starting parallel geocoding of {len(locations)} locations (max {max_concurrent} concurrent)")
         
-        loop = asyncio.get_event_loop()
+        if not locations:
+            return []
         
-        # Run geocoding in thread pool (Google Maps client is sync)
+        # Candidates with the same normalized query share one cache probe and one lookup
+        queries = [self._build_query(loc) for loc in locations]
         if with_alternatives:
-            from functools import partial
-            futures = [
-                loop.run_in_executor(
-                    _geocode_executor,
-                    partial(
-                        self.geocode_with_alternatives,
-                        loc,
+            cache_keys = [self._get_alternatives_cache_key(q) for q in queries]
+        else:
+            cache_keys = [self._get_cache_key(q) for q in queries]
+        groups = defaultdict(list)
+        for i, cache_key in enumerate(cache_keys):
+            groups[cache_key].append(i)
+        unique_keys = list(groups)
+        
+        # Probe the cache for the whole batch in one round trip
+        cached = await self._get_cached_many(unique_keys)
+        
+        results = [None] * len(locations)
+        misses = []
+        for cache_key, data in zip(unique_keys, cached):
+            if not data:
+                misses.append(cache_key)
+                continue
+            for i in groups[cache_key]:
+                if data == NEGATIVE_CACHE_MARKER:
+                    logger.info(f"Cached no-match for query: {queries[i]}")
+                    results[i] = {"primary": None, "alternatives": []} if with_alternatives else None
+                elif with_alternatives:
+                    logger.info(f"Cache hit for alternatives: {queries[i]}")
+                    results[i] = data
+                else:
+                    logger.info(f"Cache hit for query: {queries[i]}")
+                    results[i] = self._apply_cached_location(locations[i], data)
+        
+        if not with_alternatives:
+            # Hours live under their own place_id key (see _location_cache_data)
+            need_hours = defaultdict(list)
+            for i, result in enumerate(results):
+                if result and result.opening_hours is None:
+                    need_hours[result.google_place_id].append(result)
+            hours = await asyncio.gather(*(self._get_opening_hours(pid) for pid in need_hours))
+            for place_locations, opening_hours in zip(need_hours.values(), hours):
+                for location in place_locations:
+                    location.opening_hours = opening_hours
+        
+        # Use semaphore to limit concurrent API calls
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def fetch_with_semaphore(i: int):
+            async with semaphore:
+                if with_alternatives:
+                    return await self._fetch_alternatives(
+                        locations[i],
+                        queries[i],
                         location_bias=location_bias,
                         bias_radius_meters=bias_radius_meters
                     )
-                )
-                for loc in locations
-            ]
+                return await self._fetch_location(locations[i], queries[i])
+        
+        if with_alternatives:
+            flight_keys = [(cache_key, location_bias, bias_radius_meters) for cache_key in misses]
         else:
-            futures = [
-                loop.run_in_executor(
-                    _geocode_executor,
-                    self.geocode_location,
-                    loc
-                )
-                for loc in locations
-            ]
+            flight_keys = [(cache_key,) for cache_key in misses]
         
-        results = await asyncio.gather(*futures, return_exceptions=True)
+        # Only cache misses go to the Places API, once per unique query
+        fetched = await asyncio.gather(
+            *(
+                self._fetch_shared(flight_key, lambda i=groups[cache_key][0]: fetch_with_semaphore(i))
+                for cache_key, flight_key in zip(misses, flight_keys)
+            ),
+            return_exceptions=True
+        )
+        
+        to_cache = {}
+        for cache_key, result in zip(misses, fetched):
+            indices = groups[cache_key]
+            if isinstance(result, Exception) or not result:
+                for i in indices:
+                    results[i] = result
+                continue
+            if with_alternatives:
+                for i in indices:
+                    results[i] = result
+                if result.get("primary"):
+                    to_cache[cache_key] = result
+            else:
+                # The lookup enriched a candidate that may belong to another batch;
+                # copy its data onto this batch's candidates
+                data = self._location_cache_data(result)
+                opening_hours = result.opening_hours
+                for i in indices:
+                    results[i] = self._apply_cached_location(locations[i], data)
+                    results[i].opening_hours = opening_hours
+                to_cache[cache_key] = data
+        
+        if to_cache:
+            ttl = settings.GEOCODE_ALTERNATIVES_TTL if with_alternatives else settings.GEOCODE_CACHE_TTL
+            await self._set_cached_many(to_cache, ttl=ttl)
         
         # Filter out errors
         valid_results = []
@@ -310,12 +640,7 @@ class GeocodingService:
         Returns:
             URL string for the photo
         """
-        return (
-            f"https://maps.googleapis.com/maps/api/place/photo"
-            f"?maxwidth={max_width}"
-            f"&photo_reference={photo_reference}"
-            f"&key={settings.GOOGLE_MAPS_API_KEY}"
-        )
+        return f"{self._photo_url_prefix}{max_width}&photo_reference={photo_reference}"
     
     def _rerank_by_proximity(
         self,
@@ -339,51 +664,53 @@ class GeocodingService:
         if not candidates or centroid[0] is None:
             return candidates
         
-        scored = []
-        for i, candidate in enumerate(candidates):
-            lat = candidate.get("lat")
-            lng = candidate.get("lng")
-            
-            if lat is None or lng is None:
-                # No coordinates, use original position as score
-                proximity_score = 0.5
-            else:
-                distance = haversine_distance(centroid[0], centroid[1], lat, lng)
-                # Linear decay: 1.0 at centroid, 0.0 at max_distance
-                proximity_score = max(0.0, 1.0 - (distance / max_distance))
-            
-            # Combine API ranking (position) with proximity
-            # API rank bonus: first result gets 0.2, second 0.15, etc.
-            api_rank_bonus = max(0.0, 0.2 - (i * 0.05))
-            combined_score = proximity_score + api_rank_bonus
-            
-            scored.append((combined_score, candidate))
+        # Stack coordinates once; missing ones become NaN and get a neutral score
+        coords = [
+            (c.get("lat"), c.get("lng"))
+            if c.get("lat") is not None and c.get("lng") is not None
+            else (np.nan, np.nan)
+            for c in candidates
+        ]
+        lats, lngs = np.array(coords, dtype=float).T
+        distances = haversine_distance_matrix([centroid[0]], [centroid[1]], lats, lngs)[0]
         
-        # Sort by combined score descending
-        scored.sort(key=lambda x: x[0], reverse=True)
+        # Linear decay: 1.0 at centroid, 0.0 at max_distance
+        proximity_scores = np.where(
+            np.isnan(distances),
+            0.5,
+            np.maximum(0.0, 1.0 - distances / max_distance)
+        )
         
-        logger.debug(f"Re-ranked candidates by proximity: {[(s, c.get('name')) for s, c in scored]}")
+        # Combine API ranking (position) with proximity
+        # API rank bonus: first result gets 0.2, second 0.15, etc.
+        api_rank_bonus = np.maximum(0.0, 0.2 - np.arange(len(candidates)) * 0.05)
+        combined_scores = proximity_scores + api_rank_bonus
         
-        return [candidate for _, candidate in scored]
-    
-    def geocode_batch(self, locations: List[CandidateLocation]) -> List[CandidateLocation]:
-        """
-        Geocode multiple locations (sync, backwards compatible).
+        # Sort by combined score descending (stable, so ties keep API order)
+        order = np.argsort(-combined_scores, kind="stable").tolist()
         
-        Args:
-            locations: List of candidate locations
-            
-        Returns:
-            List of successfully geocoded locations
-        """
-        geocoded = []
-        for location in locations:
-            enriched = self.geocode_location(location)
-            if enriched:
-                geocoded.append(enriched)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Re-ranked candidates by proximity: {[(combined_scores[i], candidates[i].get('name')) for i in order]}")
         
-        return geocoded
+        return [candidates[i] for i in order]
+
+
+# Singleton instance, created on first use so importing this module opens no clients
+_geocoding_service: Optional[GeocodingService] = None
+_geocoding_service_lock = threading.Lock()
+
+
+def get_geocoding_service() -> GeocodingService:
+    """Get geocoding service instance."""
+    global _geocoding_service
+    if _geocoding_service is None:
+        with _geocoding_service_lock:
+            if _geocoding_service is None:
+                _geocoding_service = GeocodingService()
+    return _geocoding_service
 
 
-# Singleton instance
-geocoding_service = GeocodingService()
+async def close_geocoding_service() -> None:
+    """Close the geocoding service's HTTP client, if it was ever created."""
+    if _geocoding_service is not None:
+        await _geocoding_service.aclose()
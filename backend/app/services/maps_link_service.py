@@ -1,6 +1,6 @@
 import logging
 from typing import List
-from urllib.parse import urlencode, quote
+from urllib.parse import urlencode, quote_plus
 
 from ..core.config import settings
 from ..db.models import Waypoint
@@ -51,37 +51,37 @@ class MapsLinkService:
             return f"https://www.google.com/maps/search/?{urlencode(params)}"
         
         # Multiple waypoints - create navigation route
-        origin = waypoints[0]
-        destination = waypoints[-1]
-        
         # Handle waypoint limit (max 9 in URL)
         middle_waypoints = waypoints[1:-1]
-        if len(middle_waypoints) > settings.MAX_WAYPOINTS_IN_URL:
+        max_middle = settings.MAX_WAYPOINTS_IN_URL
+        if len(middle_waypoints) > max_middle:
             logger.warning(
                 f"Too many waypoints ({len(middle_waypoints)}), "
-                f"truncating to {settings.MAX_WAYPOINTS_IN_URL}"
+                f"truncating to {max_middle}"
             )
-            # Keep evenly spaced waypoints
-            step = len(middle_waypoints) / settings.MAX_WAYPOINTS_IN_URL
-            indices = [int(i * step) for i in range(settings.MAX_WAYPOINTS_IN_URL)]
-            middle_waypoints = [middle_waypoints[i] for i in indices]
-        
-        # Build waypoints string using location names
-        waypoint_names = [self._get_location_string(wp) for wp in middle_waypoints]
-        waypoints_str = "|".join(waypoint_names)
-        
-        # Build URL using location names instead of coordinates
-        params = {
-            "api": 1,
-            "origin": self._get_location_string(origin),
-            "destination": self._get_location_string(destination),
-            "travelmode": "walking"
-        }
+            # Keep evenly spaced waypoints, including the first and last stop
+            last = len(middle_waypoints) - 1
+            span = max(max_middle - 1, 1)
+            middle_waypoints = [middle_waypoints[i * last // span] for i in range(max_middle)]
         
-        if waypoints_str:
-            params["waypoints"] = waypoints_str
+        # Encode every location string once, only for the waypoints that make the URL
+        # (quote_plus with no safe characters, exactly as urlencode would)
+        encoded = [
+            quote_plus(self._get_location_string(wp), safe="")
+            for wp in [waypoints[0], *middle_waypoints, waypoints[-1]]
+        ]
         
-        url = f"https://www.google.com/maps/dir/?{urlencode(params)}"
+        # Build URL using location names instead of coordinates; the fixed
+        # parameters need no encoding, so skip urlencode's pass over them
+        url = (
+            "https://www.google.com/maps/dir/?api=1"
+            f"&origin={encoded[0]}"
+            f"&destination={encoded[-1]}"
+            "&travelmode=walking"
+        )
+        if len(encoded) > 2:
+            # "|" separates waypoints and encodes as %7C
+            url += f"&waypoints={'%7C'.join(encoded[1:-1])}"
         logger.info(f"Generated Maps URL with {len(waypoints)} waypoints")
         
         return url
@@ -1,7 +1,12 @@
+import asyncio
+import concurrent.futures
 import logging
-from typing import List, Optional
+import multiprocessing
+import threading
+from typing import List, Optional, Tuple
 from datetime import timedelta
 from uuid import UUID
+import numpy as np
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
@@ -10,6 +15,374 @@ from ..models.schemas import TripConstraints
 
 logger = logging.getLogger(__name__)
 
+# Trips up to this many waypoints are solved exactly with Held-Karp
+# (2^N * N^2 steps) instead of OR-Tools' local search
+EXACT_TSP_MAX_WAYPOINTS = 12
+
+# Worker processes for solve_tsp_async, started on first use
+SOLVER_POOL_WORKERS = 2
+_solver_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_solver_pool_lock = threading.Lock()
+
+
+def _get_solver_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the shared solver process pool, creating it on first use."""
+    global _solver_pool
+    if _solver_pool is None:
+        with _solver_pool_lock:
+            if _solver_pool is None:
+                # Spawn, not fork: the server process already runs OCR/vision
+                # thread pools, and forking a multithreaded process can deadlock
+                _solver_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=SOLVER_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _solver_pool
+
+
+def _discard_solver_pool(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    """Drop a broken solver pool so the next solve starts a fresh one."""
+    global _solver_pool
+    with _solver_pool_lock:
+        if _solver_pool is pool:
+            _solver_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_solver_pool() -> None:
+    """Stop the solver worker processes, if they were ever started."""
+    global _solver_pool
+    with _solver_pool_lock:
+        pool, _solver_pool = _solver_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _stay_minutes(waypoints: List[Waypoint]) -> np.ndarray:
+    """
+    Collect each waypoint's stay, defaulting to 60 minutes, into one array.
+    
+    Args:
+        waypoints: List of waypoints
+        
+    Returns:
+        Stay durations in minutes, aligned with waypoints
+    """
+    return np.fromiter(
+        (wp.estimated_stay_duration or 60 for wp in waypoints),
+        dtype=np.int64,
+        count=len(waypoints)
+    )
+
+
+def _held_karp_route(
+    distance_matrix: List[List[int]],
+    end_idx: Optional[int] = None
+) -> Tuple[List[int], int]:
+    """
+    Find the optimal visiting order with Held-Karp dynamic programming.
+    
+    Minimizes the same objective as the OR-Tools model: a path to the
+    fixed end waypoint, or otherwise a tour that returns to the start pin.
+    
+    Args:
+        distance_matrix: Travel times; index 0 is the start pin, 1..N the waypoints
+        end_idx: Optional waypoint index (0-based) to visit last
+        
+    Returns:
+        Tuple of (waypoint indices in visit order, total travel seconds)
+    """
+    d = np.asarray(distance_matrix, dtype=float)
+    n = d.shape[0] - 1
+    travel = d[1:, 1:]
+    nodes = np.arange(n)
+    bits = 1 << nodes
+    masks = np.arange(1 << n)
+    sizes = sum((masks >> k) & 1 for k in range(n))
+    
+    # best[mask, i]: shortest path from the start through the waypoints in mask, ending at i
+    best = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    best[bits, nodes] = d[0, 1:]
+    
+    for size in range(2, n + 1):
+        layer = masks[sizes == size]
+        for i in range(n):
+            with_i = layer[(layer & bits[i]) != 0]
+            # Waypoints outside mask ^ bit still hold inf, so they never win
+            arrive = best[with_i ^ bits[i]] + travel[:, i]
+            came_from = arrive.argmin(axis=1)
+            best[with_i, i] = arrive[np.arange(len(with_i)), came_from]
+            parent[with_i, i] = came_from
+    
+    full = masks[-1]
+    if end_idx is not None:
+        last = end_idx
+        cost = best[full, end_idx]
+    else:
+        tour = best[full] + d[1:, 0]
+        last = int(tour.argmin())
+        cost = tour[last]
+    
+    order = []
+    mask, node = full, last
+    while node >= 0:
+        order.append(node)
+        mask, node = mask ^ bits[node], int(parent[mask, node])
+    order.reverse()
+    
+    return order, int(cost)
+
+
+def _nearest_neighbor_order(
+    distance_matrix: List[List[int]],
+    end_idx: Optional[int] = None
+) -> Tuple[List[int], List[int]]:
+    """
+    Order waypoints greedily, always moving to the nearest unvisited one.
+    
+    Pure integer work, kept apart from the datetime bookkeeping so each
+    step is a single argmin over a row.
+    
+    Args:
+        distance_matrix: Travel times; index 0 is the start pin, 1..N the waypoints
+        end_idx: Optional waypoint index (0-based) to visit last
+        
+    Returns:
+        Tuple of (waypoint indices in visit order, travel seconds into each stop)
+    """
+    # Travel times from every node to each waypoint (column 0, the start pin, dropped).
+    # Visited columns are overwritten with a cost no real travel time reaches.
+    travel = np.array(distance_matrix, dtype=np.int64)[:, 1:]
+    num_waypoints = travel.shape[1]
+    masked_cost = np.iinfo(np.int64).max
+    
+    # Reserve the end waypoint for last
+    end_travel = travel[:, end_idx].copy() if end_idx is not None else None
+    if end_idx is not None:
+        travel[:, end_idx] = masked_cost
+    
+    order = []
+    travel_seconds = []
+    current_node = 0  # Start location
+    for _ in range(num_waypoints - (1 if end_idx is not None else 0)):
+        # argmin keeps the first of equally near waypoints
+        best_idx = int(travel[current_node].argmin())
+        travel_seconds.append(int(travel[current_node, best_idx]))
+        order.append(best_idx)
+        travel[:, best_idx] = masked_cost
+        current_node = best_idx + 1
+    
+    if end_idx is not None:
+        order.append(end_idx)
+        travel_seconds.append(int(end_travel[current_node]))
+    
+    return order, travel_seconds
+
+
+def _two_opt_route(
+    route_nodes: List[int],
+    distance_matrix: List[List[int]],
+    closed: bool
+) -> List[int]:
+    """
+    Polish a route with 2-opt moves until no segment reversal shortens it.
+    
+    Reversed segments are re-costed in the opposite direction, so asymmetric
+    (transit) matrices are handled too. The first node stays first, and the
+    last node stays last (or, for a closed tour, the return to the start is kept).
+    
+    Args:
+        route_nodes: Matrix nodes in visiting order, starting with 0
+        distance_matrix: Travel times
+        closed: Whether the route returns to node 0 after its last stop
+        
+    Returns:
+        Improved matrix nodes in visiting order
+    """
+    d = np.asarray(distance_matrix, dtype=np.int64)
+    tour = np.array(route_nodes + [0] if closed else route_nodes, dtype=np.int64)
+    
+    def leg_prefix_sums():
+        # Cost of walking tour[0..k] forwards, and of the same legs walked backwards
+        forward = np.concatenate(([0], np.cumsum(d[tour[:-1], tour[1:]])))
+        backward = np.concatenate(([0], np.cumsum(d[tour[1:], tour[:-1]])))
+        return forward, backward
+    
+    forward, backward = leg_prefix_sums()
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(tour) - 2):
+            # Gain of reversing tour[i..j] for every j at once
+            js = np.arange(i + 1, len(tour) - 1)
+            a, b = tour[i - 1], tour[i]
+            c, e = tour[js], tour[js + 1]
+            delta = (
+                d[a, c] + d[b, e] - d[a, b] - d[c, e]
+                + (backward[js] - backward[i]) - (forward[js] - forward[i])
+            )
+            k = int(delta.argmin())
+            if delta[k] < 0:
+                j = js[k]
+                tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                forward, backward = leg_prefix_sums()
+                improved = True
+    
+    return (tour[:-1] if closed else tour).tolist()
+
+
+def _plan_route(
+    distance_matrix: List[List[int]],
+    stays: np.ndarray,
+    end_node_index: Optional[int],
+    total_available_seconds: int
+) -> Optional[List[int]]:
+    """
+    Solve the visiting order on plain data, so it can run in a worker process.
+    
+    Args:
+        distance_matrix: Travel times; index 0 is the start pin, 1..N the waypoints
+        stays: Stay minutes per waypoint, from _stay_minutes
+        end_node_index: Optional matrix node to finish at
+        total_available_seconds: Length of the trip window
+        
+    Returns:
+        Matrix nodes in visiting order starting with 0, or None if no route was
+        found and the caller should fall back to greedy ordering
+    """
+    num_waypoints = len(stays)
+    
+    # Small trips: solve exactly, skipping OR-Tools' model setup and search time
+    if num_waypoints <= EXACT_TSP_MAX_WAYPOINTS:
+        end_idx = end_node_index - 1 if end_node_index is not None else None
+        visit_order, travel_seconds = _held_karp_route(distance_matrix, end_idx)
+        # Same feasibility rule as the time dimension: travel plus every stay
+        # except the fixed end's must fit in the trip window
+        stay_seconds = int(stays.sum()) * 60
+        if end_idx is not None:
+            stay_seconds -= int(stays[end_idx]) * 60
+        if travel_seconds + stay_seconds > total_available_seconds:
+            logger.warning("No route fits the trip window")
+            return None
+        
+        logger.info(f"Exact TSP solution for {num_waypoints} waypoints with travel time {travel_seconds}s")
+        return [0] + [i + 1 for i in visit_order]
+    
+    # Create routing model with fixed start (and optionally fixed end)
+    num_locations = len(distance_matrix)
+    
+    if end_node_index is not None:
+        # Fixed start AND fixed end
+        # Use dummy depot at index 0, route from 0 -> ... -> end_node
+        manager = pywrapcp.RoutingIndexManager(
+            num_locations,
+            1,  # One vehicle (tourist)
+            [0],  # Start at index 0 (user's pin location)
+            [end_node_index]  # End at specified waypoint
+        )
+        logger.info(f"TSP with fixed start (0) and fixed end ({end_node_index})")
+    else:
+        # Fixed start, free end (original behavior)
+        manager = pywrapcp.RoutingIndexManager(
+            num_locations,
+            1,  # One vehicle (tourist)
+            0   # Start at index 0 (user's pin location)
+        )
+        logger.info("TSP with fixed start (0), free end")
+    
+    routing = pywrapcp.RoutingModel(manager)
+    
+    # Register travel times as a matrix so the solver evaluates arcs in C++
+    # without calling back into Python for every transit
+    transit_callback_index = routing.RegisterTransitMatrix(distance_matrix)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+    
+    # Add time dimension
+    time_dimension_name = "Time"
+    
+    routing.AddDimension(
+        transit_callback_index,
+        total_available_seconds,  # Allow waiting time
+        total_available_seconds,  # Maximum time per vehicle
+        False,  # Don't force start cumul to zero
+        time_dimension_name
+    )
+    
+    time_dimension = routing.GetDimensionOrDie(time_dimension_name)
+    
+    # Add time windows for waypoints
+    for i in range(num_waypoints):
+        index = manager.NodeToIndex(i + 1)  # +1 because 0 is start location
+        
+        # Skip if this is the end waypoint in fixed-end mode
+        # NodeToIndex returns -1 for the end node in this configuration
+        if index < 0:
+            logger.debug(f"Skipping end waypoint {i + 1} (NodeToIndex returned -1)")
+            continue
+        
+        # For simplicity, allow visiting anytime during the day
+        # In production, this would check opening_hours
+        time_dimension.CumulVar(index).SetRange(0, total_available_seconds)
+        
+        # Add stay duration
+        stay_seconds = int(stays[i]) * 60
+        time_dimension.SlackVar(index).SetRange(stay_seconds, stay_seconds)
+
+    
+    # Set search parameters for better optimization
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    # Use PATH_CHEAPEST_ARC for faster initial solution (AUTOMATIC can be slow)
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    # Use guided local search for improvement
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    )
+    # Scale the search budget with trip size (small trips never get here):
+    # 50 ms per waypoint, between 1 and 10 seconds
+    time_limit_ms = min(10000, max(1000, 50 * num_waypoints))
+    search_parameters.time_limit.FromMilliseconds(time_limit_ms)
+    # Limit solutions to prevent excessive computation
+    search_parameters.solution_limit = 10
+    
+    # Solve
+    logger.info(f"Solving TSP for {num_waypoints} waypoints with {len(distance_matrix)}×{len(distance_matrix)} matrix...")
+    logger.info(f"TSP solver timeout: {time_limit_ms / 1000:.2f}s")
+    try:
+        solution = routing.SolveWithParameters(search_parameters)
+        if solution:
+            # Log solution quality
+            objective_value = solution.ObjectiveValue()
+            logger.info(f"TSP solver finished: solution found with objective value {objective_value}")
+        else:
+            logger.warning("TSP solver returned no solution")
+    except Exception as e:
+        logger.error(f"TSP solver error: {e}")
+        return None
+    
+    if not solution:
+        return None
+    
+    # Extract solution: walk it once into node order (node 0 is the start pin).
+    # With a fixed end, the end node is the route's end index and is not
+    # reached inside the walk, so it is appended last.
+    route_nodes = []
+    index = routing.Start(0)
+    while not routing.IsEnd(index):
+        route_nodes.append(manager.IndexToNode(index))
+        index = solution.Value(routing.NextVar(index))
+    if end_node_index is not None:
+        route_nodes.append(end_node_index)
+    
+    # Guided local search stops after a handful of solutions; a 2-opt pass
+    # recovers most of what it leaves. Shorter travel only loosens the time
+    # window, so feasibility holds.
+    route_nodes = _two_opt_route(route_nodes, distance_matrix, closed=end_node_index is None)
+    
+    return route_nodes
+
 
 class RouteOptimizer:
     """Service for optimizing trip routes using OR-Tools TSP solver."""
@@ -51,6 +424,81 @@ class RouteOptimizer:
             )
             return [wp]
         
+        end_node_index, total_available_seconds, stays = self._route_inputs(
+            waypoints, constraints, end_waypoint_id
+        )
+        route_nodes = _plan_route(distance_matrix, stays, end_node_index, total_available_seconds)
+        return self._finish_route(
+            waypoints, distance_matrix, route_nodes, constraints, stays, end_waypoint_id
+        )
+    
+    async def solve_tsp_async(
+        self,
+        waypoints: List[Waypoint],
+        distance_matrix: List[List[int]],
+        constraints: TripConstraints,
+        end_waypoint_id: Optional[UUID] = None
+    ) -> List[Waypoint]:
+        """
+        Async variant of solve_tsp for request handlers.
+        
+        OR-Tools holds the GIL for its whole search, so the solve runs in a
+        worker process; only the matrix and stay durations cross over, and the
+        returned node order is applied to the ORM waypoints here.
+        
+        Args:
+            waypoints: List of waypoints to visit
+            distance_matrix: Travel times; index 0 is the start pin, 1..N the waypoints
+            constraints: Trip constraints including start/end times
+            end_waypoint_id: Optional UUID of waypoint to end at
+            
+        Returns:
+            Ordered list of waypoints with arrival/departure times
+        """
+        if len(waypoints) < 2:
+            return self.solve_tsp(waypoints, distance_matrix, constraints, end_waypoint_id)
+        
+        end_node_index, total_available_seconds, stays = self._route_inputs(
+            waypoints, constraints, end_waypoint_id
+        )
+        loop = asyncio.get_running_loop()
+        pool = _get_solver_pool()
+        try:
+            route_nodes = await loop.run_in_executor(
+                pool,
+                _plan_route,
+                distance_matrix,
+                stays,
+                end_node_index,
+                total_available_seconds
+            )
+        except Exception as e:
+            # Worker crashed or the task could not be sent; route greedily instead
+            logger.error(f"TSP worker error: {e}")
+            if isinstance(e, concurrent.futures.process.BrokenProcessPool):
+                _discard_solver_pool(pool)
+            route_nodes = None
+        return self._finish_route(
+            waypoints, distance_matrix, route_nodes, constraints, stays, end_waypoint_id
+        )
+    
+    def _route_inputs(
+        self,
+        waypoints: List[Waypoint],
+        constraints: TripConstraints,
+        end_waypoint_id: Optional[UUID]
+    ) -> Tuple[Optional[int], int, np.ndarray]:
+        """
+        Reduce waypoints and constraints to the plain values _plan_route needs.
+        
+        Args:
+            waypoints: List of waypoints to visit
+            constraints: Trip constraints including start/end times
+            end_waypoint_id: Optional UUID of waypoint to end at
+            
+        Returns:
+            Tuple of (end matrix node or None, trip window seconds, stay minutes)
+        """
         # Find end waypoint index if specified
         end_node_index = None
         if end_waypoint_id:
@@ -60,159 +508,88 @@ class RouteOptimizer:
                     logger.info(f"End waypoint found at index {end_node_index}: {wp.name}")
                     break
         
-        # Create routing model with fixed start (and optionally fixed end)
-        num_locations = len(distance_matrix)
-        
-        if end_node_index is not None:
-            # Fixed start AND fixed end
-            # Use dummy depot at index 0, route from 0 -> ... -> end_node
-            manager = pywrapcp.RoutingIndexManager(
-                num_locations,
-                1,  # One vehicle (tourist)
-                [0],  # Start at index 0 (user's pin location)
-                [end_node_index]  # End at specified waypoint
-            )
-            logger.info(f"TSP with fixed start (0) and fixed end ({end_node_index})")
-        else:
-            # Fixed start, free end (original behavior)
-            manager = pywrapcp.RoutingIndexManager(
-                num_locations,
-                1,  # One vehicle (tourist)
-                0   # Start at index 0 (user's pin location)
-            )
-            logger.info("TSP with fixed start (0), free end")
-        
-        routing = pywrapcp.RoutingModel(manager)
-        
-        # Create distance callback
-        def distance_callback(from_index, to_index):
-            from_node = manager.IndexToNode(from_index)
-            to_node = manager.IndexToNode(to_index)
-            return distance_matrix[from_node][to_node]
-        
-        transit_callback_index = routing.RegisterTransitCallback(distance_callback)
-        routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-        
-        # Add time dimension
-        time_dimension_name = "Time"
         total_available_seconds = int(
             (constraints.end_time - constraints.start_time).total_seconds()
         )
+        stays = _stay_minutes(waypoints)
         
-        routing.AddDimension(
-            transit_callback_index,
-            total_available_seconds,  # Allow waiting time
-            total_available_seconds,  # Maximum time per vehicle
-            False,  # Don't force start cumul to zero
-            time_dimension_name
-        )
-        
-        time_dimension = routing.GetDimensionOrDie(time_dimension_name)
+        return end_node_index, total_available_seconds, stays
+    
+    def _finish_route(
+        self,
+        waypoints: List[Waypoint],
+        distance_matrix: List[List[int]],
+        route_nodes: Optional[List[int]],
+        constraints: TripConstraints,
+        stays: np.ndarray,
+        end_waypoint_id: Optional[UUID]
+    ) -> List[Waypoint]:
+        """
+        Schedule a planned route, or fall back to greedy ordering without one.
         
-        # Add time windows for waypoints
-        for i, wp in enumerate(waypoints):
-            index = manager.NodeToIndex(i + 1)  # +1 because 0 is start location
-            
-            # Skip if this is the end waypoint in fixed-end mode
-            # NodeToIndex returns -1 for the end node in this configuration
-            if index < 0:
-                logger.debug(f"Skipping end waypoint {wp.name} (NodeToIndex returned -1)")
-                continue
-            
-            # For simplicity, allow visiting anytime during the day
-            # In production, this would check opening_hours
-            time_dimension.CumulVar(index).SetRange(0, total_available_seconds)
+        Args:
+            waypoints: List of waypoints
+            distance_matrix: Distance matrix (index 0 = start location)
+            route_nodes: Result of _plan_route
+            constraints: Trip constraints
+            stays: Stay minutes per waypoint, from _stay_minutes
+            end_waypoint_id: Optional UUID of waypoint to end at
             
-            # Add stay duration
-            stay_minutes = wp.estimated_stay_duration or 60
-            stay_seconds = stay_minutes * 60
-            time_dimension.SlackVar(index).SetRange(stay_seconds, stay_seconds)
-
-        
-        # Set search parameters for better optimization
-        search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-        # Use PATH_CHEAPEST_ARC for faster initial solution (AUTOMATIC can be slow)
-        search_parameters.first_solution_strategy = (
-            routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-        )
-        # Use guided local search for improvement
-        search_parameters.local_search_metaheuristic = (
-            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
-        )
-        # Reduce time limit to prevent hanging (10 seconds should be enough for 5 waypoints)
-        search_parameters.time_limit.seconds = 10
-        # Limit solutions to prevent excessive computation
-        search_parameters.solution_limit = 10
-        
-        # Solve
-        logger.info(f"Solving TSP for {len(waypoints)} waypoints with {len(distance_matrix)}×{len(distance_matrix)} matrix...")
-        logger.info(f"TSP solver timeout: {search_parameters.time_limit.seconds}s")
-        try:
-            solution = routing.SolveWithParameters(search_parameters)
-            if solution:
-                # Log solution quality
-                objective_value = solution.ObjectiveValue()
-                logger.info(f"TSP solver finished: solution found with objective value {objective_value}")
-            else:
-                logger.warning("TSP solver returned no solution")
-        except Exception as e:
-            logger.error(f"TSP solver error: {e}")
-            return self._greedy_fallback(waypoints, distance_matrix, constraints, end_waypoint_id)
-        
-        if not solution:
+        Returns:
+            Ordered waypoints
+        """
+        if route_nodes is None:
             logger.warning("No solution found, using greedy fallback")
             return self._greedy_fallback(waypoints, distance_matrix, constraints, end_waypoint_id)
         
-        # Extract solution
+        ordered_waypoints = self._schedule_route(waypoints, distance_matrix, route_nodes, constraints, stays)
+        logger.info(f"TSP solution found with {len(ordered_waypoints)} waypoints")
+        return ordered_waypoints
+    
+    def _schedule_route(
+        self,
+        waypoints: List[Waypoint],
+        distance_matrix: List[List[int]],
+        route_nodes: List[int],
+        constraints: TripConstraints,
+        stays: np.ndarray
+    ) -> List[Waypoint]:
+        """
+        Assign visit order and arrival/departure times along a route.
+        
+        Args:
+            waypoints: List of waypoints
+            distance_matrix: Distance matrix (index 0 = start location)
+            route_nodes: Matrix nodes in visiting order, starting with 0
+            constraints: Trip constraints
+            stays: Stay minutes per waypoint, from _stay_minutes
+            
+        Returns:
+            Ordered waypoints
+        """
         ordered_waypoints = []
-        index = routing.Start(0)
-        route_order = 1
-        current_time = constraints.start_time
+        # Keep the clock in integer seconds; datetimes are built only on assignment
+        start = constraints.start_time
+        current_seconds = 0
+        previous_node = None
         
-        while not routing.IsEnd(index):
-            node = manager.IndexToNode(index)
+        for node in route_nodes:
+            # Add travel time
+            if previous_node is not None:
+                current_seconds += distance_matrix[previous_node][node]
+            previous_node = node
             
             # Skip start location (node 0)
-            if node > 0:
-                wp = waypoints[node - 1]
-                wp.order = route_order
-                wp.arrival_time = current_time
-                wp.departure_time = current_time + timedelta(
-                    minutes=wp.estimated_stay_duration or 60
-                )
-                ordered_waypoints.append(wp)
-                
-                current_time = wp.departure_time
-                route_order += 1
-            
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
+            if node == 0:
+                continue
             
-            # Add travel time
-            if not routing.IsEnd(index):
-                from_node = manager.IndexToNode(previous_index)
-                to_node = manager.IndexToNode(index)
-                travel_seconds = distance_matrix[from_node][to_node]
-                current_time += timedelta(seconds=travel_seconds)
-        
-        # Handle the end node (it's not included in the loop if we have fixed end)
-        if end_node_index is not None:
-            end_wp = waypoints[end_node_index - 1]
-            if end_wp not in ordered_waypoints:
-                # Add travel time from last waypoint to end
-                if ordered_waypoints:
-                    last_node = waypoints.index(ordered_waypoints[-1]) + 1
-                    travel_seconds = distance_matrix[last_node][end_node_index]
-                    current_time += timedelta(seconds=travel_seconds)
-                
-                end_wp.order = route_order
-                end_wp.arrival_time = current_time
-                end_wp.departure_time = current_time + timedelta(
-                    minutes=end_wp.estimated_stay_duration or 60
-                )
-                ordered_waypoints.append(end_wp)
+            wp = waypoints[node - 1]
+            wp.order = len(ordered_waypoints) + 1
+            wp.arrival_time = start + timedelta(seconds=current_seconds)
+            current_seconds += int(stays[node - 1]) * 60
+            wp.departure_time = start + timedelta(seconds=current_seconds)
+            ordered_waypoints.append(wp)
         
-        logger.info(f"TSP solution found with {len(ordered_waypoints)} waypoints")
         return ordered_waypoints
     
     def _greedy_fallback(
@@ -245,62 +622,24 @@ class RouteOptimizer:
                     end_idx = i
                     break
         
-        visited = [False] * len(waypoints)
-        ordered = []
-        current_node = 0  # Start location
-        current_time = constraints.start_time
-        
-        # Reserve the end waypoint for last
-        if end_idx is not None:
-            visited[end_idx] = True  # Mark as visited so we skip it until the end
-        
-        num_to_visit = len(waypoints) - (1 if end_idx is not None else 0)
+        visit_order, travel_seconds = _nearest_neighbor_order(distance_matrix, end_idx)
+        stays = _stay_minutes(waypoints)
         
-        for order in range(1, num_to_visit + 1):
-            # Find nearest unvisited waypoint
-            best_idx = -1
-            best_distance = float('inf')
-            
-            for i, wp in enumerate(waypoints):
-                if not visited[i]:
-                    distance = distance_matrix[current_node][i + 1]
-                    if distance < best_distance:
-                        best_distance = distance
-                        best_idx = i
-            
-            if best_idx == -1:
-                break
-            
-            # Visit waypoint
-            visited[best_idx] = True
-            wp = waypoints[best_idx]
+        ordered = []
+        start = constraints.start_time
+        current_seconds = 0
+        for order, (idx, seconds) in enumerate(zip(visit_order, travel_seconds), start=1):
+            wp = waypoints[idx]
             
             # Add travel time
-            current_time += timedelta(seconds=best_distance)
+            current_seconds += seconds
             
             # Set waypoint times
             wp.order = order
-            wp.arrival_time = current_time
-            wp.departure_time = current_time + timedelta(
-                minutes=wp.estimated_stay_duration or 60
-            )
+            wp.arrival_time = start + timedelta(seconds=current_seconds)
+            current_seconds += int(stays[idx]) * 60
+            wp.departure_time = start + timedelta(seconds=current_seconds)
             ordered.append(wp)
-            
-            current_time = wp.departure_time
-            current_node = best_idx + 1
-        
-        # Add end waypoint last if specified
-        if end_idx is not None:
-            end_wp = waypoints[end_idx]
-            travel_seconds = distance_matrix[current_node][end_idx + 1]
-            current_time += timedelta(seconds=travel_seconds)
-            
-            end_wp.order = len(ordered) + 1
-            end_wp.arrival_time = current_time
-            end_wp.departure_time = current_time + timedelta(
-                minutes=end_wp.estimated_stay_duration or 60
-            )
-            ordered.append(end_wp)
         
         return ordered
 
@@ -1,32 +1,204 @@
 """Vision service for analyzing images using OpenAI Vision API + OCR."""
 import asyncio
 import base64
+import hashlib
+import io
 import logging
-from typing import List, Optional
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import httpx
+import orjson
 from openai import AsyncOpenAI
-import json
+from PIL import Image, ImageOps
+
+try:
+    import h2  # noqa: F401  (httpx[http2] backend)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 import concurrent.futures
 from functools import partial
 
 from ..core.config import settings
+from ..core.redis_client import get_async_redis
 from ..models.schemas import CandidateLocation
 from .ocr_service import ocr_service
 from .entity_extractor import entity_extractor
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for CPU-bound OCR operations
-_ocr_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+# Thread pool for OCR; the work happens in Tesseract child processes outside
+# the GIL, so size it to the machine rather than a fixed 4
+_ocr_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="ocr"
+)
+
+# Vision API answers by image digest, so re-uploaded photos skip the API call.
+# The in-process LRU sits in front of Redis, which is shared by every worker.
+VISION_CACHE_MAX = 256
+
+# GPT-4o "high" detail first fits images in 2048x2048, then scales the short
+# side to 768px; anything larger is uploaded only to be thrown away
+VISION_MAX_LONG_EDGE = 2048
+VISION_MAX_SHORT_EDGE = 768
+
+
+def _prepare_vision_image(image_bytes: bytes) -> bytes:
+    """
+    Shrink an image to what the Vision API will actually look at.
+    
+    Args:
+        image_bytes: Raw image bytes
+        
+    Returns:
+        JPEG bytes no larger than the API's high-detail working size, or the
+        original bytes if the image cannot be decoded
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        width, height = image.size
+        scale = min(
+            1.0,
+            VISION_MAX_LONG_EDGE / max(width, height),
+            VISION_MAX_SHORT_EDGE / min(width, height)
+        )
+        if scale < 1.0:
+            target = (max(1, round(width * scale)), max(1, round(height * scale)))
+            # JPEGs can decode straight at a reduced scale (no-op for other formats)
+            image.draft("RGB", target)
+            image = image.resize(target, Image.LANCZOS)
+        elif image.format == "JPEG":
+            # Already small enough and in the format the data URL declares
+            return image_bytes
+        
+        # Re-encoding drops EXIF, so bake in the orientation phone cameras
+        # record there; otherwise the model sees portrait shots sideways
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not downscale image for Vision API: {e}")
+        return image_bytes
+
+
+# Enhanced prompt for better location detection
+VISION_PROMPT = """You are analyzing a travel/food photo to extract location information.
+
+LOOK CAREFULLY FOR:
+1. Restaurant/cafe/bar names - in signs, menus, receipts, cups, packaging, watermarks
+2. Location text overlays - TikTok/Instagram captions often have location pins or @ mentions
+3. Recognizable landmarks or buildings
+4. Street signs, neighborhood names, city names
+5. Food/drink that's characteristic of a specific famous restaurant (e.g., rainbow bagels = Liberty Bagels)
+6. Receipt headers, branded napkins, or packaging with business names
+7. Background signage or storefronts visible in the image
+
+Even if the main subject is food/drinks, there's often a restaurant name visible somewhere.
+If you recognize a famous dish or presentation style, identify the likely restaurant.
+
+Return ONLY a JSON object with a "locations" array:
+{"locations": [{"name": "Restaurant or Place Name", "description": "Brief context about what you see", "confidence": 0.85}]}
+
+IMPORTANT:
+- Return specific place names, not generic descriptions
+- If you see "Levain Bakery" cookie style, say "Levain Bakery"
+- If you see a rainbow bagel, it's likely "Liberty Bagels" 
+- Confidence: 0.95 for clearly visible names, 0.7-0.85 for recognized famous items
+- Return {"locations": []} ONLY if you genuinely cannot identify ANY location clue"""
+
+
+def _vision_image_url(upload_bytes: bytes) -> str:
+    """Build the JPEG data URL sent to the Vision API."""
+    # Build the data URL in bytes and decode once, rather than decoding
+    # the base64 text and copying it again into an f-string
+    return (b"data:image/jpeg;base64," + base64.b64encode(upload_bytes)).decode("ascii")
+
+
+def _vision_request_body(image_url: str) -> Dict[str, Any]:
+    """Build the chat completion request for one image (real-time or Batch API)."""
+    return {
+        "model": "gpt-4o",
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": VISION_PROMPT},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url,
+                            "detail": "high"  # Use high detail for better recognition
+                        }
+                    }
+                ]
+            }
+        ],
+        "max_tokens": 400,  # Allow longer response for detailed extraction
+        "temperature": 0.3,  # Slight creativity for recognizing famous items
+        "response_format": {"type": "json_object"}  # No markdown fences to strip
+    }
+
+
+def _parse_vision_content(content: str) -> List[CandidateLocation]:
+    """
+    Convert a Vision JSON answer into candidates, skipping malformed entries.
+    
+    Raises:
+        orjson.JSONDecodeError: If the content is not valid JSON
+    """
+    # JSON mode guarantees a single object
+    locations_data = orjson.loads(content).get("locations") or []
+    
+    # Convert to CandidateLocation objects
+    candidates = []
+    for loc in locations_data:
+        try:
+            candidate = CandidateLocation(
+                name=loc.get("name", "Unknown"),
+                description=loc.get("description"),
+                confidence=float(loc.get("confidence", 0.7))
+            )
+            candidates.append(candidate)
+        except Exception as e:
+            logger.warning(f"Failed to parse location: {loc}, error: {e}")
+            continue
+    
+    return candidates
 
 
 class VisionService:
     """Service for analyzing images using OpenAI Vision API combined with OCR."""
     
     def __init__(self, use_enhanced_pipeline: bool = True):
-        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Own the HTTP pool so connections to OpenAI stay warm between uploads
+        # (the SDK default drops idle connections after 5s). With HTTP/2 a
+        # batch's concurrent requests multiplex over one TLS session.
+        self.http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=10,
+                keepalive_expiry=60.0
+            )
+        )
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=self.http)
         self.use_enhanced_pipeline = use_enhanced_pipeline
         # Timeout per image (seconds) - keep tight for 45s total budget
         self.per_image_timeout = 8.0
+        self.redis = get_async_redis()
+        # Parsed Vision API candidates keyed by image digest, least recently used first
+        self._vision_cache: "OrderedDict[str, List[CandidateLocation]]" = OrderedDict()
+        self._vision_cache_lock = threading.Lock()
+        # Vision requests currently running, so duplicate images in a batch share one call
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Images answered by OCR alone (see VISION_SKIP_THRESHOLD)
+        self.vision_calls_skipped = 0
     
     async def analyze_image_async(self, image_bytes: bytes) -> List[CandidateLocation]:
         """
@@ -59,7 +231,10 @@ class VisionService:
     
     async def _analyze_enhanced_async(self, image_bytes: bytes) -> List[CandidateLocation]:
         """
-        Enhanced async analysis using OCR + Vision API in parallel.
+        Enhanced async analysis using OCR, then the Vision API if OCR falls short.
+        
+        Vision is only called when OCR alone finds no location at or above
+        VISION_SKIP_THRESHOLD, so confident captions never cost an API call.
         
         Args:
             image_bytes: Raw image bytes
@@ -68,25 +243,17 @@ class VisionService:
             Combined candidates from both sources
         """
         try:
-            # Run OCR and Vision API in parallel for speed
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             # OCR runs in thread pool (CPU-bound)
-            ocr_future = loop.run_in_executor(
-                _ocr_executor,
-                ocr_service.extract_text,
-                image_bytes
-            )
-            
-            # Vision API runs async (I/O-bound)
-            vision_future = self._analyze_vision_only_async(image_bytes)
-            
-            # Wait for both to complete
-            ocr_result, vision_candidates = await asyncio.gather(
-                ocr_future,
-                vision_future,
-                return_exceptions=True
-            )
+            try:
+                ocr_result = await loop.run_in_executor(
+                    _ocr_executor,
+                    ocr_service.extract_text,
+                    image_bytes
+                )
+            except Exception as e:
+                ocr_result = e
             
             # Handle OCR result
             ocr_candidates = []
@@ -97,10 +264,22 @@ class VisionService:
             elif isinstance(ocr_result, Exception):
                 logger.warning(f"OCR failed: {ocr_result}")
             
-            # Handle Vision result
-            if isinstance(vision_candidates, Exception):
-                logger.warning(f"Vision API failed: {vision_candidates}")
+            # An explicit caption like "📍 Paris, France" already answers the image.
+            # Vision is not started until this is known, so nothing is sent or billed.
+            best_ocr_confidence = max((c.confidence for c in ocr_candidates), default=0.0)
+            if best_ocr_confidence >= settings.VISION_SKIP_THRESHOLD:
+                self.vision_calls_skipped += 1
+                logger.info(
+                    f"Skipping Vision API: OCR confidence {best_ocr_confidence:.2f} "
+                    f"({self.vision_calls_skipped} skipped so far)"
+                )
                 vision_candidates = []
+            else:
+                try:
+                    vision_candidates = await self._analyze_vision_only_async(image_bytes)
+                except Exception as e:
+                    logger.warning(f"Vision API failed: {e}")
+                    vision_candidates = []
             
             logger.info(f"Vision API: {len(vision_candidates)} candidates")
             
@@ -127,112 +306,161 @@ class VisionService:
         Returns:
             Candidates from Vision API only
         """
-        try:
-            # Encode image to base64
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
+        image_key = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+        cached = self._lookup_vision(image_key)
+        if cached is not None:
+            logger.info(f"Vision cache hit: {len(cached)} candidates")
+        else:
+            loop = asyncio.get_running_loop()
+            task = self._inflight.get(image_key)
+            if task is None:
+                task = loop.create_task(self._fetch_vision(image_key, image_bytes))
+                self._inflight[image_key] = task
+                
+                def _forget(done: asyncio.Task) -> None:
+                    if self._inflight.get(image_key) is done:
+                        del self._inflight[image_key]
+                
+                task.add_done_callback(_forget)
+            # Shield so one timed-out waiter does not cancel the call for the others
+            cached = await asyncio.shield(task)
+        
+        # Callers enrich candidates in place; hand out copies
+        return [c.model_copy() for c in cached]
+    
+    async def _fetch_vision(self, image_key: str, image_bytes: bytes) -> List[CandidateLocation]:
+        """
+        Answer from Redis or the Vision API, filling both cache tiers.
+        
+        Args:
+            image_key: Hex digest of the image bytes
+            image_bytes: Raw image bytes
             
-            # Enhanced prompt for better location detection
-            prompt = """You are analyzing a travel/food photo to extract location information.
-
-LOOK CAREFULLY FOR:
-1. Restaurant/cafe/bar names - in signs, menus, receipts, cups, packaging, watermarks
-2. Location text overlays - TikTok/Instagram captions often have location pins or @ mentions
-3. Recognizable landmarks or buildings
-4. Street signs, neighborhood names, city names
-5. Food/drink that's characteristic of a specific famous restaurant (e.g., rainbow bagels = Liberty Bagels)
-6. Receipt headers, branded napkins, or packaging with business names
-7. Background signage or storefronts visible in the image
-
-Even if the main subject is food/drinks, there's often a restaurant name visible somewhere.
-If you recognize a famous dish or presentation style, identify the likely restaurant.
-
-Return ONLY a valid JSON array:
-[{"name": "Restaurant or Place Name", "description": "Brief context about what you see", "confidence": 0.85}]
-
-IMPORTANT:
-- Return specific place names, not generic descriptions
-- If you see "Levain Bakery" cookie style, say "Levain Bakery"
-- If you see a rainbow bagel, it's likely "Liberty Bagels" 
-- Confidence: 0.95 for clearly visible names, 0.7-0.85 for recognized famous items
-- Return [] ONLY if you genuinely cannot identify ANY location clue"""
-
-            # Call OpenAI Vision API with async client
-            response = await self.async_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
-                                    "detail": "high"  # Use high detail for better recognition
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=400,  # Allow longer response for detailed extraction
-                temperature=0.3  # Slight creativity for recognizing famous items
+        Returns:
+            Candidates from Vision API only (shared; callers must copy)
+        """
+        cache_key = f"vision:{image_key}"
+        try:
+            cached = await self.redis.get(cache_key)
+            if cached:
+                candidates = [CandidateLocation(**c) for c in orjson.loads(cached)]
+                logger.info(f"Vision Redis cache hit: {len(candidates)} candidates")
+                self._remember_vision(image_key, candidates)
+                return candidates
+        except Exception as e:
+            logger.warning(f"Redis cache read error: {e}")
+        
+        candidates = await self._request_vision(image_bytes)
+        if candidates is None:
+            return []
+        
+        # Only parsed answers are cached; errors are retried on the next upload
+        self._remember_vision(image_key, candidates)
+        try:
+            await self.redis.setex(
+                cache_key,
+                settings.VISION_CACHE_TTL,
+                orjson.dumps([c.model_dump() for c in candidates])
             )
+        except Exception as e:
+            logger.warning(f"Redis cache write error: {e}")
+        return candidates
+    
+    def _lookup_vision(self, image_key: str) -> Optional[List[CandidateLocation]]:
+        """Get candidates from the in-process LRU, marking them recently used."""
+        with self._vision_cache_lock:
+            cached = self._vision_cache.get(image_key)
+            if cached is not None:
+                self._vision_cache.move_to_end(image_key)
+            return cached
+    
+    def _remember_vision(self, image_key: str, candidates: List[CandidateLocation]) -> None:
+        """Store candidates in the in-process LRU, evicting the least recently used."""
+        with self._vision_cache_lock:
+            self._vision_cache[image_key] = candidates
+            self._vision_cache.move_to_end(image_key)
+            while len(self._vision_cache) > VISION_CACHE_MAX:
+                self._vision_cache.popitem(last=False)
+    
+    async def _request_vision(self, image_bytes: bytes) -> Optional[List[CandidateLocation]]:
+        """
+        Call GPT-4o Vision for one image.
+        
+        Args:
+            image_bytes: Raw image bytes
             
-            # Parse response
-            content = response.choices[0].message.content
-            logger.info(f"OpenAI Vision response: {content}")
-            
-            # Extract JSON from response
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            # Parse JSON
-            locations_data = json.loads(content)
+        Returns:
+            Parsed candidates, or None if the call or its parsing failed
+        """
+        try:
+            # Downscale off the event loop, then encode image to base64. Use the
+            # default executor: queued behind Tesseract jobs in the OCR pool, the
+            # resize would hold back the API call that dominates latency.
+            loop = asyncio.get_running_loop()
+            upload_bytes = await loop.run_in_executor(None, _prepare_vision_image, image_bytes)
+            image_url = _vision_image_url(upload_bytes)
             
-            # Convert to CandidateLocation objects
-            candidates = []
-            for loc in locations_data:
-                try:
-                    candidate = CandidateLocation(
-                        name=loc.get("name", "Unknown"),
-                        description=loc.get("description"),
-                        confidence=float(loc.get("confidence", 0.7))
-                    )
-                    candidates.append(candidate)
-                except Exception as e:
-                    logger.warning(f"Failed to parse location: {loc}, error: {e}")
-                    continue
+            # Call OpenAI Vision API with async client, streaming so we can
+            # hang up as soon as the JSON object is complete (JSON mode can
+            # otherwise pad with whitespace up to max_tokens)
+            stream = await self.async_client.chat.completions.create(
+                **_vision_request_body(image_url),
+                stream=True
+            )
+            parts = []
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    if "}" in delta:
+                        try:
+                            candidates = _parse_vision_content("".join(parts))
+                        except orjson.JSONDecodeError:
+                            continue  # Closed an inner object; keep reading
+                        logger.info(f"OpenAI Vision response: {''.join(parts)}")
+                        return candidates
+            finally:
+                await stream.close()
             
-            return candidates
+            # Stream ended without a complete object; report the parse error below
+            content = "".join(parts)
+            logger.info(f"OpenAI Vision response: {content}")
+            return _parse_vision_content(content)
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from OpenAI response: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"Error analyzing image: {e}")
-            return []
+            return None
     
     async def analyze_images_batch_async(
         self, 
         images: List[bytes],
-        max_concurrent: int = 3  # Limit concurrent API calls to avoid rate limits
+        max_concurrent: Optional[int] = None,
+        timeout: Optional[float] = None
     ) -> dict:
         """
         Analyze multiple images in parallel with rate limiting.
         
+        Images still running when the timeout expires are cancelled and
+        reported as failed; everything finished by then is kept.
+        
         Args:
             images: List of image bytes
-            max_concurrent: Maximum concurrent API calls
+            max_concurrent: Maximum concurrent API calls; defaults to
+                settings.VISION_MAX_CONCURRENCY to stay inside OpenAI rate limits
+            timeout: Optional overall budget in seconds
             
         Returns:
             Dict with 'candidates' (list) and 'failed_images' (list of failure info)
         """
+        if max_concurrent is None:
+            max_concurrent = settings.VISION_MAX_CONCURRENCY
         logger.info(f"Starting parallel analysis of {len(images)} images (max {max_concurrent} concurrent)")
         
         # Use semaphore to limit concurrent API calls
@@ -241,51 +469,67 @@ IMPORTANT:
         async def analyze_with_semaphore(image_bytes: bytes, index: int):
             async with semaphore:
                 logger.info(f"Processing image {index + 1}/{len(images)}")
-                candidates = await self.analyze_image_async(image_bytes)
-                return {
-                    "index": index,
-                    "candidates": candidates,
-                    "success": len(candidates) > 0
-                }
+                return await self.analyze_image_async(image_bytes)
         
         # Run all analyses in parallel (semaphore limits concurrency)
         tasks = [
-            analyze_with_semaphore(img, i) 
+            asyncio.ensure_future(analyze_with_semaphore(img, i))
             for i, img in enumerate(images)
         ]
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        pending = set()
+        if tasks:
+            try:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+            except asyncio.CancelledError:
+                # Don't leave API calls running for a caller that went away
+                for task in tasks:
+                    task.cancel()
+                raise
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Image analysis timed out with {len(pending)} images unfinished")
         
-        # Collect unique candidates and track failures
-        all_candidates = []
+        # Collect candidates in image order and track failures
+        flat_candidates = []
         failed_images = []
-        seen_names = set()
         
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Image analysis failed with exception: {result}")
+        for image_index, task in enumerate(tasks):
+            if task in pending:
                 failed_images.append({
-                    "index": -1,
+                    "index": image_index + 1,  # 1-indexed for user display
+                    "reason": "Processing timed out"
+                })
+                continue
+            
+            if task.exception() is not None:
+                logger.error(f"Image analysis failed with exception: {task.exception()}")
+                failed_images.append({
+                    "index": image_index + 1,
                     "reason": "Processing error occurred"
                 })
                 continue
             
-            image_index = result["index"]
-            candidates = result["candidates"]
+            candidates = task.result()
             
             if not candidates:
                 # Track why this image failed
                 failed_images.append({
-                    "index": image_index + 1,  # 1-indexed for user display
+                    "index": image_index + 1,
                     "reason": "No recognizable location or landmark found in image"
                 })
                 logger.info(f"Image {image_index + 1} produced no candidates")
             else:
-                for candidate in candidates:
-                    normalized_name = candidate.name.lower().strip()
-                    if normalized_name not in seen_names:
-                        seen_names.add(normalized_name)
-                        all_candidates.append(candidate)
+                flat_candidates.extend(candidates)
+        
+        # Dedup on NFKC-folded names so full-width or ligature variants collapse;
+        # the first occurrence wins, preserving image order
+        unique_candidates = {}
+        for candidate in flat_candidates:
+            key = unicodedata.normalize("NFKC", candidate.name).casefold().strip()
+            unique_candidates.setdefault(key, candidate)
+        all_candidates = list(unique_candidates.values())
         
         logger.info(f"Batch analysis complete: {len(all_candidates)} unique candidates, {len(failed_images)} failed images")
         
@@ -296,14 +540,111 @@ IMPORTANT:
             "successful_count": len(images) - len(failed_images)
         }
     
-    # Sync wrapper for backwards compatibility
-    def analyze_image(self, image_bytes: bytes) -> List[CandidateLocation]:
-        """Sync wrapper for analyze_image_async."""
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(self.analyze_image_async(image_bytes))
-        finally:
-            loop.close()
+    async def submit_batch_vision(self, images: List[bytes]) -> str:
+        """
+        Queue images on the OpenAI Batch API for offline bulk analysis.
+        
+        Batch jobs run at half the price within a 24h window and do not count
+        against the real-time rate limits; collect them with collect_batch_vision.
+        
+        Args:
+            images: List of image bytes
+            
+        Returns:
+            OpenAI batch id
+        """
+        loop = asyncio.get_running_loop()
+        upload_images = await asyncio.gather(*[
+            loop.run_in_executor(None, _prepare_vision_image, image_bytes)
+            for image_bytes in images
+        ])
+        
+        # custom_id carries the image position and digest so results map back
+        # to the input order and can fill the Vision cache
+        lines = []
+        for index, (image_bytes, upload_bytes) in enumerate(zip(images, upload_images)):
+            image_key = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+            lines.append(orjson.dumps({
+                "custom_id": f"{index}:{image_key}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _vision_request_body(_vision_image_url(upload_bytes))
+            }))
+        
+        batch_file = await self.async_client.files.create(
+            file=("vision_batch.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        # The pinned SDK predates client.batches; use its generic request helpers
+        batch = await self.async_client.post(
+            "/batches",
+            body={
+                "input_file_id": batch_file.id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            },
+            cast_to=object
+        )
+        logger.info(f"Submitted Vision batch {batch['id']} with {len(images)} images")
+        return batch["id"]
+    
+    async def collect_batch_vision(self, batch_id: str) -> Optional[List[List[CandidateLocation]]]:
+        """
+        Fetch the results of a batch from submit_batch_vision.
+        
+        Args:
+            batch_id: OpenAI batch id
+            
+        Returns:
+            Candidates per submitted image (in submission order), or None while
+            the batch is still running. Images whose request failed get [].
+            
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        batch = await self.async_client.get(f"/batches/{batch_id}", cast_to=object)
+        status = batch.get("status")
+        if status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Vision batch {batch_id} ended with status {status}")
+        if status != "completed":
+            logger.info(f"Vision batch {batch_id} is {status}")
+            return None
+        
+        counts = batch.get("request_counts") or {}
+        results: List[List[CandidateLocation]] = [[] for _ in range(counts.get("total", 0))]
+        output_file_id = batch.get("output_file_id")
+        if not output_file_id:
+            return results
+        
+        output = await self.async_client.files.content(output_file_id)
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            index_str, image_key = record["custom_id"].split(":", 1)
+            index = int(index_str)
+            if index >= len(results):
+                results.extend([] for _ in range(index + 1 - len(results)))
+            
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning(f"Vision batch request {index} failed: {record.get('error')}")
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                candidates = _parse_vision_content(content)
+            except (KeyError, IndexError, orjson.JSONDecodeError) as e:
+                logger.warning(f"Could not parse Vision batch result {index}: {e}")
+                continue
+            
+            self._remember_vision(image_key, candidates)
+            results[index] = [c.model_copy() for c in candidates]
+        
+        return results
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        await self.http.aclose()
 
 
 # Singleton instance
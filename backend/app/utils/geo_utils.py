@@ -1,6 +1,12 @@
 """Geographic utilities for location processing."""
 import math
-from typing import Tuple
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+_DEG_TO_RAD = math.pi / 180
+_HALF_DEG_TO_RAD = math.pi / 360
+# Meridian arc length of one degree of latitude on the Haversine sphere
+_METERS_PER_DEGREE_LAT = 6371000 * _DEG_TO_RAD
 
 
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -19,23 +25,146 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     # Earth's radius in meters
     R = 6371000
     
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lng = math.radians(lng2 - lng1)
+    # Half-angle sines straight from degrees; no separate radians() calls
+    sin_half_lat = math.sin((lat2 - lat1) * _HALF_DEG_TO_RAD)
+    sin_half_lng = math.sin((lng2 - lng1) * _HALF_DEG_TO_RAD)
     
     # Haversine formula
     a = (
-        math.sin(delta_lat / 2) ** 2 +
-        math.cos(lat1_rad) * math.cos(lat2_rad) *
-        math.sin(delta_lng / 2) ** 2
+        sin_half_lat * sin_half_lat +
+        math.cos(lat1 * _DEG_TO_RAD) * math.cos(lat2 * _DEG_TO_RAD) *
+        sin_half_lng * sin_half_lng
     )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    # Rounding can push antipodal pairs a hair past 1; asin needs one sqrt where atan2 needs two
+    c = 2 * math.asin(math.sqrt(min(a, 1.0)))
     
     return R * c
 
 
+def haversine_distance_matrix(
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    other_lats: Optional[Sequence[float]] = None,
+    other_lngs: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Calculate pairwise Haversine distances between points in one vectorized pass.
+    
+    Args:
+        lats: Latitudes of the points
+        lngs: Longitudes of the points (same length as lats)
+        other_lats: Latitudes of a second point set (default: the first set)
+        other_lngs: Longitudes of a second point set (default: the first set)
+        
+    Returns:
+        (n, m) array of distances in meters between point i and other point j
+    """
+    # Earth's radius in meters
+    R = 6371000
+    
+    lat_rad = np.radians(np.asarray(lats, dtype=float))
+    lng_rad = np.radians(np.asarray(lngs, dtype=float))
+    if other_lats is None:
+        other_lat_rad, other_lng_rad = lat_rad, lng_rad
+    else:
+        other_lat_rad = np.radians(np.asarray(other_lats, dtype=float))
+        other_lng_rad = np.radians(np.asarray(other_lngs, dtype=float))
+    
+    # Work in two (n, m) buffers updated in place rather than a temporary per operation
+    a = np.subtract.outer(lat_rad, other_lat_rad)
+    a *= 0.5
+    np.sin(a, out=a)
+    np.square(a, out=a)
+    
+    b = np.subtract.outer(lng_rad, other_lng_rad)
+    b *= 0.5
+    np.sin(b, out=b)
+    np.square(b, out=b)
+    b *= np.cos(lat_rad)[:, None]
+    b *= np.cos(other_lat_rad)[None, :]
+    a += b
+    # Rounding can push antipodal pairs a hair past 1
+    np.minimum(a, 1.0, out=a)
+    
+    # c = 2 * asin(sqrt(a)), scaled to meters
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * R
+    
+    return a
+
+
+def haversine_distance_array(
+    lat: float,
+    lng: float,
+    lats: Sequence[float],
+    lngs: Sequence[float]
+) -> np.ndarray:
+    """
+    Calculate Haversine distances from one point to many in one vectorized pass.
+    
+    Args:
+        lat: Latitude of the reference point
+        lng: Longitude of the reference point
+        lats: Latitudes of the other points
+        lngs: Longitudes of the other points (same length as lats)
+        
+    Returns:
+        Array of distances in meters, aligned with lats/lngs
+    """
+    return haversine_distance_matrix([lat], [lng], lats, lngs)[0]
+
+
+def haversine_distance_vector(
+    lat1: Sequence[float],
+    lng1: Sequence[float],
+    lat2: Sequence[float],
+    lng2: Sequence[float]
+) -> np.ndarray:
+    """
+    Calculate elementwise Haversine distances between paired points in one vectorized pass.
+    
+    Unlike haversine_distance_matrix, point i is only compared with other point i.
+    Inputs broadcast, so any argument may also be a scalar.
+    
+    Args:
+        lat1: Latitudes of the first points
+        lng1: Longitudes of the first points
+        lat2: Latitudes of the second points
+        lng2: Longitudes of the second points
+        
+    Returns:
+        Array of distances in meters, one per pair
+    """
+    # Earth's radius in meters
+    R = 6371000
+    
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    # Rounding can push antipodal pairs a hair past 1
+    return 2 * R * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _coords_array(coords: list) -> np.ndarray:
+    """
+    Pack (lat, lng) pairs into an (n, 2) float array, dropping pairs with a None.
+    
+    Args:
+        coords: List of (lat, lng) tuples
+        
+    Returns:
+        Array of the valid coordinates
+    """
+    points = np.array(
+        [(np.nan if lat is None else lat, np.nan if lng is None else lng) for lat, lng in coords],
+        dtype=float
+    ).reshape(-1, 2)
+    return points[np.isfinite(points).all(axis=1)]
+
+
 def are_locations_nearby(
     lat1: float, lng1: float,
     lat2: float, lng2: float,
@@ -54,6 +183,11 @@ def are_locations_nearby(
     Returns:
         True if locations are within radius
     """
+    # A great circle is never shorter than the north-south separation, so points
+    # that far apart in latitude are rejected without trig (slack absorbs rounding)
+    if abs(lat2 - lat1) * _METERS_PER_DEGREE_LAT > radius_meters * (1 + 1e-9):
+        return False
+    
     distance = haversine_distance(lat1, lng1, lat2, lng2)
     return distance <= radius_meters
 
@@ -76,6 +210,9 @@ def get_midpoint(lat1: float, lng1: float, lat2: float, lng2: float) -> Tuple[fl
     """
     Calculate midpoint between two coordinates.
     
+    Plain arithmetic, so NumPy arrays of coordinates broadcast elementwise and
+    many midpoints come back as (lat_array, lng_array) in one pass.
+    
     Args:
         lat1: Latitude of point 1
         lng1: Longitude of point 1
@@ -105,15 +242,27 @@ def calculate_centroid(coords: list) -> Tuple[float, float]:
     if not coords:
         return None, None
     
-    valid_coords = [(lat, lng) for lat, lng in coords if lat is not None and lng is not None]
+    points = _coords_array(coords)
+    return calculate_centroid_arrays(points[:, 0], points[:, 1])
+
+
+def calculate_centroid_arrays(lats: Sequence[float], lngs: Sequence[float]) -> Tuple[float, float]:
+    """
+    Calculate the geographic centroid of coordinates held as parallel arrays.
     
-    if not valid_coords:
+    Args:
+        lats: Latitudes (no missing values)
+        lngs: Longitudes, aligned with lats
+        
+    Returns:
+        Tuple of (latitude, longitude) for centroid, or (None, None) if empty
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    if not len(lats):
         return None, None
     
-    avg_lat = sum(lat for lat, _ in valid_coords) / len(valid_coords)
-    avg_lng = sum(lng for _, lng in valid_coords) / len(valid_coords)
-    
-    return avg_lat, avg_lng
+    return float(lats.mean()), float(lngs.mean())
 
 
 def calculate_bounding_radius(coords: list, centroid: Tuple[float, float]) -> float:
@@ -130,11 +279,33 @@ def calculate_bounding_radius(coords: list, centroid: Tuple[float, float]) -> fl
     if not coords or centroid[0] is None:
         return 50000.0  # Default 50km when no data
     
+    points = _coords_array(coords)
+    return calculate_bounding_radius_arrays(points[:, 0], points[:, 1], centroid)
+
+
+def calculate_bounding_radius_arrays(
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    centroid: Tuple[float, float]
+) -> float:
+    """
+    Calculate the radius that encompasses all coordinates held as parallel arrays.
+    
+    Args:
+        lats: Latitudes (no missing values)
+        lngs: Longitudes, aligned with lats
+        centroid: Tuple of (lat, lng) for the center point
+        
+    Returns:
+        Radius in meters that contains all points, minimum 10km, maximum 100km
+    """
+    if centroid[0] is None:
+        return 50000.0  # Default 50km when no data
+    
+    lats = np.asarray(lats, dtype=float)
     max_distance = 0.0
-    for lat, lng in coords:
-        if lat is not None and lng is not None:
-            distance = haversine_distance(centroid[0], centroid[1], lat, lng)
-            max_distance = max(max_distance, distance)
+    if len(lats):
+        max_distance = float(haversine_distance_vector(centroid[0], centroid[1], lats, lngs).max())
     
     # Add 20% buffer, with minimum 10km and maximum 100km
     radius = max_distance * 1.2
@@ -169,3 +340,38 @@ def score_by_proximity(
     
     return score
 
+
+def score_by_proximity_batch(
+    coords: list,
+    centroid: Tuple[float, float],
+    max_reasonable_distance: float = 100000.0  # 100km
+) -> np.ndarray:
+    """
+    Score many candidate locations by proximity to the cluster centroid in one pass.
+    
+    Vectorized counterpart of score_by_proximity; prefer the scalar version for a
+    single candidate.
+    
+    Args:
+        coords: List of (lat, lng) tuples for the candidates
+        centroid: Tuple of (lat, lng) for the center point
+        max_reasonable_distance: Maximum distance in meters to consider (default 100km)
+        
+    Returns:
+        Array of scores aligned with coords, 0.5 (neutral) where either side lacks data
+    """
+    scores = np.full(len(coords), 0.5)
+    if centroid[0] is None or not coords:
+        return scores
+    
+    points = np.array(
+        [(np.nan if lat is None else lat, np.nan if lng is None else lng) for lat, lng in coords],
+        dtype=float
+    )
+    valid = np.isfinite(points).all(axis=1)
+    distances = haversine_distance_vector(centroid[0], centroid[1], points[valid, 0], points[valid, 1])
+    
+    # Linear decay: score of 1.0 at centroid, 0.0 at max_reasonable_distance
+    scores[valid] = np.maximum(0.0, 1.0 - distances / max_reasonable_distance)
+    
+    return scores
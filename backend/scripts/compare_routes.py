@@ -37,8 +37,9 @@ SUGGESTED_ROUTE = [
     "Levain Bakery",
 ]
 
-def calculate_route_total(route_names):
-    """Calculate total walking time and distance for a route."""
+def calculate_route_total(route_names, durations, distances):
+    """Calculate total walking time and distance for a route from precomputed matrices."""
+    index = {name: i for i, name in enumerate(LOCATIONS)}
     total_time = 0
     total_distance = 0
     segments = []
@@ -47,35 +48,24 @@ def calculate_route_total(route_names):
     print(f"Calculating route: {' → '.join(route_names)}")
     print(f"{'='*60}")
     
-    for i in range(len(route_names) - 1):
-        from_name = route_names[i]
-        to_name = route_names[i + 1]
+    for from_name, to_name in zip(route_names, route_names[1:]):
+        i, j = index[from_name], index[to_name]
+        duration = int(durations[i, j])
+        distance = int(distances[i, j])
         
-        from_loc = LOCATIONS[from_name]
-        to_loc = LOCATIONS[to_name]
+        total_time += duration
+        total_distance += distance
         
-        try:
-            distance_info = distance_matrix_service._get_distance(from_loc, to_loc, mode="walking")
-            duration = distance_info["duration_seconds"]
-            distance = distance_info["distance_meters"]
-            
-            total_time += duration
-            total_distance += distance
-            
-            segments.append({
-                "from": from_name,
-                "to": to_name,
-                "duration": duration,
-                "distance": distance
-            })
-            
-            print(f"  {from_name} → {to_name}")
-            print(f"    Time: {duration // 60} min {duration % 60} sec ({duration} sec)")
-            print(f"    Distance: {distance / 1000:.2f} km ({distance} m)")
-            
-        except Exception as e:
-            print(f"  ERROR calculating {from_name} → {to_name}: {e}")
-            return None
+        segments.append({
+            "from": from_name,
+            "to": to_name,
+            "duration": duration,
+            "distance": distance
+        })
+        
+        print(f"  {from_name} → {to_name}")
+        print(f"    Time: {duration // 60} min {duration % 60} sec ({duration} sec)")
+        print(f"    Distance: {distance / 1000:.2f} km ({distance} m)")
     
     return {
         "total_time_seconds": total_time,
@@ -87,17 +77,17 @@ def main():
     print("Route Comparison Tool")
     print("=" * 60)
     
-    # Calculate current route
-    current_result = calculate_route_total(CURRENT_ROUTE)
-    if not current_result:
-        print("Failed to calculate current route")
+    # Fetch every pair once; both routes are then plain lookups
+    try:
+        durations, distances = distance_matrix_service.get_matrix(
+            list(LOCATIONS.values()), mode="walking"
+        )
+    except Exception as e:
+        print(f"ERROR calculating distance matrix: {e}")
         return
     
-    # Calculate suggested route
-    suggested_result = calculate_route_total(SUGGESTED_ROUTE)
-    if not suggested_result:
-        print("Failed to calculate suggested route")
-        return
+    current_result = calculate_route_total(CURRENT_ROUTE, durations, distances)
+    suggested_result = calculate_route_total(SUGGESTED_ROUTE, durations, distances)
     
     # Compare
     print(f"\n{'='*60}")
@@ -3,10 +3,16 @@ import pytest
 from app.core.config import Settings
 
 
+@pytest.fixture(scope="module")
+def settings():
+    """One Settings instance for the module; env parsing and validation run once."""
+    return Settings()
+
+
 class TestSettings:
     """Test Settings configuration class."""
     
-    def test_settings_has_required_fields(self):
+    def test_settings_has_required_fields(self, settings):
         """Verify all required configuration fields exist."""
         required_fields = [
             'DATABASE_URL',
@@ -16,72 +22,64 @@ class TestSettings:
             'JWT_SECRET',
         ]
         
-        settings = Settings()
-        for field in required_fields:
-            assert hasattr(settings, field), f"Missing required field: {field}"
+        missing = {field for field in required_fields if not hasattr(settings, field)}
+        assert not missing, f"Missing required fields: {sorted(missing)}"
     
-    def test_settings_has_feature_flags(self):
+    def test_settings_has_feature_flags(self, settings):
         """Verify feature flag fields exist."""
         feature_flags = [
             'USE_MOCK_VISION',
             'USE_ENHANCED_PIPELINE',
         ]
         
-        settings = Settings()
-        for flag in feature_flags:
-            assert hasattr(settings, flag), f"Missing feature flag: {flag}"
+        missing = {flag for flag in feature_flags if not hasattr(settings, flag)}
+        assert not missing, f"Missing feature flags: {sorted(missing)}"
     
     def test_use_mock_vision_defaults_to_false(self):
         """Mock vision should be disabled by default."""
         # Don't depend on environment/.env during tests; assert the configured default.
         assert Settings.model_fields["USE_MOCK_VISION"].default is False
     
-    def test_use_enhanced_pipeline_defaults_to_true(self):
+    def test_use_enhanced_pipeline_defaults_to_true(self, settings):
         """Enhanced pipeline should be enabled by default."""
-        settings = Settings()
         assert settings.USE_ENHANCED_PIPELINE is True
     
-    def test_environment_properties(self):
+    def test_environment_properties(self, settings):
         """Test environment helper properties."""
-        settings = Settings()
-        
         # Should have environment detection methods
         assert hasattr(settings, 'is_development')
         assert hasattr(settings, 'is_production')
         assert isinstance(settings.is_development, bool)
         assert isinstance(settings.is_production, bool)
     
-    def test_jwt_defaults(self):
+    def test_jwt_defaults(self, settings):
         """Test JWT configuration defaults."""
-        settings = Settings()
-        
         assert settings.JWT_ALGORITHM == "HS256"
         assert settings.ACCESS_TOKEN_EXPIRE_MINUTES == 60 * 24 * 7  # 7 days
     
-    def test_rate_limits_exist(self):
+    def test_rate_limits_exist(self, settings):
         """Test rate limiting configuration."""
-        settings = Settings()
-        
-        assert hasattr(settings, 'RATE_LIMIT_UPLOADS_PER_HOUR')
-        assert hasattr(settings, 'RATE_LIMIT_OPTIMIZATIONS_PER_DAY')
+        rate_limits = ['RATE_LIMIT_UPLOADS_PER_HOUR', 'RATE_LIMIT_OPTIMIZATIONS_PER_DAY']
+        missing = {field for field in rate_limits if not hasattr(settings, field)}
+        assert not missing, f"Missing rate limits: {sorted(missing)}"
         assert settings.RATE_LIMIT_UPLOADS_PER_HOUR > 0
         assert settings.RATE_LIMIT_OPTIMIZATIONS_PER_DAY > 0
     
-    def test_google_maps_config(self):
+    def test_google_maps_config(self, settings):
         """Test Google Maps configuration."""
-        settings = Settings()
-        
         assert settings.MAX_WAYPOINTS_IN_URL == 9
         assert settings.DISTANCE_MATRIX_CACHE_TTL == 60 * 60 * 24 * 30  # 30 days
     
-    def test_api_prefix(self):
+    def test_geocode_cache_ttls(self, settings):
+        """Geocodes outlive alternatives, which outlive opening hours."""
+        assert settings.GEOCODE_CACHE_TTL == 60 * 60 * 24 * 30  # 30 days
+        assert settings.GEOCODE_ALTERNATIVES_TTL == 60 * 60 * 24 * 7  # 7 days
+        assert settings.PLACE_DETAILS_CACHE_TTL < settings.GEOCODE_ALTERNATIVES_TTL
+    
+    def test_api_prefix(self, settings):
         """Test API versioning prefix."""
-        settings = Settings()
-        
         assert settings.API_V1_PREFIX == "/v1"
     
-    def test_project_name(self):
+    def test_project_name(self, settings):
         """Test project name configuration."""
-        settings = Settings()
-        
         assert settings.PROJECT_NAME == "Plan_A"
@@ -0,0 +1,30 @@
+"""Shared fixtures for service tests."""
+import pytest
+from app.services.entity_resolver import EntityResolver
+
+
+# EntityResolver holds only its thresholds, so one instance per configuration
+# can serve every test in the session.
+
+@pytest.fixture(scope="session")
+def resolver():
+    """Resolver with the default thresholds (0.85 similarity, 50m radius)."""
+    return EntityResolver()
+
+
+@pytest.fixture(scope="session")
+def exact_resolver():
+    """Resolver that only merges identical normalized names."""
+    return EntityResolver(similarity_threshold=1.0)
+
+
+@pytest.fixture(scope="session")
+def strict_resolver():
+    """Resolver with a 0.90 similarity threshold."""
+    return EntityResolver(similarity_threshold=0.90)
+
+
+@pytest.fixture(scope="session")
+def loose_resolver():
+    """Resolver with a 0.70 similarity threshold for translation variants."""
+    return EntityResolver(similarity_threshold=0.70)
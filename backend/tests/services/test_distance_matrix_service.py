@@ -0,0 +1,154 @@
+"""Tests for distance matrix service."""
+from types import SimpleNamespace
+import orjson
+from app.models.schemas import LatLng
+from app.services.distance_matrix_service import (
+    DistanceMatrixService,
+    MAX_ELEMENTS_PER_REQUEST,
+    MAX_PLACES_PER_REQUEST,
+)
+
+
+class FakeGmaps:
+    """Distance Matrix stand-in whose durations encode the (origin, destination) indices."""
+
+    def __init__(self, locations, unroutable=()):
+        self.index = {f"{p.lat},{p.lng}": k for k, p in enumerate(locations)}
+        self.unroutable = set(unroutable)
+        self.calls = []
+
+    def distance_matrix(self, origins, destinations, mode):
+        self.calls.append((origins, destinations))
+        rows = []
+        for origin in origins:
+            elements = []
+            for destination in destinations:
+                i, j = self.index[origin], self.index[destination]
+                if (i, j) in self.unroutable:
+                    elements.append({"status": "ZERO_RESULTS"})
+                else:
+                    elements.append({
+                        "status": "OK",
+                        "duration": {"value": 1000 * i + j},
+                        "distance": {"value": 10 * (1000 * i + j)}
+                    })
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the sync Redis client."""
+
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def pipeline(self, transaction=True):
+        return SimpleNamespace(setex=self.setex, execute=lambda: None)
+
+
+def _locations(n):
+    return [LatLng(lat=48.85 + 0.001 * k, lng=2.29 + 0.001 * k) for k in range(n)]
+
+
+def _make_service(locations, unroutable=()):
+    service = DistanceMatrixService()
+    service.client = FakeGmaps(locations, unroutable)
+    service.redis = FakeRedis()
+    return service
+
+
+class TestGetMatrix:
+    """Test batched fetching of the full matrix."""
+
+    def test_tiles_stay_within_request_limits(self):
+        locations = _locations(MAX_PLACES_PER_REQUEST + 5)
+        service = _make_service(locations)
+
+        durations, distances = service.get_matrix(locations)
+
+        requested = []
+        for origins, destinations in service.client.calls:
+            assert len(origins) <= MAX_PLACES_PER_REQUEST
+            assert len(destinations) <= MAX_PLACES_PER_REQUEST
+            assert len(origins) * len(destinations) <= MAX_ELEMENTS_PER_REQUEST
+            requested.extend((o, d) for o in origins for d in destinations)
+        # Every pair is requested exactly once across the tiles
+        assert len(requested) == len(set(requested)) == len(locations) ** 2
+
+        n = len(locations)
+        for i in range(n):
+            for j in range(n):
+                expected = 0 if i == j else 1000 * i + j
+                assert durations[i, j] == expected
+                assert distances[i, j] == 10 * expected
+        assert len(service.redis.store) == n * (n - 1)
+
+    def test_partial_cache_hits_fetch_only_missing_origins(self):
+        locations = _locations(3)
+        service = _make_service(locations)
+        point_strs = [f"{p.lat},{p.lng}" for p in locations]
+        cached_entry = orjson.dumps(
+            {"duration_seconds": 7, "distance_meters": 70, "mode": "walking", "transit_details": None}
+        )
+        for i in (0, 1):
+            for j in range(3):
+                if i != j:
+                    service.redis.store[service._get_cache_key(point_strs[i], point_strs[j], "walking")] = cached_entry
+
+        durations, _ = service.get_matrix(locations)
+
+        assert [origins for origins, _ in service.client.calls] == [[point_strs[2]]]
+        assert durations[0, 1] == durations[1, 2] == 7
+        assert durations[2, 0] == 2000
+        assert durations[2, 1] == 2001
+
+    def test_non_ok_elements_are_estimated_and_not_cached(self):
+        locations = _locations(3)
+        service = _make_service(locations, unroutable={(0, 1)})
+
+        durations, distances = service.get_matrix(locations)
+
+        estimate = service._estimate_distance(locations[0], locations[1], "walking")
+        assert durations[0, 1] == estimate["duration_seconds"]
+        assert distances[0, 1] == estimate["distance_meters"]
+        assert durations[0, 2] == 2
+        point_strs = [f"{p.lat},{p.lng}" for p in locations]
+        assert service._get_cache_key(point_strs[0], point_strs[1], "walking") not in service.redis.store
+        assert len(service.redis.store) == 5
+
+    def test_failed_request_falls_back_to_estimates(self):
+        locations = _locations(2)
+        service = _make_service(locations)
+
+        def fail(**kwargs):
+            raise RuntimeError("quota exceeded")
+
+        service.client.distance_matrix = fail
+        durations, _ = service.get_matrix(locations)
+
+        assert durations[0, 1] == service._estimate_distance(locations[0], locations[1], "walking")["duration_seconds"]
+        assert service.redis.store == {}
+
+
+class TestGetDistanceMatrix:
+    """Test the optimizer-facing matrix."""
+
+    def test_uses_batched_fetch(self):
+        locations = _locations(4)
+        service = _make_service(locations)
+        waypoints = [SimpleNamespace(lat=p.lat, lng=p.lng) for p in locations[1:]]
+
+        result = service.get_distance_matrix(waypoints, locations[0])
+
+        assert len(service.client.calls) == 1
+        assert result["matrix"] == [
+            [0 if i == j else 1000 * i + j for j in range(4)] for i in range(4)
+        ]
+        assert result["transit_details"] == {}
+        assert result["mode"] == "walking"
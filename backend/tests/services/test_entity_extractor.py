@@ -1,6 +1,5 @@
 """Tests for entity extraction service."""
-import pytest
-from app.services.entity_extractor import entity_extractor
+from app.services.entity_extractor import _location_verdict, entity_extractor
 from app.models.schemas import CandidateLocation
 
 
@@ -31,6 +30,11 @@ class TestExtractFromOCRResult:
         assert any(c.name == "Paris, France" for c in candidates)
         assert any(c.confidence >= 0.90 for c in candidates)
     
+    def test_pin_drops_dangling_dash_before_trailer(self):
+        # A dash left hanging before a hashtag or line end is a separator, not part of the name
+        assert entity_extractor._extract_location_pins("📍 Cafe Marly - #paris") == ["Cafe Marly"]
+        assert entity_extractor._extract_location_pins("📍 Cafe - \nmore") == ["Cafe"]
+    
     def test_extract_at_mention(self):
         ocr_result = {
             "text": "Having coffee at Cafe de Flore in Paris",
@@ -41,6 +45,15 @@ class TestExtractFromOCRResult:
         assert len(candidates) > 0
         assert any("Cafe" in c.name or "Flore" in c.name for c in candidates)
     
+    def test_extract_at_mention_across_emoji(self):
+        ocr_result = {
+            "text": "dinner at 🍝 Da Li",
+            "confidence": 0.85
+        }
+        candidates = entity_extractor.extract_from_ocr_result(ocr_result)
+        
+        assert [c.name for c in candidates] == ["Da Li"]
+    
     def test_extract_hashtag_locations(self):
         ocr_result = {
             "text": "Amazing view! #Paris #EiffelTower #France",
@@ -61,6 +74,15 @@ class TestExtractFromOCRResult:
         
         assert len(candidates) == 0
     
+    def test_text_without_location_signals(self):
+        ocr_result = {
+            "text": "so good!! 10/10 would go again",
+            "confidence": 0.9
+        }
+        candidates = entity_extractor.extract_from_ocr_result(ocr_result)
+
+        assert candidates == []
+    
     def test_filter_non_locations(self):
         ocr_result = {
             "text": "like and subscribe at my channel",
@@ -153,7 +175,7 @@ class TestExtractFromVisionResult:
         
         # Should be sorted by confidence descending
         confidences = [c.confidence for c in combined]
-        assert confidences == sorted(confidences, reverse=True)
+        assert all(a >= b for a, b in zip(confidences, confidences[1:]))
 
 
 class TestHelperMethods:
@@ -172,3 +194,15 @@ class TestHelperMethods:
     def test_minimum_length(self):
         assert not entity_extractor._is_likely_location("ab")
         assert entity_extractor._is_likely_location("NYC")
+    
+    def test_stop_word_start_with_any_whitespace(self):
+        assert not entity_extractor._is_likely_location("My Favorite Cafe", is_multi_word=True)
+        assert not entity_extractor._is_likely_location("My\xa0Favorite Cafe", is_multi_word=True)
+        assert entity_extractor._is_likely_location("Mystic Cafe", is_multi_word=True)
+    
+    def test_repeated_checks_hit_cache(self):
+        entity_extractor._is_likely_location("Central Park")
+        hits_before = _location_verdict.cache_info().hits
+        
+        assert entity_extractor._is_likely_location("Central Park")
+        assert _location_verdict.cache_info().hits == hits_before + 1
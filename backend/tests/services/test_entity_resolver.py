@@ -1,14 +1,31 @@
 """Tests for entity resolution service."""
+import numpy as np
 import pytest
-from app.services.entity_resolver import EntityResolver
 from app.models.schemas import CandidateLocation
+from app.services.entity_resolver import _DisjointSet, _component_labels
+
+# Read-only candidates shared across tests; the resolver builds new objects
+# rather than mutating its inputs (see test_inputs_not_mutated)
+EIFFEL_TOWER = CandidateLocation(name="Eiffel Tower", confidence=0.85)
+LOUVRE_MUSEUM = CandidateLocation(name="Louvre Museum", confidence=0.90)
+NOTRE_DAME = CandidateLocation(name="Notre Dame", confidence=0.80)
+
+
+def build_distance_matrix(points):
+    """Full N×N haversine matrix (meters) for an (N, 2) array of (lat, lng) degrees."""
+    rad = np.radians(points)
+    lat, lng = rad[:, None, 0], rad[:, None, 1]
+    a = (
+        np.sin((lat.T - lat) / 2) ** 2 +
+        np.cos(lat) * np.cos(lat.T) * np.sin((lng.T - lng) / 2) ** 2
+    )
+    return 6371000 * 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
 
 
 class TestResolveDuplicates:
     """Test duplicate resolution."""
     
-    def test_merge_similar_names(self):
-        resolver = EntityResolver(similarity_threshold=0.85)
+    def test_merge_similar_names(self, resolver):
         candidates = [
             CandidateLocation(name="Eiffel Tower", confidence=0.80),
             CandidateLocation(name="eiffel tower", confidence=0.85),
@@ -23,13 +40,8 @@ class TestResolveDuplicates:
         # Confidence should be boosted
         assert resolved[0].confidence > 0.80
     
-    def test_keep_distinct_locations(self):
-        resolver = EntityResolver(similarity_threshold=0.85)
-        candidates = [
-            CandidateLocation(name="Eiffel Tower", confidence=0.85),
-            CandidateLocation(name="Louvre Museum", confidence=0.80),
-            CandidateLocation(name="Notre Dame", confidence=0.90)
-        ]
+    def test_keep_distinct_locations(self, resolver):
+        candidates = [EIFFEL_TOWER, LOUVRE_MUSEUM, NOTRE_DAME]
         
         resolution = resolver.resolve_duplicates(candidates)
         resolved = resolution["candidates"]
@@ -37,8 +49,7 @@ class TestResolveDuplicates:
         # Should keep all distinct locations
         assert len(resolved) == 3
     
-    def test_geo_clustering(self):
-        resolver = EntityResolver(geo_radius_meters=50.0)
+    def test_geo_clustering(self, resolver):
         candidates = [
             CandidateLocation(
                 name="Cafe de Flore",
@@ -62,55 +73,73 @@ class TestResolveDuplicates:
         # Should average coordinates
         assert 48.8542 <= resolved[0].lat <= 48.8543
     
-    def test_empty_list(self):
-        resolver = EntityResolver()
+    def test_empty_list(self, resolver):
         resolution = resolver.resolve_duplicates([])
         
         assert resolution == {"candidates": [], "duplicates_merged": []}
     
-    def test_single_candidate(self):
-        resolver = EntityResolver()
-        candidates = [
-            CandidateLocation(name="Eiffel Tower", confidence=0.85)
-        ]
+    def test_single_candidate(self, resolver):
+        candidates = [EIFFEL_TOWER]
         
         resolution = resolver.resolve_duplicates(candidates)
         resolved = resolution["candidates"]
         
         assert len(resolved) == 1
         assert resolved[0].name == "Eiffel Tower"
+    
+    def test_track_merged_duplicates(self, resolver):
+        candidates = [
+            LOUVRE_MUSEUM,
+            CandidateLocation(name="Louvre Musuem", confidence=0.70),
+            NOTRE_DAME
+        ]
+        
+        resolution = resolver.resolve_duplicates(candidates)
+        
+        assert resolution["duplicates_merged"] == [
+            {"original": "Louvre Musuem", "merged_into": "Louvre Museum"}
+        ]
+    
+    def test_inputs_not_mutated(self, resolver):
+        candidates = [
+            LOUVRE_MUSEUM,
+            CandidateLocation(name="Louvre Musuem", confidence=0.70, lat=48.8606, lng=2.3376),
+            EIFFEL_TOWER
+        ]
+        before = [c.model_dump() for c in candidates]
+        
+        resolver.resolve_duplicates(candidates)
+        
+        assert [c.model_dump() for c in candidates] == before
 
 
 class TestMergeByTextSimilarity:
     """Test text-based merging."""
     
-    def test_exact_match(self):
-        resolver = EntityResolver(similarity_threshold=1.0)
+    def test_exact_match(self, exact_resolver):
         candidates = [
             CandidateLocation(name="Paris", confidence=0.80),
             CandidateLocation(name="Paris", confidence=0.85)
         ]
         
-        resolved = resolver._merge_by_text_similarity(candidates)
+        resolved = exact_resolver._merge_by_text_similarity(candidates)
         
         assert len(resolved) == 1
         assert resolved[0].confidence > 0.80
     
-    def test_translation_variants(self):
-        resolver = EntityResolver(similarity_threshold=0.70)
+    def test_translation_variants(self, loose_resolver):
         candidates = [
-            CandidateLocation(name="Eiffel Tower", confidence=0.85),
+            EIFFEL_TOWER,
             CandidateLocation(name="Tour Eiffel", confidence=0.80)
         ]
         
-        resolved = resolver._merge_by_text_similarity(candidates)
+        resolved = loose_resolver._merge_by_text_similarity(candidates)
         
         # May or may not merge depending on similarity threshold
         # This tests the behavior
         assert len(resolved) <= 2
     
-    def test_different_languages_same_place(self):
-        resolver = EntityResolver(similarity_threshold=0.85)
+    def test_different_languages_same_place(self, resolver):
         candidates = [
             CandidateLocation(name="New York", confidence=0.85),
             CandidateLocation(name="Nueva York", confidence=0.80)
@@ -120,13 +149,25 @@ class TestMergeByTextSimilarity:
         
         # Should not merge (too different)
         assert len(resolved) == 2
+    
+    def test_chained_variants_merge_transitively(self, strict_resolver):
+        candidates = [
+            CandidateLocation(name="Cafe de Flore", confidence=0.85),
+            CandidateLocation(name="Cafe de Fl", confidence=0.70),
+            CandidateLocation(name="Cafe de Flor", confidence=0.80)
+        ]
+        
+        resolved = strict_resolver._merge_by_text_similarity(candidates)
+        
+        # "Cafe de Fl" only matches the middle variant, but still joins the cluster
+        assert len(resolved) == 1
+        assert resolved[0].name == "Cafe de Flore"
 
 
 class TestMergeByProximity:
     """Test geo-based merging."""
     
-    def test_merge_nearby_locations(self):
-        resolver = EntityResolver(geo_radius_meters=50.0)
+    def test_merge_nearby_locations(self, resolver):
         candidates = [
             CandidateLocation(
                 name="Starbucks",
@@ -146,8 +187,88 @@ class TestMergeByProximity:
         
         assert len(resolved) == 1
     
-    def test_keep_distant_locations(self):
-        resolver = EntityResolver(geo_radius_meters=50.0)
+    def test_blocked_distances_match_single_block(self, resolver, monkeypatch):
+        candidates = [
+            CandidateLocation(name=f"Spot {i}", confidence=0.80, lat=48.8584 + i * 0.0003, lng=2.2945)
+            for i in range(7)
+        ]
+        
+        first, second = resolver._nearby_pairs(candidates)
+        expected = list(zip(first.tolist(), second.tolist()))
+        monkeypatch.setattr("app.services.entity_resolver.PROXIMITY_BLOCK_SIZE", 2)
+        first, second = resolver._nearby_pairs(candidates)
+        
+        # Each spot is ~33m from the next, so only neighbours pair up
+        assert list(zip(first.tolist(), second.tolist())) == expected
+        assert expected == [(i, i + 1) for i in range(6)]
+    
+    def test_grid_pairs_match_full_distance_matrix(self, resolver):
+        # Dense clusters (many pairs) plus scattered points (few), including
+        # a cluster straddling the antimeridian
+        rng = np.random.default_rng(7)
+        centers = np.array([[48.8584, 2.2945], [40.7128, -74.0060], [-16.5, 179.9995]])
+        clustered = centers[rng.integers(0, len(centers), 300)] + rng.normal(0, 0.0004, (300, 2))
+        scattered = np.column_stack([rng.uniform(-60, 60, 50), rng.uniform(-180, 180, 50)])
+        points = np.vstack([clustered, scattered])
+        points[:, 1] = (points[:, 1] + 180) % 360 - 180
+        candidates = [
+            CandidateLocation(name=f"Spot {i}", confidence=0.80, lat=lat, lng=lng)
+            for i, (lat, lng) in enumerate(points)
+        ]
+        
+        first, second = resolver._nearby_pairs(candidates)
+        
+        expected = np.argwhere(np.triu(build_distance_matrix(points) <= resolver.geo_radius_meters, k=1))
+        assert len(expected) > 100
+        assert list(zip(first.tolist(), second.tolist())) == [tuple(pair) for pair in expected.tolist()]
+    
+    def test_clusters_match_pairwise_union_find(self, resolver):
+        # ~1000 points in loose clusters, so components chain through several links
+        rng = np.random.default_rng(11)
+        centers = rng.uniform([48.80, 2.25], [48.90, 2.40], (40, 2))
+        points = centers[rng.integers(0, len(centers), 1000)] + rng.normal(0, 0.0005, (1000, 2))
+        candidates = [
+            CandidateLocation(name=f"Spot {i}", confidence=0.80, lat=lat, lng=lng)
+            for i, (lat, lng) in enumerate(points)
+        ]
+        
+        first, second = resolver._nearby_pairs(candidates)
+        labels = _component_labels(len(candidates), first, second)
+        
+        oracle = _DisjointSet(len(candidates))
+        for i, j in np.argwhere(np.triu(build_distance_matrix(points) <= resolver.geo_radius_meters, k=1)).tolist():
+            oracle.union(i, j)
+        groups = {}
+        for i, label in enumerate(labels.tolist()):
+            groups.setdefault(label, []).append(i)
+        assert list(groups.values()) == oracle.groups()
+        assert len(resolver._merge_by_proximity(candidates)) == len(groups)
+    
+    def test_grid_finds_pairs_across_antimeridian(self, resolver):
+        candidates = [
+            CandidateLocation(name="East", confidence=0.80, lat=-16.5, lng=179.9999),
+            CandidateLocation(name="Far", confidence=0.80, lat=-16.5, lng=178.0),
+            CandidateLocation(name="West", confidence=0.80, lat=-16.5, lng=-179.9999)
+        ]
+        
+        first, second = resolver._nearby_pairs(candidates)
+        
+        # East and West are ~21m apart despite opposite longitude signs
+        assert list(zip(first.tolist(), second.tolist())) == [(0, 2)]
+    
+    def test_chain_of_nearby_locations_merges_once(self, resolver):
+        candidates = [
+            CandidateLocation(name=f"Spot {i}", confidence=0.80, lat=48.8584 + i * 0.0003, lng=2.2945)
+            for i in range(5)
+        ]
+        candidates.append(CandidateLocation(name="Far", confidence=0.80, lat=48.9, lng=2.2945))
+        
+        resolved = resolver._merge_by_proximity(candidates)
+        
+        # Neighbours ~33m apart link the whole chain into one cluster
+        assert [c.name for c in resolved] == ["Spot 0", "Far"]
+    
+    def test_keep_distant_locations(self, resolver):
         candidates = [
             CandidateLocation(
                 name="Eiffel Tower",
@@ -167,8 +288,7 @@ class TestMergeByProximity:
         
         assert len(resolved) == 2
     
-    def test_handle_missing_coordinates(self):
-        resolver = EntityResolver()
+    def test_handle_missing_coordinates(self, resolver):
         candidates = [
             CandidateLocation(name="Location A", confidence=0.80),
             CandidateLocation(name="Location B", confidence=0.85, lat=48.8584, lng=2.2945)
@@ -183,8 +303,7 @@ class TestMergeByProximity:
 class TestMergeCandidates:
     """Test candidate merging logic."""
     
-    def test_use_highest_confidence_name(self):
-        resolver = EntityResolver()
+    def test_use_highest_confidence_name(self, resolver):
         candidates = [
             CandidateLocation(name="eiffel tower", confidence=0.75),
             CandidateLocation(name="Eiffel Tower", confidence=0.90),
@@ -196,23 +315,24 @@ class TestMergeCandidates:
         # Should use name from highest confidence candidate
         assert merged.name == "Eiffel Tower"
     
-    def test_boost_confidence_for_multiple_sources(self):
-        resolver = EntityResolver()
-        candidates = [
-            CandidateLocation(name="Paris", confidence=0.70),
-            CandidateLocation(name="Paris", confidence=0.75),
-            CandidateLocation(name="Paris", confidence=0.80)
-        ]
+    @pytest.mark.parametrize("confidences,expected", [
+        pytest.param([0.70, 0.75, 0.80], 0.90, id="three_sources"),
+        # Five sources would give a 40% boost; it stops at 20%
+        pytest.param([0.60] * 5, 0.72, id="boost_capped_at_20_percent"),
+        # 0.9125 * 1.2 would exceed the 0.98 ceiling
+        pytest.param([0.90, 0.92, 0.88, 0.95], 0.98, id="confidence_capped"),
+    ])
+    def test_boost_confidence_for_multiple_sources(self, resolver, confidences, expected):
+        candidates = [CandidateLocation(name="Paris", confidence=c) for c in confidences]
         
         merged = resolver._merge_candidates(candidates)
         
         # Average confidence with boost
-        avg_confidence = (0.70 + 0.75 + 0.80) / 3
-        assert merged.confidence > avg_confidence
-        assert merged.confidence <= 0.98  # Should not exceed max
+        avg_confidence = float(np.mean(confidences))
+        assert avg_confidence < merged.confidence <= 0.98  # Should not exceed max
+        assert merged.confidence == pytest.approx(expected)
     
-    def test_average_coordinates(self):
-        resolver = EntityResolver()
+    def test_average_coordinates(self, resolver):
         candidates = [
             CandidateLocation(name="Cafe", confidence=0.80, lat=48.8584, lng=2.2945),
             CandidateLocation(name="Cafe", confidence=0.85, lat=48.8586, lng=2.2947)
@@ -224,55 +344,59 @@ class TestMergeCandidates:
         assert merged.lat == pytest.approx(48.8585, abs=0.0001)
         assert merged.lng == pytest.approx(2.2946, abs=0.0001)
     
-    def test_prefer_first_place_id(self):
-        resolver = EntityResolver()
+    def test_weight_coordinates_by_confidence(self, resolver):
         candidates = [
-            CandidateLocation(name="Location", confidence=0.80),
-            CandidateLocation(name="Location", confidence=0.85, google_place_id="ChIJ123"),
-            CandidateLocation(name="Location", confidence=0.90, google_place_id="ChIJ456")
+            CandidateLocation(name="Cafe", confidence=0.90, lat=48.8580, lng=2.2940),
+            CandidateLocation(name="Cafe", confidence=0.30, lat=48.8600, lng=2.2960)
         ]
         
         merged = resolver._merge_candidates(candidates)
         
-        # Should use first found place_id
-        assert merged.google_place_id == "ChIJ123"
-
-
-class TestFilterByConfidence:
-    """Test confidence filtering."""
+        # Low-confidence source moves the point a quarter of the way, not half
+        assert merged.lat == pytest.approx(48.8585, abs=0.00001)
+        assert merged.lng == pytest.approx(2.2945, abs=0.00001)
     
-    def test_filter_low_confidence(self):
-        resolver = EntityResolver()
+    def test_prefer_first_place_id(self, resolver):
         candidates = [
-            CandidateLocation(name="High", confidence=0.90),
-            CandidateLocation(name="Medium", confidence=0.65),
-            CandidateLocation(name="Low", confidence=0.30)
+            CandidateLocation(name="Location", confidence=0.80),
+            CandidateLocation(name="Location", confidence=0.85, google_place_id="ChIJ123"),
+            CandidateLocation(name="Location", confidence=0.90, google_place_id="ChIJ456")
         ]
         
-        filtered = resolver.filter_by_confidence(candidates, min_confidence=0.50)
+        merged = resolver._merge_candidates(candidates)
         
-        assert len(filtered) == 2
-        assert all(c.confidence >= 0.50 for c in filtered)
+        # Should use first found place_id
+        assert merged.google_place_id == "ChIJ123"
     
-    def test_keep_all_above_threshold(self):
-        resolver = EntityResolver()
+    def test_combine_descriptions_in_first_seen_order(self, resolver):
         candidates = [
-            CandidateLocation(name="A", confidence=0.95),
-            CandidateLocation(name="B", confidence=0.85),
-            CandidateLocation(name="C", confidence=0.75)
+            CandidateLocation(name="Louvre", description="Museum", confidence=0.80),
+            CandidateLocation(name="Louvre", description="Landmark", confidence=0.85),
+            CandidateLocation(name="Louvre", description="Museum", confidence=0.90),
+            CandidateLocation(name="Louvre", confidence=0.70)
         ]
         
-        filtered = resolver.filter_by_confidence(candidates, min_confidence=0.70)
+        merged = resolver._merge_candidates(candidates)
         
-        assert len(filtered) == 3
+        # Deduplicated but stable, so downstream cache keys don't churn
+        assert merged.description == "Museum | Landmark"
+
+
+class TestFilterByConfidence:
+    """Test confidence filtering."""
     
-    def test_empty_result(self):
-        resolver = EntityResolver()
+    @pytest.mark.parametrize("confidences,threshold,expected_count", [
+        pytest.param([0.90, 0.65, 0.30], 0.50, 2, id="filter_low_confidence"),
+        pytest.param([0.95, 0.85, 0.75], 0.70, 3, id="keep_all_above_threshold"),
+        pytest.param([0.30, 0.20], 0.50, 0, id="empty_result"),
+    ])
+    def test_filter(self, resolver, confidences, threshold, expected_count):
         candidates = [
-            CandidateLocation(name="Low", confidence=0.30),
-            CandidateLocation(name="VeryLow", confidence=0.20)
+            CandidateLocation(name=f"Spot {i}", confidence=confidence)
+            for i, confidence in enumerate(confidences)
         ]
         
-        filtered = resolver.filter_by_confidence(candidates, min_confidence=0.50)
+        filtered = resolver.filter_by_confidence(candidates, min_confidence=threshold)
         
-        assert len(filtered) == 0
+        assert len(filtered) == expected_count
+        assert all(c.confidence >= threshold for c in filtered)
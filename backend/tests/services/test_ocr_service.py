@@ -1,25 +1,46 @@
 """Tests for OCR service."""
+import shutil
 import pytest
 from PIL import Image
 import io
 from app.services.ocr_service import ocr_service
 
 
+INVALID_IMAGE_BYTES = b"not an image"
+
+# Integration tests drive the real Tesseract binary
+requires_tesseract = pytest.mark.skipif(
+    shutil.which("tesseract") is None, reason="tesseract not installed"
+)
+
+
+def _white_png(size):
+    """Encode a plain white image as PNG bytes."""
+    img = Image.new('RGB', size, color='white')
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")
+def sample_text_image():
+    """Create a simple test image with text, encoded once per session."""
+    # Note: For real tests, use PIL ImageDraw to add text
+    # or use actual test image files
+    return _white_png((400, 100))
+
+
+@pytest.fixture(scope="session")
+def blank_image_bytes():
+    """A blank 100x100 PNG, encoded once per session."""
+    return _white_png((100, 100))
+
+
 class TestExtractText:
     """Test text extraction from images."""
     
-    @pytest.fixture
-    def sample_text_image(self):
-        """Create a simple test image with text."""
-        # Create a white image with black text
-        img = Image.new('RGB', (400, 100), color='white')
-        # Note: For real tests, use PIL ImageDraw to add text
-        # or use actual test image files
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        return buffer.getvalue()
-    
     @pytest.mark.integration
+    @requires_tesseract
     def test_extract_simple_text(self, sample_text_image):
         """Test basic OCR extraction (requires Tesseract installed)."""
         result = ocr_service.extract_text(sample_text_image)
@@ -30,26 +51,22 @@ class TestExtractText:
         assert isinstance(result["regions"], list)
     
     @pytest.mark.integration
-    def test_empty_image_returns_empty_text(self):
+    @requires_tesseract
+    def test_empty_image_returns_empty_text(self, blank_image_bytes):
         """Test OCR on blank image."""
-        img = Image.new('RGB', (100, 100), color='white')
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        
-        result = ocr_service.extract_text(buffer.getvalue())
+        result = ocr_service.extract_text(blank_image_bytes)
         
         assert result["text"] == "" or len(result["text"].strip()) == 0
     
     def test_invalid_image_handles_gracefully(self):
         """Test error handling for invalid image data."""
-        invalid_bytes = b"not an image"
-        
-        result = ocr_service.extract_text(invalid_bytes)
+        result = ocr_service.extract_text(INVALID_IMAGE_BYTES)
         
         assert "error" in result or result["text"] == ""
         assert result["confidence"] == 0.0
     
     @pytest.mark.integration
+    @requires_tesseract
     def test_has_text_detection(self, sample_text_image):
         """Test text presence detection."""
         # This requires actual image with text
@@ -58,6 +75,52 @@ class TestExtractText:
         assert isinstance(has_text, bool)
 
 
+class TestPrepareImage:
+    """Test image preparation before Tesseract."""
+    
+    def test_transparent_image_flattened_onto_white(self):
+        img = Image.new('RGBA', (10, 10), color=(0, 0, 0, 0))
+        
+        prepared = ocr_service._prepare_image(img)
+        
+        assert prepared.mode == 'L'
+        assert prepared.format == 'PPM'
+        assert prepared.getpixel((0, 0)) == 255
+    
+    def test_large_image_downscaled(self):
+        img = Image.new('RGB', (4000, 3000), color='white')
+        
+        prepared = ocr_service._prepare_image(img)
+        
+        assert prepared.size == (1600, 1200)
+    
+    def test_small_image_keeps_size(self):
+        img = Image.new('RGB', (400, 100), color='white')
+        
+        assert ocr_service._prepare_image(img).size == (400, 100)
+
+
+class TestTextFromData:
+    """Test rebuilding page text from image_to_data output."""
+    
+    def test_preserves_lines_and_paragraphs(self):
+        data = {
+            'text': ['', '📍', 'Louvre', '', 'Paris', '', 'Great', 'day', ' '],
+            'block_num': [1, 1, 1, 1, 1, 2, 2, 2, 2],
+            'par_num': [1, 1, 1, 1, 1, 1, 1, 1, 1],
+            'line_num': [0, 1, 1, 2, 2, 0, 1, 1, 1],
+        }
+        
+        text = ocr_service._text_from_data(data)
+        
+        assert text == "📍 Louvre\nParis\n\nGreat day"
+    
+    def test_no_words(self):
+        data = {'text': ['', ' '], 'block_num': [1, 1], 'par_num': [1, 1], 'line_num': [0, 1]}
+        
+        assert ocr_service._text_from_data(data) == ""
+
+
 # Note: Integration tests marked with @pytest.mark.integration
 # Run with: pytest -m integration
 # Skip with: pytest -m "not integration"
@@ -0,0 +1,169 @@
+"""Tests for vision service."""
+import asyncio
+import hashlib
+from types import SimpleNamespace
+import orjson
+import pytest
+from app.models.schemas import CandidateLocation
+from app.services import vision_service as vision_module
+from app.services.vision_service import VisionService
+
+
+IMAGE_BYTES = b"fake image bytes"
+IMAGE_KEY = hashlib.blake2b(IMAGE_BYTES, digest_size=16).hexdigest()
+
+
+@pytest.fixture
+def service():
+    """Vision-only service with its own clients, closed after the test."""
+    service = VisionService(use_enhanced_pipeline=False)
+    yield service
+    asyncio.run(service.aclose())
+
+
+@pytest.fixture
+def enhanced_service(monkeypatch):
+    """OCR + Vision service with Redis stubbed out and Vision calls recorded."""
+    service = VisionService(use_enhanced_pipeline=True)
+    service.vision_requests = []
+
+    async def fake_request_vision(image_bytes):
+        service.vision_requests.append(image_bytes)
+        return [CandidateLocation(name="Louvre Museum", confidence=0.8)]
+
+    async def fake_redis_get(key):
+        return None
+
+    async def fake_redis_setex(key, ttl, value):
+        return True
+
+    monkeypatch.setattr(service, "_request_vision", fake_request_vision)
+    monkeypatch.setattr(service, "redis", SimpleNamespace(get=fake_redis_get, setex=fake_redis_setex))
+    yield service
+    asyncio.run(service.aclose())
+
+
+class TestVisionSkip:
+    """Test skipping the Vision API when OCR is confident."""
+
+    async def test_confident_ocr_never_calls_vision(self, enhanced_service, monkeypatch):
+        monkeypatch.setattr(
+            vision_module.ocr_service, "extract_text",
+            lambda image_bytes: {"text": "📍 Eiffel Tower, Paris", "confidence": 0.95}
+        )
+
+        candidates = await enhanced_service.analyze_image_async(IMAGE_BYTES)
+
+        assert enhanced_service.vision_requests == []
+        assert enhanced_service.vision_calls_skipped == 1
+        assert any("Eiffel" in c.name for c in candidates)
+
+    async def test_weak_ocr_falls_through_to_vision(self, enhanced_service, monkeypatch):
+        monkeypatch.setattr(
+            vision_module.ocr_service, "extract_text",
+            lambda image_bytes: {"text": "", "confidence": 0.0}
+        )
+
+        candidates = await enhanced_service.analyze_image_async(IMAGE_BYTES)
+
+        assert enhanced_service.vision_requests == [IMAGE_BYTES]
+        assert enhanced_service.vision_calls_skipped == 0
+        assert [c.name for c in candidates] == ["Louvre Museum"]
+
+
+def _batch_output_line(custom_id, locations, status_code=200):
+    """One line of a Batch API output file."""
+    content = orjson.dumps({"locations": locations}).decode()
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "response": {
+            "status_code": status_code,
+            "body": {"choices": [{"message": {"content": content}}]}
+        }
+    })
+
+
+class TestBatchVision:
+    """Test Batch API submission and collection."""
+
+    async def test_submit_uploads_one_request_per_image(self, service, monkeypatch):
+        uploads = []
+        posts = []
+
+        async def fake_create(file, purpose):
+            uploads.append((file, purpose))
+            return SimpleNamespace(id="file-in")
+
+        async def fake_post(path, body, cast_to):
+            posts.append((path, body))
+            return {"id": "batch-1"}
+
+        monkeypatch.setattr(service.async_client.files, "create", fake_create)
+        monkeypatch.setattr(service.async_client, "post", fake_post)
+
+        images = [b"first image", b"second image"]
+        batch_id = await service.submit_batch_vision(images)
+
+        assert batch_id == "batch-1"
+        (name, payload), purpose = uploads[0]
+        assert purpose == "batch"
+        lines = [orjson.loads(line) for line in payload.split(b"\n")]
+        assert [line["custom_id"] for line in lines] == [
+            f"{i}:{hashlib.blake2b(image, digest_size=16).hexdigest()}"
+            for i, image in enumerate(images)
+        ]
+        assert all(line["url"] == "/v1/chat/completions" for line in lines)
+        assert lines[0]["body"]["model"] == "gpt-4o"
+        assert posts == [("/batches", {
+            "input_file_id": "file-in",
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        })]
+
+    async def test_collect_returns_none_while_running(self, service, monkeypatch):
+        async def fake_get(path, cast_to):
+            return {"status": "in_progress"}
+
+        monkeypatch.setattr(service.async_client, "get", fake_get)
+
+        assert await service.collect_batch_vision("batch-1") is None
+
+    async def test_collect_raises_on_failed_batch(self, service, monkeypatch):
+        async def fake_get(path, cast_to):
+            return {"status": "expired"}
+
+        monkeypatch.setattr(service.async_client, "get", fake_get)
+
+        with pytest.raises(RuntimeError):
+            await service.collect_batch_vision("batch-1")
+
+    async def test_collect_orders_by_custom_id_and_fills_cache(self, service, monkeypatch):
+        second_key = hashlib.blake2b(b"second image", digest_size=16).hexdigest()
+        # Output files are not guaranteed to follow submission order
+        output = b"\n".join([
+            _batch_output_line(f"2:{second_key}", [{"name": "Louvre", "confidence": 0.9}]),
+            _batch_output_line(f"0:{IMAGE_KEY}", [{"name": "Eiffel Tower", "confidence": 0.85}]),
+            _batch_output_line("1:failed", [], status_code=500),
+        ])
+
+        async def fake_get(path, cast_to):
+            assert path == "/batches/batch-1"
+            return {
+                "status": "completed",
+                "output_file_id": "file-out",
+                "request_counts": {"total": 3}
+            }
+
+        async def fake_content(file_id):
+            assert file_id == "file-out"
+            return SimpleNamespace(content=output)
+
+        monkeypatch.setattr(service.async_client, "get", fake_get)
+        monkeypatch.setattr(service.async_client.files, "content", fake_content)
+
+        results = await service.collect_batch_vision("batch-1")
+
+        assert [[c.name for c in r] for r in results] == [["Eiffel Tower"], [], ["Louvre"]]
+        assert [c.name for c in service._lookup_vision(IMAGE_KEY)] == ["Eiffel Tower"]
+        assert [c.name for c in service._lookup_vision(second_key)] == ["Louvre"]
+        assert service._lookup_vision("failed") is None
@@ -1,11 +1,34 @@
 import pytest
-from datetime import datetime, timedelta
-from app.services.route_optimizer import route_optimizer
+from concurrent.futures.process import BrokenProcessPool
+from itertools import permutations
+from datetime import datetime
+from uuid import uuid4
+from app.services.route_optimizer import route_optimizer, _held_karp_route, _two_opt_route
 from app.db.models import Waypoint
 from app.models.schemas import TripConstraints, LatLng
 
+# Simple distance matrix (seconds); index 0 is the start pin. Plain lists, as
+# the distance matrix service returns them.
+DISTANCE_MATRIX_4x4 = [
+    [0,    600,  900,  1200],
+    [600,  0,    800,  500],
+    [900,  800,  0,    700],
+    [1200, 500,  700,  0]
+]
 
-def test_tsp_single_waypoint():
+
+@pytest.fixture(scope="module")
+def constraints():
+    """A 9am-6pm day at moderate walking speed, shared by the solver tests."""
+    return TripConstraints(
+        start_location=LatLng(lat=35.6700, lng=139.6500),
+        start_time=datetime(2024, 1, 1, 9, 0),
+        end_time=datetime(2024, 1, 1, 18, 0),
+        walking_speed="moderate"
+    )
+
+
+def test_tsp_single_waypoint(constraints):
     """Test TSP with a single waypoint."""
     waypoint = Waypoint(
         name="Test Location",
@@ -19,13 +42,6 @@ def test_tsp_single_waypoint():
         [600, 0]
     ]
     
-    constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="moderate"
-    )
-    
     result = route_optimizer.solve_tsp([waypoint], distance_matrix, constraints)
     
     assert len(result) == 1
@@ -34,7 +50,7 @@ def test_tsp_single_waypoint():
     assert result[0].departure_time is not None
 
 
-def test_tsp_multiple_waypoints():
+def test_tsp_multiple_waypoints(constraints):
     """Test TSP with multiple waypoints."""
     waypoints = [
         Waypoint(name="Location A", lat=35.6762, lng=139.6503, estimated_stay_duration=60),
@@ -42,22 +58,7 @@ def test_tsp_multiple_waypoints():
         Waypoint(name="Location C", lat=35.6700, lng=139.6400, estimated_stay_duration=60),
     ]
     
-    # Simple distance matrix (seconds)
-    distance_matrix = [
-        [0,    600,  900,  1200],
-        [600,  0,    800,  500],
-        [900,  800,  0,    700],
-        [1200, 500,  700,  0]
-    ]
-    
-    constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="moderate"
-    )
-    
-    result = route_optimizer.solve_tsp(waypoints, distance_matrix, constraints)
+    result = route_optimizer.solve_tsp(waypoints, DISTANCE_MATRIX_4x4, constraints)
     
     assert len(result) == 3
     assert all(wp.order is not None for wp in result)
@@ -69,45 +70,164 @@ def test_tsp_multiple_waypoints():
     assert orders == sorted(orders)
 
 
-def test_tsp_empty_waypoints():
+def test_tsp_empty_waypoints(constraints):
     """Test TSP with no waypoints."""
     distance_matrix = [[0]]
     
-    constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="moderate"
-    )
-    
     result = route_optimizer.solve_tsp([], distance_matrix, constraints)
     
     assert len(result) == 0
 
 
-def test_walking_speed_conversion():
-    """Test walking speed conversion."""
-    slow_constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="slow"
-    )
+def test_greedy_fallback_nearest_neighbor_with_fixed_end(constraints):
+    """Greedy fallback visits the nearest waypoint next and keeps the end waypoint last."""
+    waypoints = [
+        Waypoint(id=uuid4(), name="Location A", lat=35.6762, lng=139.6503, estimated_stay_duration=30),
+        Waypoint(id=uuid4(), name="Location B", lat=35.6800, lng=139.6600, estimated_stay_duration=30),
+        Waypoint(id=uuid4(), name="Location C", lat=35.6700, lng=139.6400, estimated_stay_duration=30),
+    ]
     
-    moderate_constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="moderate"
+    distance_matrix = [
+        [0,    600,  300,  100],
+        [600,  0,    800,  500],
+        [300,  800,  0,    700],
+        [100,  500,  700,  0]
+    ]
+    
+    result = route_optimizer._greedy_fallback(
+        waypoints, distance_matrix, constraints, end_waypoint_id=waypoints[2].id
     )
     
-    fast_constraints = TripConstraints(
-        start_location=LatLng(lat=35.6700, lng=139.6500),
-        start_time=datetime(2024, 1, 1, 9, 0),
-        end_time=datetime(2024, 1, 1, 18, 0),
-        walking_speed="fast"
+    # C is nearest to the start but reserved for last; B (300s) beats A (600s)
+    assert [wp.name for wp in result] == ["Location B", "Location A", "Location C"]
+    assert [wp.order for wp in result] == [1, 2, 3]
+    assert result[0].arrival_time == datetime(2024, 1, 1, 9, 5)
+    # B departs 9:35, then 800s to A; A departs 10:18:20, then 500s to C
+    assert result[1].arrival_time == datetime(2024, 1, 1, 9, 48, 20)
+    assert result[2].arrival_time == datetime(2024, 1, 1, 10, 26, 40)
+
+
+def test_tsp_ortools_fixed_end_is_last_and_unique(constraints):
+    """OR-Tools path keeps the fixed end last and emits every waypoint exactly once."""
+    waypoints = [
+        Waypoint(id=uuid4(), name=f"Location {i}", lat=35.67, lng=139.65, estimated_stay_duration=10)
+        for i in range(14)
+    ]
+    n = len(waypoints) + 1
+    distance_matrix = [[0 if i == j else 60 * (abs(i - j) + 1) for j in range(n)] for i in range(n)]
+    
+    end_wp = waypoints[3]
+    result = route_optimizer.solve_tsp(
+        waypoints, distance_matrix, constraints, end_waypoint_id=end_wp.id
     )
     
-    assert slow_constraints.walking_speed_mps == 1.2
-    assert moderate_constraints.walking_speed_mps == 1.4
-    assert fast_constraints.walking_speed_mps == 1.6
+    assert result[-1] is end_wp
+    assert sorted(id(wp) for wp in result) == sorted(id(wp) for wp in waypoints)
+    assert [wp.order for wp in result] == list(range(1, len(waypoints) + 1))
+
+
+async def test_solve_tsp_async_matches_sync(constraints):
+    """The process-pool solve applies the same route to the caller's waypoints."""
+    def make_waypoints():
+        return [
+            Waypoint(id=uuid4(), name=f"Location {i}", lat=35.67, lng=139.65, estimated_stay_duration=20)
+            for i in range(5)
+        ]
+    
+    distance_matrix = [
+        [0,   300, 900, 400, 700, 200],
+        [300, 0,   500, 600, 800, 350],
+        [900, 500, 0,   450, 250, 800],
+        [400, 600, 450, 0,   300, 550],
+        [700, 800, 250, 300, 0,   650],
+        [200, 350, 800, 550, 650, 0]
+    ]
+    
+    expected = route_optimizer.solve_tsp(make_waypoints(), distance_matrix, constraints)
+    waypoints = make_waypoints()
+    result = await route_optimizer.solve_tsp_async(waypoints, distance_matrix, constraints)
+    
+    assert all(any(wp is original for original in waypoints) for wp in result)
+    assert [wp.name for wp in result] == [wp.name for wp in expected]
+    assert [wp.arrival_time for wp in result] == [wp.arrival_time for wp in expected]
+
+
+async def test_solve_tsp_async_falls_back_to_greedy_on_worker_failure(constraints, monkeypatch):
+    """A broken solver pool degrades to the greedy route instead of raising."""
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+        
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+    
+    monkeypatch.setattr("app.services.route_optimizer._get_solver_pool", BrokenPool)
+    
+    def make_waypoints():
+        return [
+            Waypoint(id=uuid4(), name=f"Location {i}", lat=35.67, lng=139.65, estimated_stay_duration=20)
+            for i in range(3)
+        ]
+    
+    expected = route_optimizer._greedy_fallback(make_waypoints(), DISTANCE_MATRIX_4x4, constraints)
+    result = await route_optimizer.solve_tsp_async(make_waypoints(), DISTANCE_MATRIX_4x4, constraints)
+    
+    assert [wp.name for wp in result] == [wp.name for wp in expected]
+    assert [wp.arrival_time for wp in result] == [wp.arrival_time for wp in expected]
+
+
+def test_held_karp_matches_brute_force():
+    """Exact solver finds the cheapest tour, and the cheapest path to a fixed end."""
+    distance_matrix = [
+        [0,   300, 900, 400, 700],
+        [300, 0,   200, 800, 600],
+        [900, 200, 0,   500, 100],
+        [400, 800, 500, 0,   300],
+        [700, 600, 100, 300, 0]
+    ]
+    
+    def travel(order, closed):
+        nodes = [0] + [i + 1 for i in order] + ([0] if closed else [])
+        return sum(distance_matrix[a][b] for a, b in zip(nodes, nodes[1:]))
+    
+    order, cost = _held_karp_route(distance_matrix)
+    assert sorted(order) == [0, 1, 2, 3]
+    assert cost == travel(order, closed=True)
+    assert cost == min(travel(p, closed=True) for p in permutations(range(4)))
+    
+    order, cost = _held_karp_route(distance_matrix, end_idx=1)
+    assert order[-1] == 1
+    assert cost == min(travel(p, closed=False) for p in permutations(range(4)) if p[-1] == 1)
+
+
+def test_two_opt_route_uncrosses_and_keeps_endpoints():
+    """2-opt removes a crossing while node 0 stays first and a fixed end stays last."""
+    # Nodes on a line at positions 0, 1, 2, 3, 4
+    positions = [0, 1, 2, 3, 4]
+    distance_matrix = [[abs(a - b) * 100 for b in positions] for a in positions]
+    
+    assert _two_opt_route([0, 3, 1, 2, 4], distance_matrix, closed=False) == [0, 1, 2, 3, 4]
+    # Closed tours keep the implicit return to node 0
+    closed = _two_opt_route([0, 2, 4, 1, 3], distance_matrix, closed=True)
+    assert closed[0] == 0
+    assert sorted(closed) == positions
+    cost = sum(distance_matrix[a][b] for a, b in zip(closed, closed[1:] + [0]))
+    assert cost == 800
+
+
+def test_two_opt_route_costs_reversals_on_asymmetric_matrix():
+    """A reversal is only taken when it pays off in the reversed direction too."""
+    # Travelling towards higher nodes is cheap, back towards lower ones is dear
+    distance_matrix = [[100 * (b - a) if b >= a else 1000 * (a - b) for b in range(4)] for a in range(4)]
+    
+    assert _two_opt_route([0, 2, 1, 3], distance_matrix, closed=False) == [0, 1, 2, 3]
+    assert _two_opt_route([0, 1, 2, 3], distance_matrix, closed=False) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("speed,mps", [("slow", 1.2), ("moderate", 1.4), ("fast", 1.6)])
+def test_walking_speed_conversion(constraints, speed, mps):
+    """Test walking speed conversion."""
+    # model_copy skips re-validating the unchanged location and times
+    speed_constraints = constraints.model_copy(update={"walking_speed": speed})
+    
+    assert speed_constraints.walking_speed_mps == mps
@@ -1,57 +1,159 @@
 """Tests for geographic utility functions."""
+import numpy as np
 import pytest
 from app.utils.geo_utils import (
     haversine_distance,
+    haversine_distance_matrix,
+    haversine_distance_array,
+    haversine_distance_vector,
     are_locations_nearby,
     validate_coordinates,
     get_midpoint,
     calculate_centroid,
+    calculate_centroid_arrays,
     calculate_bounding_radius,
-    score_by_proximity
+    calculate_bounding_radius_arrays,
+    score_by_proximity,
+    score_by_proximity_batch
 )
 
 
+def _haversine_np(lat1, lng1, lat2, lng2):
+    """Independent vectorized Haversine oracle, in meters."""
+    lat1, lng1, lat2, lng2 = (np.radians(v) for v in (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 6371000 * 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+@pytest.fixture(scope="module")
+def coordinate_sweep():
+    """Seeded random point pairs plus near-antipodal and coincident edge cases."""
+    rng = np.random.default_rng(42)
+    n = 500
+    lat1, lat2 = rng.uniform(-90, 90, (2, n))
+    lng1, lng2 = rng.uniform(-180, 180, (2, n))
+    edge = np.array([
+        [0.0, 0.0, 0.0, 180.0],
+        [90.0, 0.0, -90.0, 0.0],
+        [48.8584, 2.2945, 48.8584, 2.2945],
+    ])
+    return np.vstack([np.column_stack([lat1, lng1, lat2, lng2]), edge])
+
+
 class TestHaversineDistance:
     """Test distance calculation."""
     
-    def test_same_location(self):
-        distance = haversine_distance(48.8584, 2.2945, 48.8584, 2.2945)
-        assert distance == 0.0
-    
-    def test_known_distance_paris_london(self):
+    @pytest.mark.parametrize("lat1,lng1,lat2,lng2,low,high", [
         # Eiffel Tower to Big Ben (approx 344 km)
-        distance = haversine_distance(48.8584, 2.2945, 51.5007, -0.1246)
-        assert 340000 < distance < 350000  # meters
-    
-    def test_short_distance(self):
+        pytest.param(48.8584, 2.2945, 51.5007, -0.1246, 340000, 350000, id="paris_london"),
         # 100m apart approximately
-        distance = haversine_distance(48.8584, 2.2945, 48.8594, 2.2945)
-        assert 100 < distance < 120
-    
-    def test_negative_coordinates(self):
+        pytest.param(48.8584, 2.2945, 48.8594, 2.2945, 100, 120, id="short_distance"),
         # Southern and Western hemispheres
-        distance = haversine_distance(-33.8688, 151.2093, -34.6037, -58.3816)
-        assert distance > 0
+        pytest.param(-33.8688, 151.2093, -34.6037, -58.3816, 1, float("inf"), id="negative_coordinates"),
+    ])
+    def test_distance_in_range(self, lat1, lng1, lat2, lng2, low, high):
+        distance = haversine_distance(lat1, lng1, lat2, lng2)
+        assert low <= distance <= high  # meters
+    
+    def test_same_location(self):
+        distance = haversine_distance(48.8584, 2.2945, 48.8584, 2.2945)
+        assert distance == pytest.approx(0.0, abs=1e-9)
+    
+    def test_matches_vectorized_oracle(self, coordinate_sweep):
+        expected = _haversine_np(*coordinate_sweep.T)
+        actual = [haversine_distance(*row) for row in coordinate_sweep]
+        
+        assert np.allclose(actual, expected, rtol=1e-9, atol=1e-6)
+
+
+class TestHaversineDistanceMatrix:
+    """Test pairwise distance calculation."""
+    
+    def test_matches_scalar_haversine(self):
+        lats = [48.8584, 51.5007, -33.8688]
+        lngs = [2.2945, -0.1246, 151.2093]
+        
+        distances = haversine_distance_matrix(lats, lngs)
+        
+        assert distances.shape == (3, 3)
+        for i in range(3):
+            assert distances[i][i] == 0.0
+            for j in range(3):
+                expected = haversine_distance(lats[i], lngs[i], lats[j], lngs[j])
+                assert distances[i][j] == pytest.approx(expected)
+    
+    def test_matches_vectorized_oracle(self, coordinate_sweep):
+        lat1, lng1, lat2, lng2 = coordinate_sweep.T
+        
+        distances = haversine_distance_matrix(lat1, lng1, lat2, lng2)
+        
+        expected = _haversine_np(lat1[:, None], lng1[:, None], lat2[None, :], lng2[None, :])
+        assert np.allclose(distances, expected, rtol=1e-9, atol=1e-6)
+
+
+class TestHaversineDistanceArray:
+    """Test one-to-many distance calculation."""
+    
+    def test_matches_scalar_haversine(self):
+        lats = [48.8584, 51.5007, -33.8688]
+        lngs = [2.2945, -0.1246, 151.2093]
+        
+        distances = haversine_distance_array(40.7128, -74.0060, lats, lngs)
+        
+        assert distances.shape == (3,)
+        for i in range(3):
+            expected = haversine_distance(40.7128, -74.0060, lats[i], lngs[i])
+            assert distances[i] == pytest.approx(expected)
+
+
+class TestHaversineDistanceVector:
+    """Test elementwise paired distance calculation."""
+    
+    def test_known_distances(self):
+        # Same point, Eiffel Tower to Big Ben (~344 km), and ~100m apart
+        distances = haversine_distance_vector(
+            np.array([48.8584, 48.8584, 48.8584]),
+            np.array([2.2945, 2.2945, 2.2945]),
+            np.array([48.8584, 51.5007, 48.8594]),
+            np.array([2.2945, -0.1246, 2.2945])
+        )
+        
+        assert distances.shape == (3,)
+        assert distances[0] == pytest.approx(0.0, abs=1e-9)
+        assert 340000 <= distances[1] <= 350000
+        assert 100 <= distances[2] <= 120
+    
+    def test_broadcasts_scalar_point(self):
+        lats = [48.8584, 51.5007, -33.8688]
+        lngs = [2.2945, -0.1246, 151.2093]
+        
+        distances = haversine_distance_vector(40.7128, -74.0060, lats, lngs)
+        
+        assert np.allclose(distances, haversine_distance_array(40.7128, -74.0060, lats, lngs))
+    
+    def test_matches_vectorized_oracle(self, coordinate_sweep):
+        distances = haversine_distance_vector(*coordinate_sweep.T)
+        
+        assert np.allclose(distances, _haversine_np(*coordinate_sweep.T), rtol=1e-9, atol=1e-6)
 
 
 class TestAreLocationsNearby:
     """Test proximity checking."""
     
-    def test_within_radius(self):
-        # 30m apart
+    @pytest.mark.parametrize("lat2,radius_meters,expected", [
+        pytest.param(48.8587, 50.0, True, id="within_radius"),  # 30m apart
+        pytest.param(48.8684, 50.0, False, id="outside_radius"),  # ~1km apart
+        pytest.param(48.8594, 2000.0, True, id="custom_radius"),
+    ])
+    def test_radius(self, lat2, radius_meters, expected):
         assert are_locations_nearby(
             48.8584, 2.2945,
-            48.8587, 2.2945,
-            radius_meters=50.0
-        )
-    
-    def test_outside_radius(self):
-        # ~1km apart
-        assert not are_locations_nearby(
-            48.8584, 2.2945,
-            48.8684, 2.2945,
-            radius_meters=50.0
-        )
+            lat2, 2.2945,
+            radius_meters=radius_meters
+        ) == expected
     
     def test_exact_radius(self):
         # Test boundary condition
@@ -62,45 +164,47 @@ class TestAreLocationsNearby:
             radius_meters=distance + 1
         )
     
-    def test_custom_radius(self):
-        assert are_locations_nearby(
-            48.8584, 2.2945,
-            48.8594, 2.2945,
-            radius_meters=2000.0  # 2km
-        )
+    def test_latitude_prefilter_matches_haversine(self, coordinate_sweep):
+        lat1, lng1 = coordinate_sweep[:, 0], coordinate_sweep[:, 1]
+        # Same-longitude partners sit exactly on the prefilter bound
+        lat2 = np.clip(lat1 + np.linspace(-0.01, 0.01, len(lat1)), -90, 90)
+        
+        for row in zip(lat1, lng1, lat2, lng1):
+            distance = haversine_distance(*row)
+            for radius_meters in (distance, distance * 0.999, distance * 1.001, 500.0):
+                assert are_locations_nearby(*row, radius_meters=radius_meters) == (distance <= radius_meters)
+        for row in coordinate_sweep:
+            distance = haversine_distance(*row)
+            assert are_locations_nearby(*row, radius_meters=distance)
+            assert are_locations_nearby(*row, radius_meters=50.0) == (distance <= 50.0)
 
 
 class TestValidateCoordinates:
     """Test coordinate validation."""
     
-    def test_valid_coordinates(self):
-        assert validate_coordinates(48.8584, 2.2945)
-    
-    def test_invalid_latitude_high(self):
-        assert not validate_coordinates(91.0, 2.2945)
-    
-    def test_invalid_latitude_low(self):
-        assert not validate_coordinates(-91.0, 2.2945)
-    
-    def test_invalid_longitude_high(self):
-        assert not validate_coordinates(48.8584, 181.0)
-    
-    def test_invalid_longitude_low(self):
-        assert not validate_coordinates(48.8584, -181.0)
-    
-    def test_boundary_values(self):
-        assert validate_coordinates(90.0, 180.0)
-        assert validate_coordinates(-90.0, -180.0)
-        assert validate_coordinates(0.0, 0.0)
+    @pytest.mark.parametrize("lat,lng,expected", [
+        pytest.param(48.8584, 2.2945, True, id="valid"),
+        pytest.param(91.0, 2.2945, False, id="latitude_high"),
+        pytest.param(-91.0, 2.2945, False, id="latitude_low"),
+        pytest.param(48.8584, 181.0, False, id="longitude_high"),
+        pytest.param(48.8584, -181.0, False, id="longitude_low"),
+        pytest.param(90.0, 180.0, True, id="upper_bounds"),
+        pytest.param(-90.0, -180.0, True, id="lower_bounds"),
+        pytest.param(0.0, 0.0, True, id="origin"),
+    ])
+    def test_validate(self, lat, lng, expected):
+        assert validate_coordinates(lat, lng) == expected
 
 
 class TestGetMidpoint:
     """Test midpoint calculation."""
     
-    def test_simple_midpoint(self):
-        lat, lng = get_midpoint(0.0, 0.0, 10.0, 10.0)
-        assert lat == 5.0
-        assert lng == 5.0
+    @pytest.mark.parametrize("lat1,lng1,lat2,lng2,expected", [
+        pytest.param(0.0, 0.0, 10.0, 10.0, (5.0, 5.0), id="simple"),
+        pytest.param(48.8584, 2.2945, 48.8584, 2.2945, (48.8584, 2.2945), id="same_point"),
+    ])
+    def test_midpoint(self, lat1, lng1, lat2, lng2, expected):
+        assert get_midpoint(lat1, lng1, lat2, lng2) == pytest.approx(expected, abs=1e-12)
     
     def test_paris_london_midpoint(self):
         # Midpoint between Paris and London
@@ -109,10 +213,14 @@ class TestGetMidpoint:
         assert 49.0 < lat < 51.0
         assert -1.0 < lng < 2.0
     
-    def test_same_point(self):
-        lat, lng = get_midpoint(48.8584, 2.2945, 48.8584, 2.2945)
-        assert lat == 48.8584
-        assert lng == 2.2945
+    def test_arrays_broadcast(self):
+        lats, lngs = get_midpoint(
+            np.array([48.8584, 0.0]), np.array([2.2945, 0.0]),
+            np.array([51.5007, 10.0]), np.array([-0.1246, 10.0])
+        )
+        
+        assert lats.tolist() == pytest.approx([(48.8584 + 51.5007) / 2, 5.0])
+        assert lngs.tolist() == pytest.approx([(2.2945 - 0.1246) / 2, 5.0])
 
 
 class TestCalculateCentroid:
@@ -158,6 +266,23 @@ class TestCalculateCentroid:
             (42.3601, -71.0589)
         ])
         assert lat == pytest.approx(41.5365, abs=0.001)
+    
+    def test_only_none_values(self):
+        lat, lng = calculate_centroid([(None, None), (40.7128, None)])
+        assert lat is None
+        assert lng is None
+    
+    def test_returns_python_floats(self):
+        lat, lng = calculate_centroid([(40.7128, -74.0060), (42.3601, -71.0589)])
+        assert type(lat) is float
+        assert type(lng) is float
+    
+    def test_arrays_match_tuples(self):
+        coords = [(40.7580, -73.9855), (40.7484, -73.9857), (40.7614, -73.9776)]
+        lats, lngs = np.array(coords).T
+        
+        assert calculate_centroid_arrays(lats, lngs) == calculate_centroid(coords)
+        assert calculate_centroid_arrays([], []) == (None, None)
 
 
 class TestCalculateBoundingRadius:
@@ -196,6 +321,19 @@ class TestCalculateBoundingRadius:
         radius = calculate_bounding_radius(coords, centroid)
         # Should be minimum 10km even though points are close
         assert radius >= 10000.0
+    
+    def test_ignores_none_values(self):
+        coords = [(40.7128, -74.0060), (None, -71.0589), (40.8, None)]
+        radius = calculate_bounding_radius(coords, (40.7128, -74.0060))
+        assert radius == 10000.0
+    
+    def test_arrays_match_tuples(self):
+        coords = [(40.7128, -74.0060), (42.3601, -71.0589)]
+        centroid = calculate_centroid(coords)
+        lats, lngs = np.array(coords).T
+        
+        assert calculate_bounding_radius_arrays(lats, lngs, centroid) == calculate_bounding_radius(coords, centroid)
+        assert calculate_bounding_radius_arrays([], [], (None, None)) == 50000.0
 
 
 class TestScoreByProximity:
@@ -235,3 +373,33 @@ class TestScoreByProximity:
         # Score should be higher with longer max distance
         assert score_long > score_short
 
+
+class TestScoreByProximityBatch:
+    """Test vectorized proximity scoring."""
+    
+    def test_matches_scalar_scores(self):
+        centroid = (40.7580, -73.9855)
+        coords = [
+            (40.7580, -73.9855),  # At centroid
+            (40.7357, -74.1724),  # ~16km away in NJ
+            (34.0522, -118.2437),  # LA
+        ]
+        
+        scores = score_by_proximity_batch(coords, centroid, max_reasonable_distance=50000)
+        
+        expected = [score_by_proximity(lat, lng, centroid, 50000) for lat, lng in coords]
+        assert scores.tolist() == pytest.approx(expected)
+    
+    def test_missing_coordinates_score_neutral(self):
+        scores = score_by_proximity_batch(
+            [(None, None), (40.7580, None), (40.7580, -73.9855)],
+            (40.7580, -73.9855)
+        )
+        assert scores.tolist() == pytest.approx([0.5, 0.5, 1.0])
+    
+    def test_null_centroid(self):
+        scores = score_by_proximity_batch([(40.7580, -73.9855)], (None, None))
+        assert scores.tolist() == [0.5]
+    
+    def test_empty_coords(self):
+        assert score_by_proximity_batch([], (40.7580, -73.9855)).shape == (0,)
@@ -1,11 +1,13 @@
 """Tests for text utility functions."""
-import pytest
 from app.utils.text_utils import (
     normalize_text,
     calculate_similarity,
+    normalized_similarity,
+    similarity_matrix,
     are_similar,
     extract_location_mentions,
-    remove_emojis
+    remove_emojis,
+    _levenshtein_ratio
 )
 
 
@@ -51,6 +53,30 @@ class TestCalculateSimilarity:
     def test_typo_tolerance(self):
         similarity = calculate_similarity("Restaurant", "Resturant")
         assert similarity > 0.8  # Should be high despite typo
+    
+    def test_normalized_similarity_is_symmetric(self):
+        forward = normalized_similarity("cafe de flore", "cafe flore")
+        backward = normalized_similarity("cafe flore", "cafe de flore")
+        assert forward == backward
+        assert forward == calculate_similarity("Cafe de Flore", "Cafe Flore")
+    
+    def test_swapped_pair_reuses_cached_ratio(self):
+        forward = calculate_similarity("Louvre Museum", "Musee du Louvre")
+        hits_before = _levenshtein_ratio.cache_info().hits
+        
+        backward = calculate_similarity("Musee du Louvre", "Louvre Museum")
+        
+        assert backward == forward
+        assert _levenshtein_ratio.cache_info().hits == hits_before + 1
+    
+    def test_similarity_matrix_matches_pairwise(self):
+        names = ["cafe de flore", "cafe flore", "louvre museum", ""]
+        matrix = similarity_matrix(names)
+        
+        assert matrix.shape == (4, 4)
+        for i, text1 in enumerate(names):
+            for j, text2 in enumerate(names):
+                assert matrix[i, j] == normalized_similarity(text1, text2)
 
 
 class TestAreSimilar:
@@ -65,6 +91,17 @@ class TestAreSimilar:
     def test_custom_threshold(self):
         assert are_similar("Paris", "Pari", threshold=0.75)
         assert not are_similar("Paris", "Pari", threshold=0.95)
+    
+    def test_matrix_matches_pairwise(self):
+        names = ["eiffel tower", "paris"]
+        others = ["eiffel tower", "louvre museum", "pari"]
+        
+        above = similarity_matrix(names, others) >= 0.75
+        
+        assert above.shape == (2, 3)
+        for i, text1 in enumerate(names):
+            for j, text2 in enumerate(others):
+                assert above[i, j] == are_similar(text1, text2, threshold=0.75)
 
 
 class TestExtractLocationMentions:
@@ -93,6 +130,12 @@ class TestExtractLocationMentions:
         text = "📍 Louvre Museum and @ Notre Dame #Paris"
         locations = extract_location_mentions(text)
         assert len(locations) >= 2
+    
+    def test_overlapping_patterns_each_match(self):
+        # A pin chunk can contain "at" and "#" text; every pattern still reports it
+        text = "📍 Brunch at Cafe Marly #Paris"
+        locations = extract_location_mentions(text)
+        assert locations == ["Brunch at Cafe Marly #Paris", "Cafe", "Paris"]
 
 
 class TestRemoveEmojis:
@@ -119,3 +162,7 @@ class TestRemoveEmojis:
         text = "😀😃😄"
         result = remove_emojis(text)
         assert result == ""
+    
+    def test_keeps_non_latin_letters(self):
+        result = remove_emojis("東京タワー 🗼 서울 ❤️")
+        assert result == "東京タワー  서울 "
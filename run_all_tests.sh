@@ -104,7 +104,7 @@ else
         
         # 2.2 Service Tests
         echo -e "\n${YELLOW}Category: Business Logic Services${NC}"
-        run_test_suite "OCR Service Tests" "docker exec plana_backend python -m pytest tests/services/test_ocr_service.py -v" "" || true
+        run_test_suite "OCR Service Tests" "docker exec plana_backend python -m pytest tests/services/test_ocr_service.py -m '' -v" "" || true
         run_test_suite "Entity Extractor Tests" "docker exec plana_backend python -m pytest tests/services/test_entity_extractor.py -v" "" || true
         run_test_suite "Entity Resolver Tests" "docker exec plana_backend python -m pytest tests/services/test_entity_resolver.py -v" "" || true
         